@@ -0,0 +1,452 @@
+# Required imported python libraries
+# Python default libraries, no need to install
+import os
+import sys
+import datetime
+import logging
+import argparse
+import contextlib
+import json
+import platform
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+# pyhecdss reads the synthetic CVP_BDO_WIIN.dss, as in the post-processor
+# Current github repo for pyhecdss:
+# https://github.com/CADWRDeltaModeling/pyhecdss
+import pyhecdss
+# Data manipulation libraries
+import numpy as np
+import pandas as pd
+# The post-processor stages and the synthetic DSM2 output generator
+import dsm2bdoomr_post_pyhecdss as post
+import dsm2bdoomr_synthetic as synthetic
+
+# the stages in pipeline order; each is timed on its own with the output of
+# the stages before it as input
+STAGES = ['ConvertToRow', 'HydroScenario', 'H5AddVelocity',
+          'H5PrepareAndExtractData', 'H5Summary', 'H5AssembleTables',
+          'MakeVarKS', 'WriteTable']
+
+SCENARIO = 'OMR-7000'
+
+
+def valid_scale(s):
+    """ An ArgParse Validator for the --scales Input on CMD
+
+    Parameters
+    ----------
+    s: string
+        `s` is one --scales entry in the CHANNELSxDAYS format, e.g. 521x20.
+
+    Returns
+    -------
+    anonymous: tuple
+        (channels, days) as integers.
+
+    """
+    try:
+        channels, days = [int(x) for x in s.lower().split('x')]
+        assert channels > 0 and days > 0
+        return channels, days
+    except (ValueError, AssertionError):
+        msg = "Not a valid scale: '{0}'. Must be CHANNELSxDAYS, e.g. 521x20."\
+              .format(s)
+        logging.error(msg)
+        raise argparse.ArgumentTypeError(msg)
+
+
+def ScaleKey(channels, days):
+    """ The history file key of a scale, e.g. 521x20 """
+    return '{}x{}'.format(channels, days)
+
+
+def ReadDss(dss_pathname):
+    """ Reads every record of a *.dss file into one column-based DataFrame
+
+    This mirrors the read-in of CVP_BDO_WIIN.dss in MainDSS, so ConvertToRow
+    and HydroScenario are benchmarked on the same DataFrame layout.
+
+    Parameters
+    ----------
+    dss_pathname: string
+        `dss_pathname` is the absolute file pathname of CVP_BDO_WIIN.dss.
+
+    Returns
+    -------
+    readin_hydro_df: pandas DataFrame
+        `readin_hydro_df` has one "{pathname};{unit}" column per record.
+
+    """
+    dss_file_obj = pyhecdss.DSSFile(dss_pathname)
+    catalog_df = dss_file_obj.read_catalog()
+    frames = []
+    for n in dss_file_obj.get_pathnames(catalog_df):
+        temp_df, temp_unit, temp_type = dss_file_obj.read_rts(n)
+        temp_df.columns = ["{};{}".format(temp_df.columns.tolist()[0],
+                           temp_unit)]
+        frames.append(temp_df)
+    dss_file_obj.close()
+    return pd.concat(frames, axis=1)
+
+
+@contextlib.contextmanager
+def QuietPostProcessor():
+    """ Silences the INFO messages of the post-processor and the generator,
+    which log every step, while they run """
+    logging.disable(logging.INFO)
+    try:
+        yield
+    finally:
+        logging.disable(logging.NOTSET)
+
+
+def CopyOutputDict(output_dict):
+    """ Copies the DataFrames of an output_dict
+
+    H5Summary adds keys to the inner dictionaries and H5AssembleTables
+    inserts columns into the summary DataFrames, so every timed call gets
+    its own copy.
+
+    """
+    return {scenario_key: {variable_key: df.copy()
+                           for variable_key, df in variables.items()}
+            for scenario_key, variables in output_dict.items()}
+
+
+def MeasureStage(func, setup, repeat):
+    """ Times a stage and measures its peak memory
+
+    Parameters
+    ----------
+    func: function
+        `func` runs the stage on the arguments `setup` returns.
+
+    setup: function
+        `setup` prepares fresh inputs for one call of `func`, outside the
+        timing, e.g. copying DataFrames or *.h5 files the stage modifies.
+
+    repeat: int
+        `repeat` is the number of timed calls.
+
+    Returns
+    -------
+    result: dict
+        `result` holds the minimum and median seconds of the timed calls and
+        the peak memory in MB of one more call under tracemalloc, which is
+        kept apart because tracing slows the calls down.
+
+    Notes
+    -----
+    The peak is the most memory the stage allocated through Python and
+    numpy on top of what was allocated when it started; buffers allocated
+    inside h5py/HDF5 itself are not seen by tracemalloc.
+
+    """
+    seconds = []
+    for i in range(repeat):
+        args = setup()
+        start = time.perf_counter()
+        output = func(*args)
+        seconds.append(time.perf_counter() - start)
+        del output
+    args = setup()
+    tracemalloc.start()
+    try:
+        output = func(*args)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'min_s': round(min(seconds), 5),
+            'median_s': round(statistics.median(seconds), 5),
+            'peak_mb': round(peak / 2**20, 3)}, output
+
+
+def BenchmarkScale(channels, days, ini_dict, work_dir):
+    """ Benchmarks every stage at one scale of synthetic DSM2 output
+
+    Parameters
+    ----------
+    channels: int
+        `channels` is the number of channels in the synthetic tidefiles.
+
+    days: int
+        `days` is the length of the forecast period in days.
+
+    ini_dict: dict
+        `ini_dict` is the initialization dictionary from the cmd user inputs
+        read in by the argparse library.
+
+    work_dir: string
+        `work_dir` is the absolute folder pathname the synthetic files and
+        tables are written to.
+
+    Returns
+    -------
+    results: dict
+        `results` maps each selected stage to its MeasureStage result.
+
+    """
+    scale_dir = os.path.join(work_dir, ScaleKey(channels, days))
+    synthetic_dict = {"output_dir": scale_dir, "run_name": "benchmark",
+                      "scenarios": [SCENARIO],
+                      "forecast_start": ini_dict.get("forecast_start"),
+                      "days": days,
+                      "warmup_days": ini_dict.get("warmup_days"),
+                      "channels": channels, "tidal_amplitude": 1.5,
+                      "diurnal_ratio": 0.4, "spring_neap": 0.3,
+                      "scenario_shift": 0.1, "noise": 0.02,
+                      "seed": ini_dict.get("seed")}
+    with QuietPostProcessor():
+        synthetic.MainSynthetic(synthetic_dict)
+    forecast_start = ini_dict.get("forecast_start")
+    forecast_end = forecast_start + pd.Timedelta(days=days)
+    run_id = 'benchmark_{}_{}_{}'.format(SCENARIO,
+                                         forecast_start.strftime('%Y%m%d'),
+                                         forecast_end.strftime('%Y%m%d'))
+    run_dict = {"run_id": run_id,
+                "name_dict": {'A': 'Baseline', 'B': SCENARIO},
+                "forecast_start": forecast_start,
+                "forecast_end": forecast_end}
+    raw_h5_dir = os.path.join(scale_dir, run_id, 'h5')
+    h5_dir = os.path.join(scale_dir, 'h5_velocity')
+    table_dir = os.path.join(scale_dir, 'tables')
+    os.makedirs(table_dir, exist_ok=True)
+
+    def FreshH5():
+        # H5AddVelocity writes into the *.h5 files, so each call gets
+        # untouched copies
+        if os.path.exists(h5_dir):
+            shutil.rmtree(h5_dir)
+        shutil.copytree(raw_h5_dir, h5_dir)
+        return (h5_dir,)
+
+    selected = ini_dict.get("stages")
+    results = {}
+    repeat = ini_dict.get("repeat")
+
+    # every stage runs, to give the next its input, but only the selected
+    # stages are repeated and measured
+    def Run(stage, func, setup):
+        if stage in selected:
+            logging.info('Benchmarking {} at {} channels x {} days'
+                         .format(stage, channels, days))
+            with QuietPostProcessor():
+                results[stage], output = MeasureStage(func, setup, repeat)
+            return output
+        with QuietPostProcessor():
+            return func(*setup())
+
+    readin_hydro_df = ReadDss(os.path.join(scale_dir, run_id, 'dss',
+                                           'CVP_BDO_WIIN.dss'))
+    row_hydro_df = Run('ConvertToRow', post.ConvertToRow,
+                       lambda: (run_id, readin_hydro_df))
+    hydro_df = Run('HydroScenario', post.HydroScenario,
+                   lambda: (row_hydro_df.copy(), run_dict))
+    Run('H5AddVelocity', post.H5AddVelocity, FreshH5)
+    output_dict = Run('H5PrepareAndExtractData', post.H5PrepareAndExtractData,
+                      lambda: (h5_dir, scale_dir, run_dict.get("name_dict")))
+    with QuietPostProcessor():
+        output_dict = post.H5CutDataToForecastTime(output_dict,
+                                                   forecast_start,
+                                                   forecast_end)
+    output_dict = Run('H5Summary', post.H5Summary,
+                      lambda: (CopyOutputDict(output_dict),))
+    VarTotal, VarSummary = Run('H5AssembleTables', post.H5AssembleTables,
+                               lambda: (CopyOutputDict(output_dict),
+                                        run_dict))
+    VarKS = Run('MakeVarKS', post.MakeVarKS, lambda: (VarTotal, run_dict))
+    tables = {'HydroTable': hydro_df, 'VarTotal': VarTotal,
+              'VarSummary': VarSummary, 'VarKS': VarKS}
+
+
+    def WriteTables(table_format):
+        for table_name, df in tables.items():
+            post.WriteTable(df, table_dir, table_name, table_format)
+        return 0
+    Run('WriteTable', WriteTables,
+        lambda: (ini_dict.get("table_format"),))
+    for stage, result in results.items():
+        logging.info('{} {}x{}: min {} s, median {} s, peak {} MB'
+                     .format(stage, channels, days, result['min_s'],
+                             result['median_s'], result['peak_mb']))
+    return results
+
+
+def CompareHistory(entry, history, tolerance):
+    """ Compares a benchmark entry with the latest entry in the history
+
+    Parameters
+    ----------
+    entry: dict
+        `entry` is this run's entry, with its results by scale and stage.
+
+    history: list
+        `history` is the list of earlier entries from the history file.
+
+    tolerance: float
+        `tolerance` is the percent a median time or peak memory may rise
+        before it is reported as a regression.
+
+    Returns
+    -------
+    regressions: list
+        `regressions` describes each stage that got slower or bigger.
+
+    """
+    regressions = []
+    if not history:
+        logging.info('No earlier benchmark to compare with')
+        return regressions
+    previous = history[-1]
+    logging.info('Comparing with {} ({})'.format(previous.get("label"),
+                                                 previous.get("created")))
+    for scale, stages in entry['results'].items():
+        for stage, result in stages.items():
+            before = previous['results'].get(scale, {}).get(stage)
+            if before is None:
+                continue
+            for metric in ['median_s', 'peak_mb']:
+                if not before[metric]:
+                    continue
+                change = 100. * (result[metric] / before[metric] - 1)
+                logging.info('{} {} {}: {} -> {} ({:+.1f}%)'.format(
+                    scale, stage, metric, before[metric], result[metric],
+                    change))
+                if change > tolerance:
+                    regressions.append('{} {} {} {} was {}'.format(
+                        scale, stage, metric, result[metric],
+                        before[metric]))
+    return regressions
+
+
+def MainBenchmark(ini_dict, dir_name):
+    """ Benchmarks the post-processor stages at each scale and stores the
+    results in the history file
+
+    Parameters
+    ----------
+    ini_dict: dict
+        `ini_dict` is the initialization dictionary from the cmd user inputs
+        read in by the argparse library.
+
+    dir_name: string
+        `dir_name` is the absolute folder pathname for where this python tool
+        resides.
+
+    Returns
+    -------
+    regressions: list
+        `regressions` from CompareHistory, empty without --compare.
+
+    """
+    work_dir = ini_dict.get("work_dir") or tempfile.mkdtemp(
+        prefix='dsm2bdoomr_benchmark_')
+    logging.info('Writing the synthetic inputs to {}'.format(work_dir))
+    entry = {"created": datetime.datetime.now().isoformat(),
+             "label": ini_dict.get("label"),
+             "python": platform.python_version(),
+             "numpy": np.__version__, "pandas": pd.__version__,
+             "repeat": ini_dict.get("repeat"),
+             "warmup_days": ini_dict.get("warmup_days"),
+             "table_format": ini_dict.get("table_format"),
+             "results": {}}
+    try:
+        for channels, days in ini_dict.get("scales"):
+            entry["results"][ScaleKey(channels, days)] = BenchmarkScale(
+                channels, days, ini_dict, work_dir)
+    finally:
+        if not ini_dict.get("work_dir"):
+            shutil.rmtree(work_dir, ignore_errors=True)
+    history_pathname = (ini_dict.get("history") or
+                        os.path.join(dir_name, "benchmark_history.json"))
+    history = []
+    if os.path.exists(history_pathname):
+        with open(history_pathname) as history_file:
+            history = json.load(history_file)
+    regressions = []
+    if ini_dict.get("compare"):
+        regressions = CompareHistory(entry, history,
+                                     ini_dict.get("tolerance"))
+    if not ini_dict.get("no_save"):
+        history.append(entry)
+        with open(history_pathname, 'w') as history_file:
+            json.dump(history, history_file, indent=2)
+        logging.info('Added the results to {}'.format(history_pathname))
+    return regressions
+
+
+if __name__ == "__main__":
+    # begin the code's start clock
+    start = datetime.datetime.now()
+    # create the command line parser object from argparse
+    parser = argparse.ArgumentParser(
+        description="Times each stage of dsm2bdoomr_post_pyhecdss.py and \
+        measures its peak memory on synthetic DSM2 output at several scales, \
+        and keeps the results in a history file to compare changes against")
+    parser.add_argument("--scales", "-s", type=valid_scale, nargs="+",
+                        default=[(50, 5), (200, 20), (521, 20)],
+                        help="Scales as CHANNELSxDAYS, e.g. 50x5 521x20 \
+                        (DSM2 has 521 channels)")
+    parser.add_argument("--stages", type=str, nargs="+", default=STAGES,
+                        choices=STAGES,
+                        help="Stages to measure; the others still run to \
+                        give the next stage its input")
+    parser.add_argument("--repeat", "-n", type=int, default=3,
+                        help="Timed calls of each stage")
+    parser.add_argument("--warmup_days", type=int, default=14,
+                        help="Synthetic days before the forecast start")
+    parser.add_argument("--forecast_start", "-fs",
+                        type=synthetic.valid_date,
+                        default=pd.Timestamp("2019-02-05"),
+                        help="Forecast start date in the YYYY-MM-DD format")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Random seed of the synthetic inputs")
+    parser.add_argument("--table_format", "-tf", type=str, default="csv",
+                        choices=["csv", "parquet", "both"],
+                        help="Format of the WriteTable stage")
+    parser.add_argument("--work_dir", type=str,
+                        help="Folder for the synthetic inputs and tables, \
+                        kept afterwards; a temporary folder if not given")
+    parser.add_argument("--history", type=str,
+                        help="History JSON file, by default \
+                        benchmark_history.json next to this tool")
+    parser.add_argument("--label", "-l", type=str, default="",
+                        help="Label of this run in the history, e.g. the \
+                        change being measured")
+    parser.add_argument("--compare", "-c", action="store_true",
+                        help="Compare with the latest run in the history and \
+                        exit with an error on a regression")
+    parser.add_argument("--tolerance", type=float, default=20.,
+                        help="Percent a median time or peak memory may rise \
+                        before --compare calls it a regression")
+    parser.add_argument("--no_save", action="store_true",
+                        help="Do not add this run to the history")
+    args = parser.parse_args()
+    if args.repeat < 1:
+        parser.error("--repeat must be at least 1")
+    ini_dict = vars(args)
+    # determine the absolute file pathname of this *.py file
+    abspath = os.path.abspath(__file__)
+    # from the absolute file pathname determined above,
+    # extract the directory path
+    dir_name = os.path.dirname(abspath)
+    # creates the log file pathname which is an input to CreateLogger
+    log_name = os.path.join(dir_name, "log_benchmark_{}.log"
+                            .format(datetime.datetime.date(start)))
+    # generic CreateLogger function which creates two loggers
+    # one for the logfile write out and one for the on-screen stream write out
+    logger = post.CreateLogger(log_name)
+    for k in ini_dict.keys():
+        logging.info("user key input: {} \n set to: {}".format(k, ini_dict.
+                                                               get(k)))
+    regressions = MainBenchmark(ini_dict, dir_name)
+    # end the code's clock and reports runtime
+    elapsed_time = datetime.datetime.now() - start
+    logging.info("Runtime: {} seconds".format(elapsed_time))
+    if regressions:
+        logging.error("Regressions against the history: \n{}"
+                      .format("\n".join(regressions)))
+        sys.exit(1)
@@ -0,0 +1,442 @@
+# Required imported python libraries
+# Python default libraries, no need to install
+import os
+import datetime
+import logging
+import argparse
+# pyhecdss writes the CVP_BDO_WIIN.dss file, as in the pre-processor
+# Current github repo for pyhecdss:
+# https://github.com/CADWRDeltaModeling/pyhecdss
+import pyhecdss
+# Other data I/O libraries
+import h5py
+# Data manipulation libraries
+import numpy as np
+import pandas as pd
+
+# Global pyhecdss variables
+pyhecdss.set_message_level(0)
+pyhecdss.set_program_name('PYTHON')
+
+# tidal constituent periods in hours: principal lunar semidiurnal (M2),
+# lunisolar diurnal (K1) and the spring-neap cycle of their beat
+M2_PERIOD = 12.42
+K1_PERIOD = 23.93
+SPRING_NEAP_PERIOD = 14.77 * 24
+
+# the eight nodes the web tool's channel node tables show, written to
+# CVP_BDO_WIIN.dss as HydroTable records
+DSS_NODES = ['CHAN012', 'CHAN049', 'CHAN050', 'CHAN094', 'CHAN124',
+             'CHAN148', 'CHAN422', 'CHAN423']
+
+# DSM2 tidefiles store each channel's values at both of its ends
+CHANNEL_LOCATIONS = [b'upstream', b'downstream']
+
+
+def CreateLogger(log_file):
+    """ Zack's Generic Logger function to create onscreen and file logger
+
+    Parameters
+    ----------
+    log_file: string
+        `log_file` is the string of the absolute filepathname for writing the
+        log file too which is a mirror of the onscreen display.
+
+    Returns
+    -------
+    logger: logging object
+
+    Notes
+    -----
+    This function is completely generic and can be used in any python code.
+    The handler.setLevel can be adjusted from logging.INFO to any of the other
+    options such as DEBUG, ERROR, WARNING in order to restrict what is logged.
+
+    """
+    logger = logging.getLogger()
+    logger.setLevel(logging.INFO)
+    # create console handler and set level to info
+    handler = logging.StreamHandler()
+    handler.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(levelname)s - %(message)s")
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    # create error file handler and set level to info
+    handler = logging.FileHandler(log_file,  "w", encoding=None, delay="true")
+    handler.setLevel(logging.INFO)
+    formatter = logging.Formatter("%(levelname)s - %(message)s")
+    handler.setFormatter(formatter)
+    logger.addHandler(handler)
+    return logger
+
+
+def valid_date(s):
+    """ An ArgParse Validator for the --forecast_start Input on CMD
+
+    Parameters
+    ----------
+    s: string (date)
+        `s` is a date string input from the user for the --forecast_start
+        command line input
+
+    Returns
+    -------
+    anonymous: pandas datetime Timestamp
+
+    Raises
+    ------
+    ValueError:
+        `msg` is passed to argparse.ArgumentTypeError to stop the script at
+        the command line input checks/parsing to immediately notify the user
+        if the input date string cannot be converted
+
+    """
+    try:
+        return pd.to_datetime(s, format="%Y-%m-%d")
+    except ValueError:
+        msg = "Not a valid date: '{0}'. Must be YYYY-MM-DD.".format(s)
+        logging.error(msg)
+        raise argparse.ArgumentTypeError(msg)
+
+
+def ChannelParameters(channel_numbers, seed):
+    """ Draws the mean flow, tidal amplitude, tidal phase and cross-section
+    area of each channel
+
+    Each channel's parameters come from its own random generator seeded with
+    (`seed`, channel number), so a channel looks the same whatever the
+    --channels count and the DSS node records match the tidefile channels.
+
+    Parameters
+    ----------
+    channel_numbers: list
+        `channel_numbers` is the list of DSM2 channel numbers.
+
+    seed: int
+        `seed` is the --seed argument.
+
+    Returns
+    -------
+    params: dict
+        `params` maps 'mean_flow', 'tidal_ratio', 'phase' and 'area' to
+        arrays with one value per channel.
+
+    """
+    params = {'mean_flow': [], 'tidal_ratio': [], 'phase': [], 'area': []}
+    for c in channel_numbers:
+        rng = np.random.default_rng([seed, c])
+        # net channel flows span from a few cfs in dead-end sloughs to
+        # tens of thousands of cfs in the Sacramento River
+        params['mean_flow'].append(rng.lognormal(mean=7., sigma=1.2))
+        params['tidal_ratio'].append(rng.uniform(0.5, 1.5))
+        # the tide arrives later the further a channel is from the bay
+        params['phase'].append(rng.uniform(0., 2. * np.pi))
+        params['area'].append(rng.uniform(500., 20000.))
+    return {k: np.array(v) for k, v in params.items()}
+
+
+def TidalSeries(hours, params, ini_dict, lag_hours=0.):
+    """ The flow and area of every channel at every 15 minute time step
+
+    Flow is the channel's mean flow plus an M2 and K1 tide whose amplitude
+    swells and fades over the spring-neap cycle, so strongly tidal channels
+    reverse. Area rises and falls a quarter period out of phase with the
+    flow, as the stage does.
+
+    Parameters
+    ----------
+    hours: numpy array
+        `hours` is the simulation time of each step in hours.
+
+    params: dict
+        `params` are the ChannelParameters of the channels.
+
+    ini_dict: dict
+        `ini_dict` is the initialization dictionary from the cmd arguments
+        provided by the user.
+
+    lag_hours: float
+        `lag_hours` delays the tide, e.g. to the downstream channel end.
+
+    Returns
+    -------
+    flow, area: numpy arrays
+        `flow` and `area` are float32 arrays of shape (time, channel).
+
+    """
+    t = (hours - lag_hours)[:, np.newaxis]
+    phase = params['phase'][np.newaxis, :]
+    envelope = 1. + ini_dict.get("spring_neap") * np.cos(
+        2. * np.pi * t / SPRING_NEAP_PERIOD)
+    m2 = 2. * np.pi * t / M2_PERIOD - phase
+    k1 = 2. * np.pi * t / K1_PERIOD - phase / 2.
+    tide = envelope * (np.cos(m2) + ini_dict.get("diurnal_ratio") * np.cos(k1))
+    amplitude = (ini_dict.get("tidal_amplitude") * params['tidal_ratio'] *
+                 params['mean_flow'])[np.newaxis, :]
+    flow = params['mean_flow'][np.newaxis, :] + amplitude * tide
+    area = params['area'][np.newaxis, :] * (1. + 0.1 * np.sin(m2))
+    return flow.astype(np.float32), area.astype(np.float32)
+
+
+def ScenarioFlows(flow, params, forecast_mask, scenario_index, ini_dict):
+    """ Adds a scenario's operations and model noise to a flow array
+
+    The baseline (`scenario_index` 0) keeps the tidal flow; each scenario
+    shifts every channel's net flow by its own random fraction of the mean
+    flow, scaled by --scenario_shift, but only within the forecast period,
+    since the DSM2 runs share their warm-up history.
+
+    Parameters
+    ----------
+    flow: numpy array
+        `flow` is the (time, channel) TidalSeries flow, changed in place.
+
+    params: dict
+        `params` are the ChannelParameters of the channels.
+
+    forecast_mask: numpy array
+        `forecast_mask` is True for the time steps of the forecast period.
+
+    scenario_index: int
+        `scenario_index` is 0 for the baseline and 1, 2, ... for the
+        --scenarios in order.
+
+    ini_dict: dict
+        `ini_dict` is the initialization dictionary from the cmd arguments
+        provided by the user.
+
+    Returns
+    -------
+    flow: numpy array
+        `flow` with the scenario shift and noise added.
+
+    """
+    rng = np.random.default_rng([ini_dict.get("seed"), 0, scenario_index])
+    noise = rng.normal(0., ini_dict.get("noise"), size=flow.shape)
+    flow += (noise * params['mean_flow'][np.newaxis, :]).astype(np.float32)
+    if scenario_index > 0:
+        shift = (rng.normal(0., ini_dict.get("scenario_shift"),
+                            size=flow.shape[1]) * params['mean_flow'])
+        flow[forecast_mask] += shift.astype(np.float32)
+    return flow
+
+
+def WriteTideFile(h5_pathname, channel_numbers, flow, area, start_time):
+    """ Writes a DSM2 hydro tidefile with the datasets the post-processor
+    reads
+
+    Parameters
+    ----------
+    h5_pathname: string
+        `h5_pathname` is the absolute file pathname of the *.h5 file, whose
+        basename ends with the scenario letter, e.g. synthetic_A.h5.
+
+    channel_numbers: list
+        `channel_numbers` is the list of DSM2 channel numbers.
+
+    flow, area: numpy arrays
+        `flow` and `area` are float32 arrays of shape (time, channel,
+        location) for the 'channel flow' and 'channel area' datasets.
+
+    start_time: pandas datetime
+        `start_time` is the time of the first step.
+
+    """
+    with h5py.File(h5_pathname, 'w') as h5f:
+        h5f.create_dataset('/hydro/geometry/channel_number',
+                           data=np.array(channel_numbers, dtype=np.int32))
+        h5f.create_dataset('/hydro/geometry/channel_location',
+                           data=np.array(CHANNEL_LOCATIONS, dtype='S10'))
+        for name, data in [('channel flow', flow), ('channel area', area)]:
+            dataset = h5f.create_dataset('/hydro/data/{}'.format(name),
+                                         data=data)
+            # DSM2 stores the attributes as one element string arrays
+            dataset.attrs['interval'] = np.array([b'15min'])
+            dataset.attrs['start_time'] = np.array(
+                [start_time.strftime('%Y-%m-%d %H:%M:%S').encode('UTF-8')])
+    logging.info('Wrote tidefile {} with flow/area shape {}'
+                 .format(h5_pathname, flow.shape))
+    return 0
+
+
+def WriteNodeDss(dss_pathname, node_series, date_range):
+    """ Writes the node FLOW and VEL records of CVP_BDO_WIIN.dss
+
+    Parameters
+    ----------
+    dss_pathname: string
+        `dss_pathname` is the absolute file pathname of CVP_BDO_WIIN.dss.
+
+    node_series: dict
+        `node_series` maps (scenario letter, node, variable) to the node's
+        15 minute values.
+
+    date_range: pandas DatetimeIndex
+        `date_range` is the time of each value.
+
+    """
+    units = {'FLOW': 'CFS', 'VEL': 'FT/S'}
+    if os.path.exists(dss_pathname):
+        os.remove(dss_pathname)
+    dss_file_obj = pyhecdss.DSSFile(dss_pathname, create_new=True)
+    for (letter, node, variable), values in sorted(node_series.items()):
+        # the post-processor reads the scenario letter from the end of the
+        # F part, e.g. BDO-WIIN-A
+        pathname = '/DSM2/{}/{}//15MIN/BDO-WIIN-{}/'.format(node, variable,
+                                                             letter)
+        temp_df = pd.DataFrame({pathname: values.astype(np.float64)},
+                               index=date_range)
+        dss_file_obj.write_rts(pathname, temp_df, units.get(variable),
+                               'INST-VAL')
+    dss_file_obj.close()
+    logging.info('Wrote {} records to {}'.format(len(node_series),
+                                                 dss_pathname))
+    return 0
+
+
+def MainSynthetic(ini_dict):
+    """ Writes a tidefile pair and CVP_BDO_WIIN.dss for every scenario
+
+    Each scenario gets a folder named after its run_id holding h5/ (the
+    baseline {run_name}_A.h5 and scenario {run_name}_B.h5) and dss/
+    (CVP_BDO_WIIN.dss), ready for dsm2bdoomr_post_pyhecdss.py --dirh5 and
+    --dirdss. The command line for each is logged at the end.
+
+    Parameters
+    ----------
+    ini_dict: dict
+        `ini_dict` is the initialization dictionary from the cmd user inputs
+        read in by the argparse library.
+
+    """
+    forecast_start = ini_dict.get("forecast_start")
+    forecast_end = forecast_start + pd.Timedelta(days=ini_dict.get("days"))
+    simulation_start = forecast_start - pd.Timedelta(
+        days=ini_dict.get("warmup_days"))
+    date_range = pd.date_range(simulation_start, forecast_end, freq='15T')
+    hours = ((date_range - simulation_start) / pd.Timedelta(hours=1)).values
+    forecast_mask = np.asarray(date_range >= forecast_start)
+    channel_numbers = list(range(1, ini_dict.get("channels") + 1))
+    node_numbers = [int(n[len('CHAN'):]) for n in DSS_NODES]
+    logging.info('Generating {} channels over {} steps from {} to {}'
+                 .format(len(channel_numbers), len(date_range),
+                         simulation_start, forecast_end))
+    # the tidefile channels and the DSS nodes share one set of parameters
+    params = ChannelParameters(channel_numbers + node_numbers,
+                               ini_dict.get("seed"))
+    # the downstream end sees the tide about 20 minutes later
+    flow_up, area_up = TidalSeries(hours, params, ini_dict)
+    flow_down, area_down = TidalSeries(hours, params, ini_dict,
+                                       lag_hours=1. / 3.)
+    area = np.stack([area_up, area_down], axis=2)[:, :len(channel_numbers)]
+    commands = []
+    for i, scenario in enumerate(ini_dict.get("scenarios")):
+        run_id = '{}_{}_{}_{}'.format(ini_dict.get("run_name"), scenario,
+                                      forecast_start.strftime('%Y%m%d'),
+                                      forecast_end.strftime('%Y%m%d'))
+        h5_dir = os.path.join(ini_dict.get("output_dir"), run_id, 'h5')
+        dss_dir = os.path.join(ini_dict.get("output_dir"), run_id, 'dss')
+        os.makedirs(h5_dir, exist_ok=True)
+        os.makedirs(dss_dir, exist_ok=True)
+        node_series = {}
+        for letter, scenario_index in [('A', 0), ('B', i + 1)]:
+            flow = np.stack([ScenarioFlows(flow_up.copy(), params,
+                                           forecast_mask, scenario_index,
+                                           ini_dict),
+                             ScenarioFlows(flow_down.copy(), params,
+                                           forecast_mask, scenario_index,
+                                           ini_dict)], axis=2)
+            WriteTideFile(os.path.join(h5_dir, '{}_{}.h5'.format(
+                              ini_dict.get("run_name"), letter)),
+                          channel_numbers, flow[:, :len(channel_numbers)],
+                          area, simulation_start)
+            for j, node in enumerate(DSS_NODES):
+                column = len(channel_numbers) + j
+                node_series[(letter, node, 'FLOW')] = flow[:, column, 0]
+                node_series[(letter, node, 'VEL')] = (flow[:, column, 0] /
+                                                      area_up[:, column])
+        WriteNodeDss(os.path.join(dss_dir, 'CVP_BDO_WIIN.dss'), node_series,
+                     date_range)
+        commands.append(
+            'python dsm2bdoomr_post_pyhecdss.py --dirdss {} --dirh5 {} '
+            '-r {} -nd "{{\'A\':\'Baseline\',\'B\':\'{}\'}}" -fs {} -fe {}'
+            .format(dss_dir, h5_dir, run_id, scenario,
+                    forecast_start.strftime('%Y-%m-%d'),
+                    forecast_end.strftime('%Y-%m-%d')))
+    for command in commands:
+        logging.info('Post-process with:\n{}'.format(command))
+    return commands
+
+
+if __name__ == "__main__":
+    # begin the code's start clock
+    start = datetime.datetime.now()
+    # create the command line parser object from argparse
+    parser = argparse.ArgumentParser(
+        description="Writes synthetic DSM2 hydro tidefiles and a matching \
+        CVP_BDO_WIIN.dss for benchmarking and profiling the post-processor \
+        and the web tool without real DSM2 runs")
+    parser.add_argument("--output_dir", "-o", type=str, required=True,
+                        help="Provide full folder path to write the run \
+                        folders to")
+    parser.add_argument("--run_name", "-rn", type=str, default="synthetic",
+                        help="Start of each run_id and the *.h5 basenames")
+    parser.add_argument("--scenarios", "-s", type=str, nargs="+",
+                        default=["OMR-7000"],
+                        help="Scenario names, each compared with its own \
+                        baseline run; the web tool expects them to contain \
+                        OMR")
+    parser.add_argument("--channels", "-c", type=int, default=521,
+                        help="Number of channels, numbered from 1 \
+                        (DSM2 has 521)")
+    parser.add_argument("--forecast_start", "-fs", type=valid_date,
+                        default=pd.Timestamp("2019-02-05"),
+                        help="Forecast start date in the YYYY-MM-DD format")
+    parser.add_argument("--days", "-d", type=int, default=20,
+                        help="Length of the forecast period in days")
+    parser.add_argument("--warmup_days", type=int, default=14,
+                        help="Days simulated before the forecast start, \
+                        which the post-processor cuts off")
+    parser.add_argument("--tidal_amplitude", type=float, default=1.5,
+                        help="Tidal flow amplitude as a multiple of a \
+                        channel's mean flow; above 1 the tide reverses the \
+                        flow")
+    parser.add_argument("--diurnal_ratio", type=float, default=0.4,
+                        help="K1 (diurnal) amplitude relative to M2 \
+                        (semidiurnal)")
+    parser.add_argument("--spring_neap", type=float, default=0.3,
+                        help="Depth of the spring-neap modulation of the \
+                        tide, from 0 to 1")
+    parser.add_argument("--scenario_shift", type=float, default=0.1,
+                        help="Standard deviation of a scenario's change to \
+                        each channel's net flow, as a fraction of its mean \
+                        flow")
+    parser.add_argument("--noise", type=float, default=0.02,
+                        help="Standard deviation of the 15 minute noise, as a \
+                        fraction of the mean flow")
+    parser.add_argument("--seed", type=int, default=0,
+                        help="Random seed; the same arguments and seed write \
+                        the same data")
+    args = parser.parse_args()
+    if args.channels < 1 or args.days < 1 or args.warmup_days < 0:
+        parser.error("--channels and --days must be at least 1 and \
+                     --warmup_days at least 0")
+    ini_dict = vars(args)
+    # determine the absolute file pathname of this *.py file
+    abspath = os.path.abspath(__file__)
+    # from the absolute file pathname determined above,
+    # extract the directory path
+    dir_name = os.path.dirname(abspath)
+    # creates the log file pathname which is an input to CreateLogger
+    log_name = os.path.join(dir_name, "log_synthetic_{}.log"
+                            .format(datetime.datetime.date(start)))
+    # generic CreateLogger function which creates two loggers
+    # one for the logfile write out and one for the on-screen stream write out
+    logger = CreateLogger(log_name)
+    for k in ini_dict.keys():
+        logging.info("user key input: {} \n set to: {}".format(k, ini_dict.
+                                                               get(k)))
+    MainSynthetic(ini_dict)
+    # end the code's clock and reports runtime
+    elapsed_time = datetime.datetime.now() - start
+    logging.info("Runtime: {} seconds".format(elapsed_time))
@@ -0,0 +1,16 @@
+"""
+ASGI config for bdo_dsm2_app project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/stable/howto/deployment/asgi/
+"""
+
+import os
+
+from django.core.asgi import get_asgi_application
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'bdo_dsm2_app.settings')
+
+application = get_asgi_application()
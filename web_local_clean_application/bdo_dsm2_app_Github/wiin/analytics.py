@@ -0,0 +1,84 @@
+"""
+Optional DuckDB backend for the HydroTable aggregations.
+
+When settings.WIIN_PARQUET_DIR is set and duckdb is installed, the summary
+and channel node tables are aggregated in-process by DuckDB straight from the
+HydroTable.parquet the post-processor writes with --table_format parquet,
+found at <WIIN_PARQUET_DIR>/<run_id>/HydroTable.parquet. DuckDB reads only
+the columns the query uses instead of every row of the run going through the
+ORM into pandas. The functions return None when a run cannot be served this
+way, and the views then aggregate from the database as before.
+"""
+import os
+from django.conf import settings
+from wiin.partitions import RUN_ID_PATTERN
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+# HydroTable samples are 15 minutes apart, in microseconds for DuckDB
+SAMPLE_INTERVAL_US = 15 * 60 * 10**6
+
+# selects the same samples as pd.date_range(start, end, freq='15T').isin()
+# and skips NaN values like the pandas mean; favg is DuckDB's Kahan summed
+# mean, which is how pandas sums a groupby mean as well. utils._sample_grid
+# applies the same selection to the database queries
+RANGE_FILTER = """datetime BETWEEN $start AND $end
+    AND (epoch_us(datetime) - epoch_us($start)) % {} = 0
+    AND NOT isnan(value)""".format(SAMPLE_INTERVAL_US)
+
+
+def hydro_parquet(run_id):
+    """ Returns the HydroTable.parquet pathname of `run_id`, or None """
+    parquet_dir = getattr(settings, 'WIIN_PARQUET_DIR', None)
+    if duckdb is None or not parquet_dir or not RUN_ID_PATTERN.match(run_id):
+        return None
+    pathname = os.path.join(parquet_dir, run_id, 'HydroTable.parquet')
+    return pathname if os.path.exists(pathname) else None
+
+
+def _query(sql, params):
+    with duckdb.connect() as con:
+        return con.execute(sql, params).df()
+
+
+def summary_means(run_id, start_date, end_date):
+    """ Mean value per (variable, scenario, channel) between two datetimes
+
+    Returns the frame get_summary_table builds with its pandas groupby, or
+    None when the run has no Parquet table.
+    """
+    pathname = hydro_parquet(run_id)
+    if pathname is None:
+        return None
+    summary = _query("SELECT variable, scenario, channel, favg(value) AS value "
+                     "FROM read_parquet($path) WHERE " + RANGE_FILTER +
+                     " GROUP BY ALL",
+                     {'path': pathname, 'start': start_date.to_pydatetime(),
+                      'end': end_date.to_pydatetime()})
+    return summary.set_index(['variable', 'scenario', 'channel']).sort_index()
+
+
+def channel_daily_means(run_id, variable, channels, start_date, end_date):
+    """ Daily mean value per (channel, scenario) of one variable
+
+    Returns the Series get_channel_node_table builds with its pandas
+    Grouper, or None when the run has no Parquet table.
+    """
+    pathname = hydro_parquet(run_id)
+    if pathname is None:
+        return None
+    daily = _query("SELECT channel, scenario, "
+                   "date_trunc('day', datetime) AS datetime, "
+                   "favg(value) AS value FROM read_parquet($path) "
+                   "WHERE variable = $variable "
+                   "AND list_contains($channels, channel) AND " +
+                   RANGE_FILTER + " GROUP BY ALL",
+                   {'path': pathname, 'variable': variable,
+                    'channels': channels,
+                    'start': start_date.to_pydatetime(),
+                    'end': end_date.to_pydatetime()})
+    return (daily.set_index(['channel', 'scenario', 'datetime'])['value']
+            .sort_index())
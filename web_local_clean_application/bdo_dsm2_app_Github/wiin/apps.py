@@ -1,5 +1,10 @@
-from django.apps import AppConfig
-
-
-class WiinConfig(AppConfig):
-    name = 'wiin'
+from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+
+
+class WiinConfig(AppConfig):
+    name = 'wiin'
+
+    def ready(self):
+        from wiin.profiling import install_query_timer
+        connection_created.connect(install_query_timer)
@@ -0,0 +1,193 @@
+"""
+Streaming export of the HydroTable and VarTotal time series.
+
+Rows are read with QuerySet.iterator(), which fetches them from the database
+cursor in chunks (a server-side cursor on backends that have one), and are
+encoded and handed to a StreamingHttpResponse EXPORT_CHUNK_ROWS at a time,
+so neither side ever holds the whole export. Under ASGI the encoded chunks
+are handed over through async_stream(), since Django reads a plain iterator
+to the end before sending any of it there. Runs loaded with
+populate_db --series_only have no VarTotal rows; their VarTotalSeriesTable
+series are expanded back into rows instead.
+"""
+import csv
+import io
+import json
+import math
+import numpy as np
+import pandas as pd
+from asgiref.sync import sync_to_async
+from wiin.models import HydroTable, VarTotalTable, VarTotalSeriesTable
+from wiin.partitions import run_db
+
+try:
+    import pyarrow as pa
+except ImportError:
+    pa = None
+
+EXPORT_COLUMNS = ['run_id', 'variable', 'scenario', 'channel', 'datetime',
+                  'value']
+EXPORT_TABLES = {'hydro': HydroTable, 'vartotal': VarTotalTable}
+EXPORT_CONTENT_TYPES = {'ndjson': 'application/x-ndjson',
+                        'csv': 'text/csv',
+                        'arrow': 'application/vnd.apache.arrow.stream'}
+EXPORT_CHUNK_ROWS = 5000
+
+
+def _filters(prefix, variable, scenario, channels, start, end):
+    filters = {}
+    if variable:
+        filters['variable__variable'] = variable
+    if scenario:
+        filters['scenario__scenario'] = scenario
+    if channels:
+        filters['channel__in'] = channels
+    if start is not None:
+        filters[prefix + '__gte'] = start
+    if end is not None:
+        filters[prefix + '__lte'] = end
+    return filters
+
+
+def _series_rows(using, run, variable, scenario, channels, start, end):
+    series_query = (VarTotalSeriesTable.objects.using(using)
+                    .filter(run_id__run_id=run,
+                            **_filters('start', variable, scenario, channels,
+                                       None, end))
+                    .order_by('id')
+                    .values_list('run_id__run_id', 'variable__variable',
+                                 'scenario__scenario', 'channel', 'start',
+                                 'interval', 'count', 'values'))
+    for (run_id, var, scen, channel, first, interval, count,
+         values) in series_query.iterator(chunk_size=100):
+        datetimes = pd.date_range(first, periods=count,
+                                  freq=pd.Timedelta(seconds=interval))
+        data_arr = np.frombuffer(values, dtype='<f4', count=count)
+        keep = ~np.isnan(data_arr)
+        if start is not None:
+            keep &= datetimes >= start
+        if end is not None:
+            keep &= datetimes <= end
+        for timestamp, value in zip(datetimes[keep].to_pydatetime(),
+                                    data_arr[keep].tolist()):
+            yield run_id, var, scen, channel, timestamp, value
+
+
+def export_rows(table, run, variable=None, scenario=None, channels=None,
+                start=None, end=None):
+    """ Yields the (EXPORT_COLUMNS) rows of one run, in load order
+
+    Parameters
+    ----------
+    table : str
+        'hydro' or 'vartotal'
+    run : str
+        The run_id name
+    variable, scenario : str, optional
+        Only this variable / scenario
+    channels : list, optional
+        Only these channels
+    start, end : datetime.datetime, optional
+        Inclusive time range
+    """
+    using = run_db(run)
+    model = EXPORT_TABLES[table]
+    if (model is VarTotalTable and
+            not VarTotalTable.objects.using(using)
+            .filter(run_id__run_id=run).exists()):
+        yield from _series_rows(using, run, variable, scenario, channels,
+                                start, end)
+        return
+    row_query = (model.objects.using(using)
+                 .filter(run_id__run_id=run,
+                         **_filters('datetime', variable, scenario, channels,
+                                    start, end)))
+    yield from (row_query.order_by('id')
+                .values_list('run_id__run_id', 'variable__variable',
+                             'scenario__scenario', 'channel', 'datetime',
+                             'value')
+                .iterator(chunk_size=EXPORT_CHUNK_ROWS))
+
+
+def _chunks(rows):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) == EXPORT_CHUNK_ROWS:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _json_value(value):
+    # NaN is not valid JSON
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+
+def ndjson_stream(rows):
+    for chunk in _chunks(rows):
+        yield ''.join(json.dumps({'run_id': run_id, 'variable': variable,
+                                  'scenario': scenario, 'channel': channel,
+                                  'datetime': timestamp.isoformat(),
+                                  'value': _json_value(value)}) + '\n'
+                      for (run_id, variable, scenario, channel, timestamp,
+                           value) in chunk)
+
+
+def csv_stream(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for chunk in _chunks(rows):
+        writer.writerows(row[:4] + (row[4].isoformat(), row[5])
+                         for row in chunk)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+def arrow_stream(rows, table):
+    """ Arrow IPC stream, one record batch per chunk; needs pyarrow """
+    schema = pa.schema([('run_id', pa.string()), ('variable', pa.string()),
+                        ('scenario', pa.string()),
+                        ('channel', pa.string() if table == 'hydro'
+                         else pa.int32()),
+                        ('datetime', pa.timestamp('us')),
+                        ('value', pa.float64())])
+    sink = io.BytesIO()
+    writer = pa.ipc.new_stream(sink, schema)
+
+    def drain():
+        data = sink.getvalue()
+        sink.seek(0)
+        sink.truncate()
+        return data
+
+    for chunk in _chunks(rows):
+        columns = list(zip(*chunk))
+        # naive UTC, as the naive datetimes the database stores
+        columns[4] = [t.replace(tzinfo=None) for t in columns[4]]
+        writer.write_batch(pa.record_batch(
+            [pa.array(c, type=f.type) for c, f in zip(columns, schema)],
+            schema=schema))
+        yield drain()
+    writer.close()
+    yield drain()
+
+
+async def async_stream(stream):
+    """ The chunks of a *_stream() generator as an async iterator
+
+    Each chunk is produced by sync_to_async in the request's thread, the
+    thread the rows' database cursor belongs to, and sent before the next
+    one is read.
+    """
+    done = object()
+    next_chunk = sync_to_async(next, thread_sensitive=True)
+    while True:
+        chunk = await next_chunk(stream, done)
+        if chunk is done:
+            return
+        yield chunk
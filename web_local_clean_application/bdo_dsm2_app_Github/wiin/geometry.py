@@ -0,0 +1,189 @@
+"""
+DSM2 channel geometry from channels.geojson.
+
+The map draws the channels from TopoJSON files that build_geometry derives
+from channels.geojson, one per zoom level in ZOOM_LEVELS: each line is
+simplified (Douglas-Peucker) and its vertices quantized to half a screen
+pixel at that zoom, and only the channel_nu property is kept. The files are
+named by a hash of their content and listed in TOPOJSON_MANIFEST, so they
+can be served with far-future cache headers.
+"""
+import functools
+import gzip
+import hashlib
+import json
+import os
+import numpy as np
+from django.conf import settings
+
+GEOMETRY_DIR = os.path.join(settings.BASE_DIR, 'wiin', 'static',
+                            'local_resources', 'geom')
+CHANNELS_GEOJSON = os.path.join(GEOMETRY_DIR, 'channels.geojson')
+TOPOJSON_MANIFEST = os.path.join(GEOMETRY_DIR, 'channels_topojson.json')
+TOPOJSON_PREFIX = 'channels_z'
+
+# the map opens at zoom 11; each level serves the zooms up to it
+ZOOM_LEVELS = [9, 11, 13, 15]
+
+# Web Mercator tiles are 256 pixels wide
+TILE_SIZE = 256
+
+
+@functools.lru_cache(maxsize=1)
+def channel_coordinates():
+    """ {channel number: (n, 2) array of its lon/lat vertices} """
+    with open(CHANNELS_GEOJSON) as geojson:
+        features = json.load(geojson)['features']
+    return {int(f['properties']['channel_nu']):
+            np.array(f['geometry']['coordinates'], dtype=float)[:, :2]
+            for f in features}
+
+
+def points_in_polygon(points, polygon):
+    """ Even-odd test of each (lon, lat) point against a polygon ring """
+    x, y = points[:, 0, None], points[:, 1, None]
+    x0, y0 = polygon[:, 0], polygon[:, 1]
+    x1, y1 = np.roll(x0, -1), np.roll(y0, -1)
+    crosses = (y0 > y) != (y1 > y)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        x_cross = x0 + (y - y0) * (x1 - x0) / (y1 - y0)
+    return ((crosses & (x < x_cross)).sum(axis=1) % 2) == 1
+
+
+def channels_in_polygon(polygon):
+    """ The channels with at least one vertex inside `polygon`
+
+    Parameters
+    ----------
+    polygon : list
+        The polygon ring as [lon, lat] pairs, closed or not
+
+    Returns
+    -------
+    list
+        The sorted channel numbers
+    """
+    polygon = np.asarray(polygon, dtype=float)
+    if polygon.ndim != 2 or polygon.shape[0] < 3 or polygon.shape[1] != 2:
+        raise ValueError('polygon must be a list of at least 3 [lon, lat] '
+                         'pairs')
+    coordinates = channel_coordinates()
+    channels = sorted(coordinates)
+    points = np.concatenate([coordinates[c] for c in channels])
+    owners = np.repeat(channels, [len(coordinates[c]) for c in channels])
+    return sorted(set(owners[points_in_polygon(points, polygon)].tolist()))
+
+
+def pixel_degrees(zoom):
+    """ Degrees of longitude per screen pixel at a Leaflet zoom level """
+    return 360. / (TILE_SIZE * 2 ** zoom)
+
+
+def simplify_line(coordinates, tolerance):
+    """ Douglas-Peucker simplification keeping both end points
+
+    Parameters
+    ----------
+    coordinates : numpy.ndarray
+        (n, 2) planar coordinates
+    tolerance : float
+        The largest distance a dropped vertex may lie off the kept line
+
+    Returns
+    -------
+    numpy.ndarray
+        The kept vertices
+    """
+    keep = np.zeros(len(coordinates), dtype=bool)
+    keep[[0, -1]] = True
+    stack = [(0, len(coordinates) - 1)]
+    while stack:
+        first, last = stack.pop()
+        if last - first < 2:
+            continue
+        start, end = coordinates[first], coordinates[last]
+        inner = coordinates[first + 1:last]
+        segment = end - start
+        length = np.hypot(*segment)
+        if length == 0:
+            distances = np.hypot(*(inner - start).T)
+        else:
+            offsets = inner - start
+            distances = np.abs(segment[0] * offsets[:, 1] -
+                               segment[1] * offsets[:, 0]) / length
+        farthest = int(np.argmax(distances))
+        if distances[farthest] > tolerance:
+            split = first + 1 + farthest
+            keep[split] = True
+            stack.extend([(first, split), (split, last)])
+    return coordinates[keep]
+
+
+def build_topology(zoom):
+    """ The quantized TopoJSON Topology of the channels at one zoom level """
+    coordinates = channel_coordinates()
+    channels = sorted(coordinates)
+    points = np.concatenate([coordinates[c] for c in channels])
+    translate = points.min(axis=0)
+    # Mercator stretches latitude by 1 / cos(lat), so a pixel covers fewer
+    # degrees of latitude than of longitude
+    y_stretch = 1. / np.cos(np.radians(points[:, 1].mean()))
+    scale = np.array([1., 1. / y_stretch]) * pixel_degrees(zoom) / 2.
+    arcs = []
+    geometries = []
+    for channel in channels:
+        line = simplify_line(coordinates[channel] * [1., y_stretch],
+                             pixel_degrees(zoom) / 2.) / [1., y_stretch]
+        quantized = np.round((line - translate) / scale).astype(int)
+        deltas = np.diff(quantized, axis=0)
+        # drop the vertices that quantize onto the one before them
+        deltas = deltas[(deltas != 0).any(axis=1)]
+        if not len(deltas):
+            deltas = np.zeros((1, 2), dtype=int)
+        arcs.append(np.vstack([quantized[:1], deltas]).tolist())
+        geometries.append({'type': 'LineString', 'arcs': [len(arcs) - 1],
+                           'properties': {'channel_nu': channel}})
+    return {'type': 'Topology',
+            'bbox': np.r_[translate, points.max(axis=0)].tolist(),
+            'transform': {'scale': scale.tolist(),
+                          'translate': translate.tolist()},
+            'objects': {'channels': {'type': 'GeometryCollection',
+                                     'geometries': geometries}},
+            'arcs': arcs}
+
+
+def write_topojson(zoom_levels=ZOOM_LEVELS):
+    """ Writes the TopoJSON file (and its .gz) of every zoom level
+
+    Returns
+    -------
+    dict
+        {zoom level: file name}, as also written to TOPOJSON_MANIFEST
+    """
+    for filename in os.listdir(GEOMETRY_DIR):
+        if filename.startswith(TOPOJSON_PREFIX):
+            os.remove(os.path.join(GEOMETRY_DIR, filename))
+    manifest = {}
+    for zoom in zoom_levels:
+        content = json.dumps(build_topology(zoom),
+                             separators=(',', ':')).encode()
+        filename = '{}{}.{}.topojson'.format(
+            TOPOJSON_PREFIX, zoom, hashlib.sha256(content).hexdigest()[:12])
+        with open(os.path.join(GEOMETRY_DIR, filename), 'wb') as topojson:
+            topojson.write(content)
+        # mtime=0 so an unchanged geometry gives an identical .gz
+        with open(os.path.join(GEOMETRY_DIR, filename + '.gz'), 'wb') as gz:
+            gz.write(gzip.compress(content, compresslevel=9, mtime=0))
+        manifest[str(zoom)] = filename
+    with open(TOPOJSON_MANIFEST, 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
+
+
+def topojson_manifest():
+    """ {zoom level: file name} of the built TopoJSON files, {} if unbuilt """
+    try:
+        with open(TOPOJSON_MANIFEST) as manifest_file:
+            return json.load(manifest_file)
+    except FileNotFoundError:
+        return {}
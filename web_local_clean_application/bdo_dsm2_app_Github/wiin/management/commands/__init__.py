@@ -1,7 +1,7 @@
-# -*- coding: utf-8 -*-
-"""
-Created on Tue Oct 16 09:40:40 2018
-
-@author: zleady
-"""
-
+# -*- coding: utf-8 -*-
+"""
+Created on Tue Oct 16 09:40:40 2018
+
+@author: zleady
+"""
+
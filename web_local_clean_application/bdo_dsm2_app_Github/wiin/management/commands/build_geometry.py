@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand, CommandError
+from wiin import geometry
+import os
+import time
+
+
+class Command(BaseCommand):
+    help = 'Builds the simplified, quantized TopoJSON channel geometry the \
+            map loads (one file per zoom level, each with a gzipped copy) \
+            from wiin/static/local_resources/geom/channels.geojson. Run it \
+            again whenever channels.geojson changes.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--zoom_levels', type=int, nargs='+',
+                            default=geometry.ZOOM_LEVELS,
+                            help="Leaflet zoom levels to build, each used up \
+                            to its own zoom (default: {})".format(
+                                ' '.join(map(str, geometry.ZOOM_LEVELS))))
+
+    def handle(self, *args, **options):
+        start = time.time()
+        zoom_levels = sorted(set(options['zoom_levels']))
+        if zoom_levels[0] < 0 or zoom_levels[-1] > 19:
+            raise CommandError('Zoom levels must be between 0 and 19')
+        print('channels.geojson: {} bytes'.format(
+            os.path.getsize(geometry.CHANNELS_GEOJSON)))
+        manifest = geometry.write_topojson(zoom_levels)
+        for zoom, filename in manifest.items():
+            pathname = os.path.join(geometry.GEOMETRY_DIR, filename)
+            print('Zoom {}: {} ({} bytes, {} bytes gzipped)'.format(
+                zoom, filename, os.path.getsize(pathname),
+                os.path.getsize(pathname + '.gz')))
+        elapsed_time = time.time() - start
+        print('Runtime: {} seconds'.format(round(elapsed_time, 5)))
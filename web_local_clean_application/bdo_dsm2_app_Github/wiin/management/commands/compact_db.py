@@ -0,0 +1,144 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from wiin import metadata, partitions
+from wiin.models import RunIdTable
+import datetime
+import os
+import time
+
+
+class Command(BaseCommand):
+    help = 'Deletes the runs that fall outside a retention policy and \
+            compacts the database file. Each retired run is removed with \
+            set-based deletes cascading from its RunIdTable row (and its \
+            partition file is deleted), then the database is ANALYZEd and \
+            VACUUMed.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--keep', type=int, help="Keep the N most \
+                            recently loaded runs")
+        parser.add_argument('--newer_than', type=str, help="Keep the runs \
+                            loaded on or after this date, as YYYY-MM-DD. \
+                            With --keep as well, a run is kept when either \
+                            policy keeps it")
+        parser.add_argument('--vacuum', choices=['full', 'incremental',
+                                                 'none'], default='full',
+                            help="full (default) rebuilds the whole file; \
+                            incremental only releases the free pages, and \
+                            switches the database to auto_vacuum=INCREMENTAL \
+                            with one full VACUUM the first time it is used")
+        parser.add_argument('--dry_run', action='store_true',
+                            help="List the runs that would be deleted and \
+                            stop")
+
+    def _retired_runs(self, keep, newer_than):
+        runs = list(RunIdTable.objects.order_by('-created')
+                    .values_list('id', 'run_id', 'created'))
+        kept = set()
+        if keep is not None:
+            kept.update(pk for pk, run_id, created in runs[:keep])
+        if newer_than is not None:
+            kept.update(pk for pk, run_id, created in runs
+                        if created >= newer_than)
+        return [(pk, run_id) for pk, run_id, created in runs
+                if pk not in kept]
+
+    def _database_bytes(self):
+        pathname = connection.settings_dict['NAME']
+        return sum(os.path.getsize(p)
+                   for p in [pathname, pathname + '-wal']
+                   if os.path.exists(p))
+
+    def _timed(self, label, sql):
+        start = time.time()
+        with connection.cursor() as cursor:
+            for statement in sql:
+                cursor.execute(statement)
+        print('{} in {} seconds'.format(label, round(time.time() - start, 2)))
+
+    def _vacuum(self, mode):
+        if mode == 'full':
+            self._timed('VACUUM', ['VACUUM'])
+            return
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA auto_vacuum')
+            auto_vacuum = cursor.fetchone()[0]
+        if auto_vacuum == 2:
+            self._timed('Incremental VACUUM', ['PRAGMA incremental_vacuum'])
+        else:
+            # auto_vacuum only takes effect after the file is rebuilt
+            self._timed('Switched to auto_vacuum=INCREMENTAL with a full '
+                        'VACUUM', ['PRAGMA auto_vacuum=INCREMENTAL', 'VACUUM'])
+
+    def _drop_partitions(self):
+        """ Deletes the partition files of deleted runs and the superseded
+        versions of the others, including those a server process still had
+        open the last time """
+        loaded = set(RunIdTable.objects.values_list('run_id', flat=True))
+        run_ids = partitions.partition_run_ids()
+        partition_bytes = sum(partitions.drop_partition(r) if r not in loaded
+                              else partitions.drop_superseded(r)
+                              for r in run_ids)
+        print('Deleted {} bytes of partition files'.format(partition_bytes))
+        in_use = [r for r in run_ids
+                  if len(partitions.partition_versions(r)) > (r in loaded)]
+        if in_use:
+            print('Partition files of {} are still open in another process '
+                  'and were kept; run compact_db again later to delete them'
+                  .format(', '.join(in_use)))
+
+    def handle(self, *args, **options):
+        start = time.time()
+        keep = options['keep']
+        newer_than = options['newer_than']
+        if keep is None and newer_than is None:
+            raise CommandError('Give a retention policy with --keep and/or '
+                               '--newer_than')
+        if keep is not None and keep < 0:
+            raise CommandError('--keep must be 0 or more runs')
+        if newer_than is not None:
+            try:
+                newer_than = datetime.datetime.strptime(newer_than, '%Y-%m-%d')
+            except ValueError:
+                raise CommandError('--newer_than {} is not a YYYY-MM-DD date'
+                                   .format(newer_than))
+            if settings.USE_TZ:
+                newer_than = timezone.make_aware(newer_than)
+        retired = self._retired_runs(keep, newer_than)
+        print('Runs to delete: {}'.format(', '.join(r for pk, r in retired)
+                                          or 'none'))
+        if options['dry_run']:
+            return
+        is_sqlite = connection.vendor == 'sqlite'
+        if is_sqlite:
+            size_before = self._database_bytes()
+        if retired:
+            delete_start = time.time()
+            with transaction.atomic():
+                deleted, per_model = (RunIdTable.objects
+                                      .filter(id__in=[pk for pk, r in retired])
+                                      .delete())
+            for label, count in sorted(per_model.items()):
+                print('Deleted {} {} rows'.format(count, label))
+            print('Deleted {} rows in {} seconds'
+                  .format(deleted, round(time.time() - delete_start, 2)))
+            metadata.invalidate()
+        if partitions.partitions_enabled():
+            self._drop_partitions()
+        if not is_sqlite:
+            print('ANALYZE and VACUUM skipped, the database backend is {}'
+                  .format(connection.vendor))
+        else:
+            self._timed('ANALYZE', ['ANALYZE'])
+            if options['vacuum'] != 'none':
+                self._vacuum(options['vacuum'])
+            # fold the WAL back in so the file sizes below are final
+            self._timed('WAL checkpoint', ['PRAGMA wal_checkpoint(TRUNCATE)'])
+            size_after = self._database_bytes()
+            print('Database file: {} bytes before, {} bytes after, {} bytes '
+                  'reclaimed'.format(size_before, size_after,
+                                     size_before - size_after))
+        elapsed_time = time.time() - start
+        print('Runtime: {} seconds'.format(round(elapsed_time, 5)))
@@ -0,0 +1,93 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, connections
+from wiin import utils
+from wiin.partitions import run_db
+from wiin.models import RunIdTable, VariableTable, ScenarioTable
+
+
+class Command(BaseCommand):
+    help = 'Prints the SQLite EXPLAIN QUERY PLAN for the fact table query \
+            behind each view, to confirm it is answered through an index \
+            rather than a full table scan.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--run_id', type=str, help="Run to plan the \
+                            queries for, defaults to the latest loaded run")
+        parser.add_argument('--variable', type=str, default='FLOW',
+                            help="Variable to plan the queries for")
+        parser.add_argument('--scenario', type=str, help="Scenario compared \
+                            against the Baseline, defaults to the first \
+                            other scenario of the run")
+        parser.add_argument('--channel', type=int, default=1,
+                            help="Channel number for the map graph query")
+
+    def _view_queries(self, run, variable, baseline, scenario, channel):
+        runid = run.run_id
+        scenarios = [baseline.scenario, scenario.scenario]
+        start_date, end_date = utils.summary_dates(runid)
+        return [('get_mapgraph',
+                 utils.ecdf_queryset(runid, scenarios, variable.variable,
+                                     [channel])),
+                ('get_ecdf_batch',
+                 utils.ecdf_batch_queryset(runid, scenarios,
+                                           variable.variable,
+                                           [channel, channel + 1])),
+                ('get_mapKS',
+                 utils.ks_queryset(runid, scenario.scenario,
+                                   variable.variable)),
+                ('get_summary_table',
+                 utils.summary_means_queryset(runid, start_date, end_date)),
+                ('get_channel_node_table',
+                 utils.daily_means_queryset(runid, variable.variable,
+                                            utils.EIGHT_NODES, start_date,
+                                            end_date))]
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('EXPLAIN QUERY PLAN is SQLite specific, the '
+                               'database backend is {}'
+                               .format(connection.vendor))
+        if options['run_id']:
+            run = RunIdTable.objects.filter(run_id=options['run_id']).last()
+        else:
+            run = RunIdTable.objects.last()
+        if run is None:
+            raise CommandError('No run found to plan the queries for')
+        variable = VariableTable.objects.filter(
+            variable=options['variable']).first()
+        if variable is None:
+            raise CommandError('Variable {} not found'
+                               .format(options['variable']))
+        scenarios = ScenarioTable.objects.filter(run_id=run)
+        baseline = scenarios.filter(scenario='Baseline').first()
+        if options['scenario']:
+            scenario = scenarios.filter(scenario=options['scenario']).first()
+        else:
+            scenario = scenarios.exclude(scenario='Baseline').first()
+        if baseline is None or scenario is None:
+            raise CommandError('Run {} needs a Baseline and a second scenario'
+                               .format(run.run_id))
+        print('Query plans for run: {} variable: {} scenario: {} channel: {} '
+              '(database: {})'.format(run.run_id, variable.variable,
+                                      scenario.scenario, options['channel'],
+                                      run_db(run.run_id)))
+        table_scans = 0
+        for view_name, queryset in self._view_queries(run, variable, baseline,
+                                                      scenario,
+                                                      options['channel']):
+            plan = queryset.explain()
+            uses_index = 'USING INDEX' in plan or 'USING COVERING INDEX' in plan
+            table_scans += not uses_index
+            print('\n{} ({})'.format(view_name, 'index' if uses_index
+                                     else 'TABLE SCAN'))
+            print(plan)
+        using = connections[run_db(run.run_id)]
+        with using.cursor() as cursor:
+            cursor.execute("SELECT count(*) FROM sqlite_master "
+                           "WHERE name = 'sqlite_stat1'")
+            analyzed = cursor.fetchone()[0]
+        if table_scans and not analyzed:
+            # without statistics SQLite may scan a fact table instead of
+            # looking the run up first and searching its index
+            print('\nThe database has not been ANALYZEd yet; run ANALYZE '
+                  'in `python manage.py dbshell` and plan the queries again')
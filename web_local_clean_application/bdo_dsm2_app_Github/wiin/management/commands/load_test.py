@@ -0,0 +1,252 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from wiin.models import RunIdTable, VarKSTable
+from wiin.partitions import run_db
+from concurrent.futures import ThreadPoolExecutor
+import argparse
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+import numpy as np
+
+# relative weights of the requests one page visit makes: a map page load,
+# then KS overlays and channel graphs while clicking around, then tables
+DEFAULT_MIX = {'home': 1, 'mapks': 2, 'mapgraph': 6, 'summary_table': 2,
+               'mfcn_table': 1}
+
+PERCENTILES = [50, 95, 99]
+
+
+def _parse_mix(value):
+    mix = {}
+    for item in value.split(','):
+        name, _, weight = item.partition('=')
+        if name not in DEFAULT_MIX:
+            raise argparse.ArgumentTypeError('Unknown request {!r}, use {}'
+                                             .format(name,
+                                                     ', '.join(DEFAULT_MIX)))
+        try:
+            mix[name] = float(weight)
+        except ValueError:
+            raise argparse.ArgumentTypeError('{!r} needs a numeric weight'
+                                             .format(name))
+    return mix
+
+
+class Command(BaseCommand):
+    help = 'Load tests a running server (python manage.py runserver, or \
+            uvicorn bdo_dsm2_app.asgi:application) with concurrent clients \
+            sending a weighted mix of map and table requests for the runs in \
+            the database, and reports latency percentiles and requests per \
+            second. Seed a database for it with seed_loadtest. The results \
+            can be saved as a baseline and later runs compared against it.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--url', type=str, default='http://127.0.0.1:8000',
+                            help="Address of the server to test")
+        parser.add_argument('--clients', type=int, default=8,
+                            help="Concurrent clients (default: 8)")
+        parser.add_argument('--duration', type=float, default=30.,
+                            help="Seconds to run for (default: 30)")
+        parser.add_argument('--mix', type=_parse_mix, default=DEFAULT_MIX,
+                            help="Request weights as name=weight,... from {} \
+                            (default: {})".format(
+                                ', '.join(DEFAULT_MIX),
+                                ','.join('{}={}'.format(*i)
+                                         for i in DEFAULT_MIX.items())))
+        parser.add_argument('--run_id', type=str, nargs='+', help="Runs to \
+                            request; all loaded runs if not given")
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Random seed of the request sequence")
+        parser.add_argument('--save_baseline', type=str, help="Write the \
+                            results to this JSON file")
+        parser.add_argument('--compare', type=str, help="Compare the results \
+                            with this baseline JSON file and fail on a \
+                            regression")
+        parser.add_argument('--tolerance', type=float, default=20.,
+                            help="Percent a p95 latency may rise or the \
+                            request rate fall before --compare calls it a \
+                            regression (default: 20)")
+
+    def _targets(self, run_ids):
+        """ (run_id, scenario, variable, channels) combinations to request """
+        runs = RunIdTable.objects.order_by('id').values_list('run_id',
+                                                             flat=True)
+        if run_ids:
+            runs = runs.filter(run_id__in=run_ids)
+        targets = []
+        for run_id in runs:
+            ks_query = (VarKSTable.objects.using(run_db(run_id))
+                        .filter(run_id__run_id=run_id,
+                                scenario0__scenario='Baseline')
+                        .values_list('scenario1__scenario',
+                                     'variable__variable', 'channel'))
+            channels = {}
+            for scenario, variable, channel in ks_query:
+                channels.setdefault((scenario, variable), []).append(channel)
+            targets += [(run_id, scenario, variable, sorted(pair_channels))
+                        for (scenario, variable), pair_channels
+                        in channels.items()]
+        return targets
+
+    def _request(self, name, target, rng):
+        """ The (path, GET params or None, POST data or None) of a request """
+        run_id, scenario, variable, channels = target
+        if name == 'home':
+            return '/', None, None
+        if name == 'mapks':
+            return '/mapks/', {'myRun': run_id, 'myScenario': scenario,
+                               'myVariable': variable}, None
+        if name == 'mapgraph':
+            return '/', None, {'myRun': run_id, 'myScenario': scenario,
+                               'myVariable': variable,
+                               'myChannel': str(rng.choice(channels)),
+                               'payload': 'compact'}
+        return '/{}/'.format(name), None, {'myRun': run_id,
+                                           'payload': 'compact'}
+
+    def _client(self, base_url, names, weights, targets, seed, deadline,
+                results, lock):
+        rng = random.Random(seed)
+        opener = urllib.request.build_opener()
+        while time.perf_counter() < deadline:
+            name = rng.choices(names, weights)[0]
+            path, params, data = self._request(name, rng.choice(targets), rng)
+            url = base_url + path
+            if params:
+                url += '?' + urllib.parse.urlencode(params)
+            body = urllib.parse.urlencode(data).encode() if data else None
+            start = time.perf_counter()
+            try:
+                with opener.open(url, data=body, timeout=120) as response:
+                    response.read()
+                ok = True
+            except (urllib.error.URLError, OSError):
+                ok = False
+            elapsed = time.perf_counter() - start
+            with lock:
+                results.append((name, elapsed, ok))
+
+    def _summary(self, results, seconds):
+        report = {}
+        for name in ['all'] + sorted({r[0] for r in results}):
+            rows = [r for r in results if name == 'all' or r[0] == name]
+            latencies = np.array([r[1] for r in rows if r[2]]) * 1000
+            report[name] = {'requests': len(rows),
+                            'errors': sum(not r[2] for r in rows),
+                            'requests_per_second': round(len(rows) / seconds,
+                                                         2)}
+            for p in PERCENTILES:
+                report[name]['p{}_ms'.format(p)] = (
+                    round(float(np.percentile(latencies, p)), 2)
+                    if len(latencies) else None)
+        return report
+
+    def _print_report(self, report):
+        print('{:<14}{:>9}{:>8}{:>9}{:>10}{:>10}{:>10}'.format(
+            'request', 'count', 'errors', 'req/s', 'p50 ms', 'p95 ms',
+            'p99 ms'))
+        for name, row in report.items():
+            print('{:<14}{:>9}{:>8}{:>9}{:>10}{:>10}{:>10}'.format(
+                name, row['requests'], row['errors'],
+                row['requests_per_second'], *[row['p{}_ms'.format(p)]
+                                              for p in PERCENTILES]))
+
+    def _compare(self, report, baseline, tolerance):
+        """ Prints the change against the baseline and returns the
+        regressions: a p95 latency or request rate more than `tolerance`
+        percent worse, and requests failing that did not before """
+        regressions = []
+        for name, row in report.items():
+            base = baseline['results'].get(name)
+            if base is None:
+                continue
+            # failed requests are left out of the latencies, so a server
+            # that fails fast must not pass for a faster one
+            if row['errors'] and not base['errors']:
+                regressions.append('{} {} of {} requests failed, none did '
+                                   'before'.format(name, row['errors'],
+                                                   row['requests']))
+            changes = []
+            if base['p95_ms']:
+                if row['p95_ms'] is None:
+                    regressions.append('{} had no successful requests'
+                                       .format(name))
+                else:
+                    p95_change = 100. * (row['p95_ms'] / base['p95_ms'] - 1)
+                    changes.append('p95 {:+.1f}%'.format(p95_change))
+                    if p95_change > tolerance:
+                        regressions.append('{} p95 {} ms, was {} ms'.format(
+                            name, row['p95_ms'], base['p95_ms']))
+            if base['requests_per_second']:
+                rate_change = 100. * (row['requests_per_second'] /
+                                      base['requests_per_second'] - 1)
+                changes.append('req/s {:+.1f}%'.format(rate_change))
+                if rate_change < -tolerance:
+                    regressions.append('{} {} req/s, was {} req/s'.format(
+                        name, row['requests_per_second'],
+                        base['requests_per_second']))
+            print('{:<14} {}'.format(name, ', '.join(changes) or
+                                     'nothing to compare'))
+        return regressions
+
+    def handle(self, *args, **options):
+        start = time.time()
+        mix = {name: weight for name, weight in options['mix'].items()
+               if weight > 0}
+        if not mix:
+            raise CommandError('--mix gives no request a weight')
+        targets = self._targets(options['run_id'])
+        if not targets:
+            raise CommandError('No runs with VarKS rows to request; seed '
+                               'some with seed_loadtest')
+        base_url = options['url'].rstrip('/')
+        try:
+            urllib.request.urlopen(base_url + '/', timeout=30).read()
+        except (urllib.error.URLError, OSError) as e:
+            raise CommandError('Cannot reach {}: {}'.format(base_url, e))
+        print('{} clients for {} seconds against {}, {} run/scenario/'
+              'variable combinations'.format(options['clients'],
+                                             options['duration'], base_url,
+                                             len(targets)))
+        results = []
+        lock = threading.Lock()
+        names = list(mix)
+        weights = [mix[name] for name in names]
+        load_start = time.perf_counter()
+        deadline = load_start + options['duration']
+        with ThreadPoolExecutor(max_workers=options['clients']) as executor:
+            clients = [executor.submit(self._client, base_url, names, weights,
+                                       targets, options['seed'] + i, deadline,
+                                       results, lock)
+                       for i in range(options['clients'])]
+        for client in clients:
+            client.result()
+        report = self._summary(results, time.perf_counter() - load_start)
+        self._print_report(report)
+        if options['save_baseline']:
+            with open(options['save_baseline'], 'w') as baseline_file:
+                json.dump({'created': timezone.now().isoformat(),
+                           'url': base_url, 'clients': options['clients'],
+                           'duration': options['duration'], 'mix': mix,
+                           'results': report}, baseline_file, indent=2)
+            print('Saved the baseline to {}'.format(options['save_baseline']))
+        regressions = []
+        if options['compare']:
+            with open(options['compare']) as baseline_file:
+                baseline = json.load(baseline_file)
+            if (baseline['clients'], baseline['mix']) != (options['clients'],
+                                                          mix):
+                print('The baseline was run with {} clients and mix {}'
+                      .format(baseline['clients'], baseline['mix']))
+            regressions = self._compare(report, baseline,
+                                        options['tolerance'])
+        elapsed_time = time.time() - start
+        print('Runtime: {} seconds'.format(round(elapsed_time, 5)))
+        if regressions:
+            raise CommandError('Worse than the baseline: {}'.format(
+                '; '.join(regressions)))
@@ -1,138 +1,621 @@
-from django.core.management.base import BaseCommand, CommandError
-from wiin.models import (RunIdTable, VariableTable, ScenarioTable, UnitTable,
-                         HydroTable, VarSummaryTable, VarTotalTable, VarKSTable)
-import os
-import sys
-import time
-import pandas as pd
-
-
-
-class Command(BaseCommand):
-    help = 'Adds initial input data to the db.sqlite3 for testing. \
-            Accepts one string arg for the tables_folder where the initial \
-            datatables are located.'
-
-    def add_arguments(self, parser):
-        parser.add_argument('--tables_folder', type=str, help="Provide absolute \
-                            folder pathname for the folder containing the \
-                            initial input data tables in *.csv")
-
-    def _fill_hydrotable(self, df):
-        unique_run_id = df['run_id'].unique()[0]
-        run_indx = RunIdTable.objects.get_or_create(run_id=unique_run_id)
-        model_instances = []
-        grouped_df = df.groupby(['path', 'variable', 'channel', 'scenario', 'unit'])
-        for group_name, df_group in grouped_df:
-            path_unique = df_group['path'].unique()
-            assert len(path_unique) == 1
-            var_unique = df_group['variable'].unique()
-            assert len(var_unique) == 1
-            channel_unique = df_group['channel'].unique()
-            assert len(channel_unique) == 1
-            scenario_unique = df_group['scenario'].unique()
-            assert len(scenario_unique) == 1
-            unit_unique = df_group['unit'].unique()
-            assert len(unit_unique) == 1
-            var_indx = VariableTable.objects.get_or_create(variable=var_unique[0])
-            sce_indx = ScenarioTable.objects.get_or_create(scenario=scenario_unique[0], run_id=run_indx[0])
-            uni_indx = UnitTable.objects.get_or_create(unit=unit_unique[0])
-            for indx, row in df_group[['datetime', 'value']].iterrows():
-                 model_instances.append(HydroTable(run_id=run_indx[0], path=path_unique[0], variable=var_indx[0], channel=channel_unique[0],
-                                              scenario=sce_indx[0], unit=uni_indx[0], datetime=pd.to_datetime(row['datetime']),
-                                              value=row['value']))
-        print(len(model_instances))
-        HydroTable.objects.bulk_create(model_instances, batch_size=10)
-        print('Read and Write of HydroTable {} Complete'.format(unique_run_id))
-        
-
-    def _fill_varsummarytable(self, df):
-        unique_run_id = df['run_id'].unique()[0]
-        run_indx = RunIdTable.objects.get_or_create(run_id=unique_run_id)
-        model_instances = []
-        grouped_df = df.groupby(['variable', 'scenario'])
-        for group_name, df_group in grouped_df:
-            var_unique = df_group['variable'].unique()
-            assert len(var_unique) == 1
-            scenario_unique = df_group['scenario'].unique()
-            assert len(scenario_unique) == 1
-            var_indx = VariableTable.objects.get_or_create(variable=var_unique[0])
-            sce_indx = ScenarioTable.objects.get_or_create(scenario=scenario_unique[0], run_id=run_indx[0])
-            for indx, row in df_group.iterrows():
-                model_instances.append(VarSummaryTable(run_id=run_indx[0], variable=var_indx[0], scenario=sce_indx[0],
-                                                       channel=row['channel'], mean=row['mean'],
-                                                       std=row['std'], _min=row['_min'], quant1=row['quant1'],
-                                                       median=row['median'], quant3=row['quant3'], _max=row['_max']))
-        print(len(model_instances))
-        VarSummaryTable.objects.bulk_create(model_instances, batch_size=10)
-        print('Read and Write of VarSummaryTable {} Complete'.format(unique_run_id))
-
-    def _fill_vartotaltable(self, df):
-        unique_run_id = df['run_id'].unique()[0]
-        run_indx = RunIdTable.objects.get_or_create(run_id=unique_run_id)
-        model_instances = []
-        grouped_df = df.groupby(['variable', 'scenario', 'channel'])
-        for group_name, df_group in grouped_df:
-            var_unique = df_group['variable'].unique()
-            assert len(var_unique) == 1
-            scenario_unique = df_group['scenario'].unique()
-            assert len(scenario_unique) == 1
-            channel_unique = df_group['channel'].unique()
-            assert len(channel_unique) == 1
-            var_indx = VariableTable.objects.get_or_create(variable=var_unique[0])
-            sce_indx = ScenarioTable.objects.get_or_create(scenario=scenario_unique[0], run_id=run_indx[0])
-            for indx, row in df_group[['channel', 'datetime', 'value']].iterrows():
-                model_instances.append(VarTotalTable(run_id=run_indx[0], variable=var_indx[0], scenario=sce_indx[0],
-                                                     channel=channel_unique[0], datetime=pd.to_datetime(row['datetime']), value=row['value']))
-        print(len(model_instances))
-        VarTotalTable.objects.bulk_create(model_instances, batch_size=10)
-        print('Read and Write of VarTotalTable {} Complete'.format(unique_run_id))
-    
-    def _fill_varkstable(self, df):
-        unique_run_id = df['run_id'].unique()[0]
-        run_indx = RunIdTable.objects.get_or_create(run_id=unique_run_id)
-        model_instances = []
-        grouped_df = df.groupby(['variable'])
-        for group_name, df_group in grouped_df:
-            print(group_name)
-            var_indx = VariableTable.objects.get_or_create(variable=group_name)
-            print(var_indx)
-            print(var_indx[0])
-            scenario0_unique = df_group['scenario0'].unique()
-            assert len(scenario0_unique) == 1
-            scenario1_unique = df_group['scenario1'].unique()
-            assert len(scenario1_unique) == 1
-            sce0_indx = ScenarioTable.objects.get_or_create(scenario=scenario0_unique[0], run_id=run_indx[0])
-            sce1_indx = ScenarioTable.objects.get_or_create(scenario=scenario1_unique[0], run_id=run_indx[0])
-            for indx, row in df_group[['channel', 'ks_stat']].iterrows():
-                model_instances.append(VarKSTable(run_id=run_indx[0], variable=var_indx[0], scenario0=sce0_indx[0], scenario1=sce1_indx[0],
-                                                  channel=row['channel'], ks_stat=row['ks_stat']))
-        print(len(model_instances))
-        VarKSTable.objects.bulk_create(model_instances, batch_size=10)
-        print('Read and Write of VarKSTable {} Complete'.format(unique_run_id))
-
-    def _fill_table(self, table_pathname, table_dict):
-        determine_table = os.path.basename(table_pathname).split(".")[0]
-        df = pd.read_csv(table_pathname, sep=",",
-                         infer_datetime_format=True, parse_dates=True)
-        unique_run_id = df['run_id'].unique()
-        print(unique_run_id)
-        print(unique_run_id[0])
-        assert len(unique_run_id) == 1
-        df.columns = [col.lower() for col in df.columns]
-        table_dict.get(determine_table)(df)
-
-    def handle(self, *args, **options):
-        start = time.time()
-        tables_folder = options['tables_folder']
-        tables_folder_lst = [os.path.join(tables_folder, x)
-                             for x in os.listdir(tables_folder)]
-        table_dict = {"HydroTable": self._fill_hydrotable,
-                      "VarSummary": self._fill_varsummarytable,
-                      "VarTotal": self._fill_vartotaltable,
-                      "VarKS": self._fill_varkstable}
-        for i in tables_folder_lst:
-            print(i)
-            self._fill_table(i, table_dict)
-        elapsed_time = time.time() - start
-        print('Runtime: {} seconds'.format(round(elapsed_time, 5)))
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections, models, transaction, OperationalError
+from django.utils import timezone
+from wiin import metadata, partitions, run_cache
+from wiin.models import (RunIdTable, VariableTable, ScenarioTable, UnitTable,
+                         HydroTable, VarSummaryTable, VarTotalTable, VarKSTable,
+                         HydroSeriesTable, VarTotalSeriesTable,
+                         VarEcdfTable)
+from wiin.utils import ecdf_x, ks_distance
+import contextlib
+import os
+import time
+import numpy as np
+import pandas as pd
+
+# rows handed to each bulk_create INSERT; Django lowers this further on
+# SQLite so a batch never exceeds the backend's bound-parameter limit
+LOAD_BATCH_SIZE = 5000
+
+# rows read and written per chunk by default; 200000 keeps the peak memory
+# near 300 MB whatever the run length (see --chunksize)
+LOAD_CHUNK_ROWS = 200000
+
+# connection settings used while loading into SQLite: WAL journaling,
+# fsync only at checkpoints, ~200 MB page cache and in-memory temp tables.
+# journal_mode is stored in the database file, so the load puts the previous
+# mode back afterwards (see _restore_journal_modes)
+SQLITE_LOAD_PRAGMAS = ['PRAGMA journal_mode=WAL',
+                       'PRAGMA synchronous=NORMAL',
+                       'PRAGMA cache_size=-200000',
+                       'PRAGMA temp_store=MEMORY']
+
+# table name (the *.csv/*.parquet basename) mapped to its model and the
+# columns copied straight across; the run_id, variable, scenario(0/1) and
+# unit name columns are swapped for foreign keys by DimensionKeys
+TABLE_DICT = {"HydroTable": (HydroTable, ['path', 'channel', 'datetime',
+                                          'value']),
+              "VarSummary": (VarSummaryTable, ['channel', 'mean', 'std',
+                                               '_min', 'quant1', 'median',
+                                               'quant3', '_max']),
+              "VarTotal": (VarTotalTable, ['channel', 'datetime', 'value']),
+              "VarKS": (VarKSTable, ['channel', 'ks_stat'])}
+
+# tables that are also stored as one compact series row per key
+SERIES_DICT = {"HydroTable": (HydroSeriesTable, ['run_id_id', 'path',
+                                                 'variable_id', 'channel',
+                                                 'scenario_id', 'unit_id']),
+               "VarTotal": (VarTotalSeriesTable, ['run_id_id', 'variable_id',
+                                                  'scenario_id', 'channel'])}
+
+# every model holding per-run fact rows, cleared by --replace
+FACT_MODELS = ([model for model, columns in TABLE_DICT.values()] +
+               [model for model, key_columns in SERIES_DICT.values()] +
+               [VarEcdfTable])
+
+# dimension rows copied into a run's partition file for its foreign keys,
+# parents before children
+PARTITION_DIMENSIONS = [('run_id_id', RunIdTable),
+                        ('variable_id', VariableTable),
+                        ('scenario_id', ScenarioTable),
+                        ('scenario0_id', ScenarioTable),
+                        ('scenario1_id', ScenarioTable),
+                        ('unit_id', UnitTable)]
+
+
+class DimensionKeys(object):
+    """ Name to id maps for RunIdTable, VariableTable, ScenarioTable and
+    UnitTable, shared by every table loader of a populate_db run.
+
+    Each dimension table is read once with a single query when the maps are
+    built. Names a loader meets that are not in the database yet are created
+    together with one bulk_create per dimension table, and the fact rows then
+    get their foreign keys through a vectorized Series.map.
+    """
+
+    def __init__(self):
+        self.run_ids = dict(RunIdTable.objects.values_list('run_id', 'id'))
+        self.variable_ids = dict(VariableTable.objects
+                                 .values_list('variable', 'id'))
+        self.unit_ids = dict(UnitTable.objects.values_list('unit', 'id'))
+        # scenarios belong to a run, so they are keyed per RunIdTable id
+        self.scenario_ids = {}
+        for run_pk, scenario, pk in (ScenarioTable.objects
+                                     .values_list('run_id', 'scenario', 'id')):
+            self.scenario_ids.setdefault(run_pk, {})[scenario] = pk
+        # the scenario names each run's loaded tables use
+        self.loaded_scenarios = {}
+
+    def _add_missing(self, id_map, model, field, names, **extra):
+        missing = [n for n in names if n not in id_map]
+        if not missing:
+            return
+        model.objects.bulk_create([model(**dict(extra, **{field: n}))
+                                   for n in missing])
+        id_map.update(model.objects
+                      .filter(**dict(extra, **{field + '__in': missing}))
+                      .values_list(field, 'id'))
+
+    def resolve(self, df):
+        """ Returns the foreign key id columns for the name columns of `df` """
+        run_name = df['run_id'].iloc[0]
+        self._add_missing(self.run_ids, RunIdTable, 'run_id', [run_name])
+        run_pk = self.run_ids[run_name]
+        scenario_ids = self.scenario_ids.setdefault(run_pk, {})
+        keys = pd.DataFrame(index=df.index)
+        keys['run_id_id'] = run_pk
+        self._add_missing(self.variable_ids, VariableTable, 'variable',
+                          df['variable'].unique())
+        keys['variable_id'] = df['variable'].map(self.variable_ids)
+        for col in ['scenario', 'scenario0', 'scenario1']:
+            if col in df.columns:
+                self.loaded_scenarios.setdefault(run_pk, set()).update(
+                    df[col].unique())
+                self._add_missing(scenario_ids, ScenarioTable, 'scenario',
+                                  df[col].unique(), run_id_id=run_pk)
+                keys['{}_id'.format(col)] = df[col].map(scenario_ids)
+        if 'unit' in df.columns:
+            self._add_missing(self.unit_ids, UnitTable, 'unit',
+                              df['unit'].unique())
+            keys['unit_id'] = df['unit'].map(self.unit_ids)
+        return keys
+
+
+class SeriesAssembler(object):
+    """ Gathers a table's samples per series key for a SeriesModel
+
+    Frames, or the chunks of a streamed table, are added as they are loaded
+    and only their datetimes and float32 values are kept. The post-processor
+    writes each table grouped by series key, so a key missing from the latest
+    chunk is complete: finished() sorts its samples onto a regular grid,
+    returns its model instance and drops the samples, and build() does the
+    same for the keys still open at the end of the table.
+    """
+
+    def __init__(self, model, key_columns):
+        self.model = model
+        self.key_columns = key_columns
+        self.pieces = {}
+        self.closed = set()
+        self.latest_keys = set()
+
+    def add(self, frame):
+        self.latest_keys = set()
+        # datetime64 values of a UTC aware column are already naive UTC
+        for key, group in frame.groupby(self.key_columns, sort=False):
+            if key in self.closed:
+                raise CommandError(
+                    'Series {} of {} continues after other series; stream '
+                    'only tables grouped by series key or load with '
+                    '--chunksize 0'.format(key, self.model.__name__))
+            self.latest_keys.add(key)
+            self.pieces.setdefault(key, []).append(
+                (group['datetime'].values.astype('datetime64[ns]')
+                 .view(np.int64),
+                 group['value'].to_numpy(dtype=np.float32)))
+
+    def _series(self, key, pieces):
+        times = np.concatenate([p[0] for p in pieces])
+        values = np.concatenate([p[1] for p in pieces])
+        order = np.argsort(times, kind='stable')
+        times = times[order]
+        values = values[order]
+        interval = np.diff(times).min() if len(times) > 1 else 10**9
+        if interval <= 0 or np.any((times - times[0]) % interval):
+            raise CommandError('Series {} of {} is not on a regular time step'
+                               .format(key, self.model.__name__))
+        count = int((times[-1] - times[0]) // interval) + 1
+        grid = np.full(count, np.nan, dtype='<f4')
+        grid[(times - times[0]) // interval] = values
+        start = pd.Timestamp(times[0], tz='UTC' if settings.USE_TZ else None)
+        return self.model(start=start.to_pydatetime(),
+                          interval=int(interval // 10**9), count=count,
+                          values=grid.tobytes(),
+                          **dict(zip(self.key_columns, key)))
+
+    def _close(self, keys):
+        self.closed.update(keys)
+        return [self._series(key, self.pieces.pop(key)) for key in keys]
+
+    def finished(self):
+        """ Returns the series of the keys the latest chunk did not extend """
+        return self._close([key for key in self.pieces
+                            if key not in self.latest_keys])
+
+    def build(self):
+        return self._close(list(self.pieces))
+
+
+class Command(BaseCommand):
+    help = 'Adds initial input data to the db.sqlite3 for testing. \
+            Accepts one string arg for the tables_folder where the initial \
+            datatables are located.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tables_folder', type=str, help="Provide absolute \
+                            folder pathname for the folder containing the \
+                            initial input data tables in *.csv or *.parquet")
+        parser.add_argument('--chunksize', type=int, default=LOAD_CHUNK_ROWS,
+                            help="Stream each table in chunks of this many \
+                            rows straight into the database with executemany, \
+                            so peak memory is set by the chunk size rather \
+                            than the run length (default: {}). 0 loads each \
+                            table in one piece through the ORM, several times \
+                            slower".format(LOAD_CHUNK_ROWS))
+        parser.add_argument('--replace', action='store_true',
+                            help="Delete the fact rows already stored for \
+                            each run_id found in the tables_folder before \
+                            reloading it. Without it an already loaded run \
+                            is refused instead of being duplicated")
+        parser.add_argument('--series_only', action='store_true',
+                            help="Store VarTotal only as one compact series \
+                            row per variable/scenario/channel, skipping its \
+                            per-sample rows. HydroTable keeps its rows since \
+                            the summary tables aggregate them")
+        parser.add_argument('--skip_warm_cache', action='store_true',
+                            help="Do not run warm_cache for the loaded runs \
+                            afterwards")
+
+    def _read_table(self, table_pathname, chunksize=None):
+        """ Reads a *.csv or *.parquet table, whole or as chunks """
+        if table_pathname.endswith('.parquet'):
+            try:
+                import pyarrow.parquet as pq
+            except ImportError:
+                raise CommandError('Reading *.parquet tables requires pyarrow')
+            if not chunksize:
+                return pq.read_table(table_pathname).to_pandas()
+            parquet_file = pq.ParquetFile(table_pathname)
+            return (batch.to_pandas()
+                    for batch in parquet_file.iter_batches(batch_size=chunksize))
+        return pd.read_csv(table_pathname, sep=",", chunksize=chunksize or None)
+
+    def _prepare_frame(self, df):
+        df.columns = [col.lower() for col in df.columns]
+        if 'datetime' in df.columns:
+            # one vectorized parse per frame instead of one per row; stored
+            # as UTC when the project has time zone support switched on
+            df['datetime'] = pd.to_datetime(df['datetime'], utc=settings.USE_TZ)
+        return df
+
+    def _build_frame(self, determine_table, df):
+        model, columns = TABLE_DICT.get(determine_table)
+        return model, pd.concat([self.keys.resolve(df), df[columns]], axis=1)
+
+    def _copy_dimensions(self, using, frame):
+        """ Copies the dimension rows `frame` points at into a partition """
+        if using == 'default':
+            return
+        with transaction.atomic(using=using):
+            for column, model in PARTITION_DIMENSIONS:
+                if column not in frame.columns:
+                    continue
+                copied = self._copied_dimensions.setdefault((using, model),
+                                                            set())
+                missing = set(frame[column].unique().tolist()) - copied
+                if missing:
+                    # same ids as the main database, so no remapping
+                    model.objects.using(using).bulk_create(
+                        list(model.objects.filter(id__in=missing)))
+                    copied.update(missing)
+
+    def _create_rows(self, model, frame, using):
+        """ Writes `frame` through the ORM with large bulk_create batches """
+        names = list(frame.columns)
+        model_instances = [model(**dict(zip(names, row)))
+                           for row in zip(*[frame[n].tolist() for n in names])]
+        with transaction.atomic(using=using):
+            model.objects.using(using).bulk_create(model_instances,
+                                                   batch_size=LOAD_BATCH_SIZE)
+        return len(model_instances)
+
+    def _adapt_datetimes(self, series, connection):
+        if connection.vendor != 'sqlite':
+            return [connection.ops.adapt_datetimefield_value(d)
+                    for d in series.dt.to_pydatetime()]
+        # matches the text Django's SQLite backend stores for a datetime,
+        # naive UTC with microseconds only when they are non-zero
+        if series.dt.tz is not None:
+            series = series.dt.tz_convert('UTC').dt.tz_localize(None)
+        return np.where(series.dt.microsecond == 0,
+                        series.dt.strftime('%Y-%m-%d %H:%M:%S'),
+                        series.dt.strftime('%Y-%m-%d %H:%M:%S.%f')).tolist()
+
+    def _insert_rows(self, model, frame, using):
+        """ Writes `frame` with one DB-API executemany, skipping the ORM """
+        connection = connections[using]
+        now = connection.ops.adapt_datetimefield_value(timezone.now())
+        columns = []
+        values = []
+        for field in model._meta.concrete_fields:
+            if field.primary_key:
+                continue
+            columns.append(connection.ops.quote_name(field.column))
+            if getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                values.append([now] * len(frame))
+            elif isinstance(field, models.DateTimeField):
+                values.append(self._adapt_datetimes(frame[field.attname],
+                                                    connection))
+            else:
+                values.append(frame[field.attname].tolist())
+        sql = 'INSERT INTO {} ({}) VALUES ({})'.format(
+            connection.ops.quote_name(model._meta.db_table),
+            ', '.join(columns), ', '.join(['%s'] * len(columns)))
+        with transaction.atomic(using=using):
+            with connection.cursor() as cursor:
+                cursor.executemany(sql, list(zip(*values)))
+        return len(frame)
+
+    def _write_series(self, model, series_instances, using):
+        with transaction.atomic(using=using):
+            model.objects.using(using).bulk_create(series_instances,
+                                                   batch_size=LOAD_BATCH_SIZE)
+        return len(series_instances)
+
+    def _write_ecdfs(self, run_name, using):
+        """ Precomputes the map graph ECDF and KS distance of each series
+
+        A second pass over the stored VarTotalSeriesTable rows, one
+        variable and channel at a time, so only the scenarios compared by a
+        KS distance are held in memory together.
+        """
+        run_pk = self.keys.run_ids[run_name]
+        baseline_pk = self.keys.scenario_ids[run_pk].get('Baseline')
+        run_series = VarTotalSeriesTable.objects.using(using).filter(
+            run_id_id=run_pk)
+        row_count = 0
+        for variable_pk, channel in (run_series
+                                     .order_by('variable_id', 'channel')
+                                     .values_list('variable_id', 'channel')
+                                     .distinct()):
+            arrays = {}
+            for s in run_series.filter(variable_id=variable_pk,
+                                       channel=channel):
+                # the same samples get_vartotal_arrays hands to get_mapgraph
+                data_arr = s.to_numpy()
+                data_arr = data_arr[~np.isnan(data_arr)]
+                if len(data_arr):
+                    arrays[s.scenario_id] = data_arr
+            baseline_arr = arrays.get(baseline_pk)
+            ecdf_instances = []
+            for scenario_pk, data_arr in arrays.items():
+                ks_stat = None
+                if scenario_pk != baseline_pk and baseline_arr is not None:
+                    ks_stat = float(ks_distance(baseline_arr, data_arr))
+                ecdf_instances.append(VarEcdfTable(
+                    run_id_id=run_pk, variable_id=variable_pk,
+                    scenario_id=scenario_pk, channel=channel,
+                    count=len(data_arr),
+                    x=ecdf_x(data_arr).astype('<f4').tobytes(),
+                    ks_stat=ks_stat))
+            with transaction.atomic(using=using):
+                VarEcdfTable.objects.using(using).bulk_create(ecdf_instances)
+            row_count += len(ecdf_instances)
+        print('Wrote {} VarEcdfTable rows'.format(row_count))
+
+    def _finish_series(self, determine_table, run_name, series_count, using):
+        model, key_columns = SERIES_DICT.get(determine_table)
+        print('Wrote {} {} rows'.format(series_count, model.__name__))
+        if model is VarTotalSeriesTable:
+            self._write_ecdfs(run_name, using)
+
+    def _keeps_rows(self, determine_table):
+        return not (self.series_only and determine_table == 'VarTotal')
+
+    def _value_rows(self, frame):
+        # a NaN sample is a gap: the series keep it as NaN, but it gets no
+        # fact row, since SQLite cannot store NaN in a FloatField and the
+        # pandas means skip it anyway
+        if 'value' not in frame.columns:
+            return frame
+        return frame[frame['value'].notna()]
+
+    def _fill_table(self, table_pathname, determine_table):
+        df = self._prepare_frame(self._read_table(table_pathname))
+        unique_run_id = df['run_id'].unique()
+        assert len(unique_run_id) == 1
+        using = self.run_dbs[unique_run_id[0]]
+        model, frame = self._build_frame(determine_table, df)
+        self._copy_dimensions(using, frame)
+        row_count = 0
+        if self._keeps_rows(determine_table):
+            row_count = self._create_rows(model, self._value_rows(frame),
+                                          using)
+        if determine_table in SERIES_DICT:
+            assembler = SeriesAssembler(*SERIES_DICT.get(determine_table))
+            assembler.add(frame)
+            series_count = self._write_series(assembler.model,
+                                              assembler.build(), using)
+            self._finish_series(determine_table, unique_run_id[0],
+                                series_count, using)
+        return unique_run_id[0], row_count
+
+    def _stream_table(self, table_pathname, determine_table, chunksize):
+        run_id = None
+        row_count = 0
+        series_count = 0
+        assembler = None
+        if determine_table in SERIES_DICT:
+            # holds the samples of the series still open, those the latest
+            # chunk extends, so memory is bounded by the chunk size as long
+            # as the table is grouped by series key
+            assembler = SeriesAssembler(*SERIES_DICT.get(determine_table))
+        for chunk in self._read_table(table_pathname, chunksize):
+            chunk = self._prepare_frame(chunk)
+            if run_id is None:
+                run_id = chunk['run_id'].iloc[0]
+                using = self.run_dbs[run_id]
+            assert (chunk['run_id'] == run_id).all()
+            model, frame = self._build_frame(determine_table, chunk)
+            self._copy_dimensions(using, frame)
+            if self._keeps_rows(determine_table):
+                row_count += self._insert_rows(model, self._value_rows(frame),
+                                               using)
+            if assembler is not None:
+                assembler.add(frame)
+                series_count += self._write_series(assembler.model,
+                                                   assembler.finished(), using)
+        if assembler is not None:
+            series_count += self._write_series(assembler.model,
+                                               assembler.build(), using)
+            self._finish_series(determine_table, run_id, series_count, using)
+        return run_id, row_count
+
+    def _load_table(self, table_pathname, chunksize):
+        determine_table = os.path.basename(table_pathname).split(".")[0]
+        start = time.time()
+        if chunksize:
+            unique_run_id, row_count = self._stream_table(table_pathname,
+                                                          determine_table,
+                                                          chunksize)
+        else:
+            unique_run_id, row_count = self._fill_table(table_pathname,
+                                                        determine_table)
+        elapsed_time = time.time() - start
+        print('Read and Write of {} {} Complete: {} rows in {} seconds '
+              '({} rows/second)'.format(determine_table, unique_run_id,
+                                        row_count, round(elapsed_time, 2),
+                                        int(row_count / max(elapsed_time, 1e-6))))
+
+    def _peek_run_id(self, table_pathname):
+        reader = self._read_table(table_pathname, chunksize=1)
+        first_row = self._prepare_frame(next(iter(reader)))
+        reader.close()
+        return first_row['run_id'].iloc[0]
+
+    def _partition_loaded(self, run_name):
+        alias = partitions.run_db(run_name)
+        return alias != 'default' and any(model.objects.using(alias).exists()
+                                          for model in FACT_MODELS)
+
+    def _clear_runs(self, run_names, replace):
+        """ Deletes the fact rows of `run_names`, or refuses to reload them
+
+        Each model is cleared with one set-based DELETE filtered on the run's
+        RunIdTable ids; the run, scenario, variable and unit rows are kept so
+        the reload maps onto the same ids. A run's partition file is not
+        touched here, the reloaded file replaces it once the load succeeds.
+        """
+        if not replace and any(self._partition_loaded(r) for r in run_names):
+            raise CommandError('Run(s) {} are already loaded; use '
+                               '--replace to reload them'
+                               .format(', '.join(run_names)))
+        run_pks = list(RunIdTable.objects.filter(run_id__in=run_names)
+                       .values_list('id', flat=True))
+        if not run_pks:
+            return
+        if not replace:
+            if any(model.objects.filter(run_id__in=run_pks).exists()
+                   for model in FACT_MODELS):
+                raise CommandError('Run(s) {} are already loaded; use '
+                                   '--replace to reload them'
+                                   .format(', '.join(run_names)))
+            return
+        for model in FACT_MODELS:
+            start = time.time()
+            deleted, _ = model.objects.filter(run_id__in=run_pks).delete()
+            print('Deleted {} existing {} rows in {} seconds'
+                  .format(deleted, model.__name__,
+                          round(time.time() - start, 2)))
+
+    def _drop_stale_scenarios(self):
+        """ Deletes the scenarios of the loaded runs that their tables no
+        longer use, as after a --replace with a renamed scenario, so the
+        pages stop listing them """
+        for run_pk, scenarios in self.keys.loaded_scenarios.items():
+            stale = (ScenarioTable.objects.filter(run_id=run_pk)
+                     .exclude(scenario__in=scenarios))
+            names = list(stale.values_list('scenario', flat=True))
+            if names:
+                stale.delete()
+                print('Deleted scenario(s) {} no longer in the run'
+                      .format(', '.join(names)))
+
+    def _apply_load_pragmas(self):
+        for using in ['default'] + sorted(set(self.run_dbs.values())):
+            if connections[using].vendor != 'sqlite':
+                continue
+            with connections[using].cursor() as cursor:
+                if using not in self._journal_modes:
+                    cursor.execute('PRAGMA journal_mode')
+                    self._journal_modes[using] = cursor.fetchone()[0]
+                for pragma in SQLITE_LOAD_PRAGMAS:
+                    cursor.execute(pragma)
+
+    def _restore_journal_modes(self):
+        """ Puts each database back in the journal mode it had before the
+        load, which also folds the WAL into the database file and removes the
+        -wal/-shm files """
+        for using, journal_mode in self._journal_modes.items():
+            if journal_mode.lower() == 'wal':
+                continue
+            try:
+                with connections[using].cursor() as cursor:
+                    cursor.execute('PRAGMA journal_mode={}'
+                                   .format(journal_mode))
+            except OperationalError as e:
+                # leaving WAL needs the file to itself, e.g. no server
+                # process reading it
+                print('Could not switch {} back to journal_mode={}: {}'
+                      .format(connections[using].settings_dict['NAME'],
+                              journal_mode, e))
+
+    def _create_partitions(self, run_names):
+        """ Maps each run to the database its fact rows are written to """
+        self.run_dbs = {}
+        self._copied_dimensions = {}
+        for run_name in run_names:
+            if not partitions.partitions_enabled():
+                self.run_dbs[run_name] = 'default'
+                continue
+            try:
+                using = partitions.loading_db(run_name)
+            except ValueError as e:
+                raise CommandError(e)
+            call_command('migrate', 'wiin', database=using, verbosity=0)
+            self.run_dbs[run_name] = using
+
+    def _finish_partitions(self, succeeded):
+        for run_name, using in self.run_dbs.items():
+            if using == 'default':
+                continue
+            if succeeded:
+                print('Wrote partition {}'
+                      .format(partitions.publish_partition(run_name)))
+            else:
+                partitions.discard_loading(run_name)
+
+    def handle(self, *args, **options):
+        start = time.time()
+        tables_folder = options['tables_folder']
+        if not tables_folder or not os.path.isdir(tables_folder):
+            raise CommandError('--tables_folder {} is not a directory'
+                               .format(tables_folder))
+        if options['chunksize'] < 0:
+            raise CommandError('--chunksize must be 0 or a positive row count')
+        tables_folder_lst = []
+        folder_files = os.listdir(tables_folder)
+        for x in folder_files:
+            table_name, extension = os.path.splitext(x)
+            if table_name not in TABLE_DICT or extension not in ('.csv',
+                                                                 '.parquet'):
+                print('Skipping {}, not a recognized table'.format(x))
+            elif (extension == '.csv' and
+                  table_name + '.parquet' in folder_files):
+                # the post-processor can write both formats of a table
+                print('Skipping {}, loading {}.parquet instead'
+                      .format(x, table_name))
+            else:
+                tables_folder_lst.append(os.path.join(tables_folder, x))
+        run_names = sorted(set(self._peek_run_id(i)
+                               for i in tables_folder_lst))
+        self.series_only = options['series_only']
+        self._create_partitions(run_names)
+        # journal_mode cannot change inside a transaction, so set up the
+        # connections before any load starts
+        self._journal_modes = {}
+        self._apply_load_pragmas()
+        succeeded = False
+        try:
+            # a single commit, so a failed reload keeps the replaced rows
+            with contextlib.ExitStack() as stack:
+                for using in ['default'] + sorted(set(self.run_dbs.values())
+                                                  - {'default'}):
+                    stack.enter_context(transaction.atomic(using=using))
+                self._clear_runs(run_names, options['replace'])
+                self.keys = DimensionKeys()
+                for i in tables_folder_lst:
+                    print(i)
+                    self._load_table(i, options['chunksize'])
+                self._drop_stale_scenarios()
+            succeeded = True
+        finally:
+            self._restore_journal_modes()
+            self._finish_partitions(succeeded)
+        # marks the runs as changed for the page metadata cache
+        RunIdTable.objects.filter(run_id__in=run_names).update(
+            last_modified=timezone.now())
+        metadata.invalidate()
+        elapsed_time = time.time() - start
+        print('Runtime: {} seconds'.format(round(elapsed_time, 5)))
+        if not options['skip_warm_cache']:
+            self._warm_cache(run_names)
+
+    def _warm_cache(self, run_names):
+        """ Runs warm_cache for the loaded runs. The load is committed by now,
+        so a failure here is only reported: the pages compute what is missing
+        on first use """
+        command = 'python manage.py warm_cache --run_id {}'.format(
+            ' '.join(run_names))
+        if not run_cache.is_shared():
+            print('Warning: not warming the cache, settings.CACHES is local to '
+                  'each process; configure a shared cache and run "{}"'
+                  .format(command))
+            return
+        try:
+            call_command('warm_cache', run_id=run_names)
+        except Exception as e:
+            print('Warning: the runs are loaded but warm_cache failed: {}; '
+                  'run "{}" to retry'.format(e, command))
@@ -0,0 +1,135 @@
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from wiin.management.commands.populate_db import LOAD_CHUNK_ROWS
+from wiin.utils import EIGHT_NODES, ks_distance
+import os
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+
+# DSM2 writes its channel output every 15 minutes
+SAMPLE_FREQ = '15min'
+
+VARIABLES = [('FLOW', 'CFS', 1000., 250.), ('VEL', 'FT/S', 1., 0.3)]
+
+
+class Command(BaseCommand):
+    help = 'Seeds the database with synthetic runs for load_test. Writes \
+            HydroTable, VarTotal, VarSummary and VarKS tables shaped like \
+            the post-processor output, one folder per run, and loads each \
+            with populate_db --replace.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=2,
+                            help="Number of runs to seed (default: 2)")
+        parser.add_argument('--channels', type=int, default=100,
+                            help="Channels per run in VarTotal, VarSummary \
+                            and VarKS (default: 100; DSM2 has 521)")
+        parser.add_argument('--days', type=int, default=21,
+                            help="Days of 15 minute data per run \
+                            (default: 21)")
+        parser.add_argument('--tables_folder', type=str, help="Folder to \
+                            write the run tables to; a temporary folder if \
+                            not given")
+        parser.add_argument('--start', type=str, default='2019-02-05',
+                            help="First day of the runs, as YYYY-MM-DD")
+        parser.add_argument('--seed', type=int, default=0,
+                            help="Random seed, so a seeded database can be \
+                            recreated for a later comparison")
+        parser.add_argument('--chunksize', type=int, default=LOAD_CHUNK_ROWS,
+                            help="Passed on to populate_db")
+        parser.add_argument('--skip_warm_cache', action='store_true',
+                            help="Passed on to populate_db, to load test \
+                            the views cold")
+
+    def _run_tables(self, rng, run_id, scenario, datetimes, channels):
+        """ The four post-processor tables of one run """
+        hydro = []
+        total = []
+        summary = []
+        ks = []
+        for variable, unit, mean, spread in VARIABLES:
+            # each channel has its own level; the scenario shifts it
+            levels = rng.normal(mean, spread, len(channels))
+            shifts = rng.normal(0., spread / 4., len(channels))
+            samples = {}
+            for name, offset in [('Baseline', 0.), (scenario, 1.)]:
+                for i, channel in enumerate(channels):
+                    data_arr = (levels[i] + offset * shifts[i] +
+                                rng.normal(0., spread / 5., len(datetimes)))
+                    samples[(name, channel)] = data_arr
+                    total.append(pd.DataFrame({
+                        'run_id': run_id, 'variable': variable,
+                        'scenario': name, 'channel': channel,
+                        'datetime': datetimes, 'value': data_arr}))
+                    quantiles = np.percentile(data_arr, [25, 50, 75])
+                    summary.append({
+                        'run_id': run_id, 'variable': variable,
+                        'scenario': name, 'channel': channel,
+                        'count': len(data_arr), 'mean': data_arr.mean(),
+                        'std': data_arr.std(), '_min': data_arr.min(),
+                        'quant1': quantiles[0], 'median': quantiles[1],
+                        'quant3': quantiles[2], '_max': data_arr.max()})
+                for node in EIGHT_NODES:
+                    hydro.append(pd.DataFrame({
+                        'run_id': run_id,
+                        'path': '/DSM2/{}/{}//15MIN/{}/'.format(
+                            node, variable, name.upper()),
+                        'variable': variable, 'channel': node,
+                        'scenario': name, 'unit': unit,
+                        'datetime': datetimes,
+                        'value': (mean + offset * spread / 4. +
+                                  rng.normal(0., spread / 5.,
+                                             len(datetimes)))}))
+            ks += [{'run_id': run_id, 'variable': variable,
+                    'scenario0': 'Baseline', 'scenario1': scenario,
+                    'channel': channel,
+                    'ks_stat': ks_distance(samples[('Baseline', channel)],
+                                           samples[(scenario, channel)])}
+                   for channel in channels]
+        return {'HydroTable': pd.concat(hydro, ignore_index=True),
+                'VarTotal': pd.concat(total, ignore_index=True),
+                'VarSummary': pd.DataFrame(summary),
+                'VarKS': pd.DataFrame(ks)}
+
+    def handle(self, *args, **options):
+        start = time.time()
+        if min(options['runs'], options['channels'], options['days']) < 1:
+            raise CommandError('--runs, --channels and --days must be at '
+                               'least 1')
+        try:
+            first_day = pd.Timestamp(options['start'])
+        except ValueError:
+            raise CommandError('--start {} is not a YYYY-MM-DD date'
+                               .format(options['start']))
+        last_day = first_day + pd.Timedelta(days=options['days'])
+        # the views read the run's dates from the end of its run_id
+        datetimes = pd.date_range(first_day, last_day, freq=SAMPLE_FREQ)
+        tables_folder = (options['tables_folder'] or
+                         tempfile.mkdtemp(prefix='wiin_loadtest_'))
+        rng = np.random.default_rng(options['seed'])
+        channels = list(range(1, options['channels'] + 1))
+        for i in range(options['runs']):
+            run_id = 'loadtest{}_{}_{}'.format(i + 1,
+                                               first_day.strftime('%Y%m%d'),
+                                               last_day.strftime('%Y%m%d'))
+            # the tables pair Baseline with a single OMR scenario
+            scenario = 'OMR-{}'.format(5000 + 500 * i)
+            run_folder = os.path.join(tables_folder, run_id)
+            os.makedirs(run_folder, exist_ok=True)
+            for table_name, df in self._run_tables(rng, run_id, scenario,
+                                                   datetimes,
+                                                   channels).items():
+                df.to_csv(os.path.join(run_folder, table_name + '.csv'),
+                          index=False)
+                print('Wrote {} {} rows for {}'.format(len(df), table_name,
+                                                       run_id))
+            call_command('populate_db', tables_folder=run_folder,
+                         replace=True, chunksize=options['chunksize'],
+                         skip_warm_cache=options['skip_warm_cache'])
+        print('Seeded {} runs of {} channels and {} days from {}'.format(
+            options['runs'], options['channels'], options['days'],
+            tables_folder))
+        elapsed_time = time.time() - start
+        print('Runtime: {} seconds'.format(round(elapsed_time, 5)))
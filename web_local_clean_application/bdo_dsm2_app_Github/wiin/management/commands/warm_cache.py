@@ -0,0 +1,121 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from wiin import run_cache
+from wiin.models import RunIdTable, VarKSTable
+from wiin.partitions import run_db
+from wiin.utils import (MAX_BATCH_CHANNELS, get_channel_node_columns,
+                        get_ecdf_batch, get_mapKS, get_summary_columns)
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import django
+import os
+import time
+
+
+def _warm(kind, run_id, version, args):
+    """ Computes and caches the results of one task in a worker process
+
+    Returns
+    -------
+    int
+        The number of cache entries written
+    """
+    if kind == 'summary':
+        results = {tuple(args): get_summary_columns(run_id, *args)}
+    elif kind == 'node':
+        results = {tuple(args): get_channel_node_columns(run_id, *args)}
+    elif kind == 'mapks':
+        results = {tuple(args): get_mapKS(run_id, *args)}
+    else:
+        # the compact map graph payload of every channel, in batches
+        scenario, variable, channels = args
+        results = {}
+        for i in range(0, len(channels), MAX_BATCH_CHANNELS):
+            batch = get_ecdf_batch(run_id, scenario, variable,
+                                   channels[i:i + MAX_BATCH_CHANNELS])
+            for payload in batch['channels']:
+                channel = payload.pop('channel')
+                results[(scenario, variable, channel)] = payload
+    cache.set_many({run_cache.cache_key(run_id, version, kind, *key): value
+                    for key, value in results.items()},
+                   run_cache.RUN_CACHE_TIMEOUT)
+    return len(results)
+
+
+class Command(BaseCommand):
+    help = 'Precomputes the summary tables, channel node tables, map graphs \
+            and map KS overlays of runs into the cache, in parallel worker \
+            processes, so the views answer from the cache from their first \
+            request. populate_db runs it for the runs it loads.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--run_id', type=str, nargs='+', help="The \
+                            run_id names to warm; all loaded runs if not \
+                            given")
+        parser.add_argument('--workers', type=int,
+                            default=min(4, os.cpu_count() or 1),
+                            help="Number of worker processes (default: up \
+                            to 4)")
+
+    def _tasks(self, run_id, version):
+        tasks = [('summary', run_id, version, [summary_range])
+                 for summary_range in run_cache.SUMMARY_RANGES]
+        tasks += [('node', run_id, version, [variable])
+                  for variable in run_cache.NODE_VARIABLES]
+        ks_query = (VarKSTable.objects.using(run_db(run_id))
+                    .filter(run_id__run_id=run_id,
+                            scenario0__scenario='Baseline')
+                    .values_list('scenario1__scenario', 'variable__variable',
+                                 'channel')
+                    .order_by('scenario1__scenario', 'variable__variable',
+                              'channel'))
+        channels = {}
+        for scenario, variable, channel in ks_query:
+            channels.setdefault((scenario, variable), []).append(channel)
+        for (scenario, variable), pair_channels in channels.items():
+            tasks.append(('mapks', run_id, version, [scenario, variable]))
+            tasks.append(('mapgraph', run_id, version,
+                          [scenario, variable, pair_channels]))
+        return tasks
+
+    def handle(self, *args, **options):
+        start = time.time()
+        if not run_cache.is_shared():
+            raise CommandError('The cache is local to each process, so the '
+                               'server would not see what warm_cache '
+                               'stores; configure a shared cache in '
+                               'settings.CACHES')
+        runs = RunIdTable.objects.all()
+        if options['run_id']:
+            runs = runs.filter(run_id__in=options['run_id'])
+            unknown = (set(options['run_id']) -
+                       set(runs.values_list('run_id', flat=True)))
+            if unknown:
+                raise CommandError('Unknown run_id {}'.format(
+                    ', '.join(sorted(unknown))))
+        tasks = []
+        for run_id, last_modified in runs.values_list('run_id',
+                                                      'last_modified'):
+            tasks += self._tasks(run_id, last_modified.timestamp())
+        # the workers open their own connections
+        connections.close_all()
+        entries = 0
+        failed = 0
+        os.environ.setdefault('DJANGO_SETTINGS_MODULE',
+                              settings.SETTINGS_MODULE)
+        with ProcessPoolExecutor(max_workers=options['workers'],
+                                 initializer=django.setup) as executor:
+            futures = {executor.submit(_warm, *task): task for task in tasks}
+            for future in as_completed(futures):
+                kind, run_id, version, task_args = futures[future]
+                try:
+                    entries += future.result()
+                except Exception as e:
+                    failed += 1
+                    print('Could not warm {} {} {}: {!r}'.format(
+                        run_id, kind, task_args[:2], e))
+        print('Cached {} entries for {} tasks ({} failed)'.format(
+            entries, len(tasks), failed))
+        elapsed_time = time.time() - start
+        print('Runtime: {} seconds'.format(round(elapsed_time, 5)))
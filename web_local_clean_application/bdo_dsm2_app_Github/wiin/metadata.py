@@ -0,0 +1,53 @@
+"""
+Run, scenario and variable lists for the page views.
+
+The pages used to fetch these from the app's own REST API over HTTP. They
+are now read in-process and kept in Django's cache. Each call re-reads only
+the small RunIdTable (id, run_id, last_modified), which doubles as the cache
+check: populate_db touches last_modified of every run it loads and
+compact_db deletes runs, so a changed list means the cached scenarios and
+variables are rebuilt even when the cache lives in another process.
+populate_db and compact_db also call invalidate() directly.
+"""
+from django.core.cache import cache
+from wiin.models import RunIdTable, ScenarioTable, VariableTable
+
+METADATA_CACHE_KEY = 'wiin:metadata'
+
+
+def _build(runs):
+    scenarios = (ScenarioTable.objects.exclude(scenario='Baseline')
+                 .order_by('id').values_list('scenario', 'run_id__run_id'))
+    variables = []
+    for variable in (VariableTable.objects.order_by('id')
+                     .values_list('variable', flat=True)):
+        if variable not in variables:
+            variables.append(variable)
+    return {'runs': runs,
+            'run_ids': [run_id for pk, run_id, last_modified in runs],
+            'scenarios': [{'scenario': scenario, 'run_id': run_id}
+                          for scenario, run_id in scenarios],
+            'variables': variables}
+
+
+def get_metadata():
+    """ Returns the loaded runs with their compared scenarios and variables
+
+    Returns
+    -------
+    dict
+        'run_ids': the run_id names in load order, 'scenarios': a
+        {'scenario', 'run_id'} dict for every non-Baseline scenario and
+        'variables': the distinct variable names
+    """
+    runs = list(RunIdTable.objects.values_list('id', 'run_id',
+                                               'last_modified'))
+    metadata = cache.get(METADATA_CACHE_KEY)
+    if metadata is None or metadata['runs'] != runs:
+        metadata = _build(runs)
+        cache.set(METADATA_CACHE_KEY, metadata, None)
+    return metadata
+
+
+def invalidate():
+    cache.delete(METADATA_CACHE_KEY)
@@ -0,0 +1,112 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:49
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RunIdTable',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_id', models.CharField(max_length=50)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_modified', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'ordering': ['created'],
+            },
+        ),
+        migrations.CreateModel(
+            name='UnitTable',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('unit', models.CharField(max_length=10)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VariableTable',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('variable', models.CharField(max_length=50)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ScenarioTable',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scenario', models.CharField(max_length=50)),
+                ('run_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.runidtable')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='HydroTable',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(max_length=200)),
+                ('channel', models.CharField(max_length=50)),
+                ('datetime', models.DateTimeField()),
+                ('value', models.FloatField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_modified', models.DateTimeField(auto_now=True)),
+                ('run_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.runidtable')),
+                ('scenario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.scenariotable')),
+                ('unit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.unittable')),
+                ('variable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.variabletable')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VarKSTable',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.PositiveSmallIntegerField()),
+                ('ks_stat', models.FloatField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_modified', models.DateTimeField(auto_now=True)),
+                ('run_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.runidtable')),
+                ('scenario0', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='b', to='wiin.scenariotable')),
+                ('scenario1', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='s', to='wiin.scenariotable')),
+                ('variable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.variabletable')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VarSummaryTable',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.PositiveSmallIntegerField()),
+                ('mean', models.FloatField()),
+                ('std', models.FloatField()),
+                ('_min', models.FloatField()),
+                ('quant1', models.FloatField()),
+                ('median', models.FloatField()),
+                ('quant3', models.FloatField()),
+                ('_max', models.FloatField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_modified', models.DateTimeField(auto_now=True)),
+                ('run_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.runidtable')),
+                ('scenario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.scenariotable')),
+                ('variable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.variabletable')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VarTotalTable',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.PositiveSmallIntegerField()),
+                ('datetime', models.DateTimeField()),
+                ('value', models.FloatField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_modified', models.DateTimeField(auto_now=True)),
+                ('run_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.runidtable')),
+                ('scenario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.scenariotable')),
+                ('variable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.variabletable')),
+            ],
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiin', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='hydrotable',
+            index=models.Index(fields=['run_id', 'variable'], name='hydro_run_var_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='varkstable',
+            index=models.Index(fields=['run_id', 'variable', 'scenario0', 'scenario1'], name='varks_run_var_scen_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vartotaltable',
+            index=models.Index(fields=['run_id', 'variable', 'scenario', 'channel'], name='vartotal_run_var_scen_chan_idx'),
+        ),
+    ]
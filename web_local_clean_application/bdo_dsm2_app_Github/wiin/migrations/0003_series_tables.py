@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiin', '0002_composite_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HydroSeriesTable',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('interval', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField()),
+                ('values', models.BinaryField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_modified', models.DateTimeField(auto_now=True)),
+                ('path', models.CharField(max_length=200)),
+                ('channel', models.CharField(max_length=50)),
+                ('run_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.runidtable')),
+                ('scenario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.scenariotable')),
+                ('unit', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.unittable')),
+                ('variable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.variabletable')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run_id', 'variable', 'scenario', 'channel'], name='hydroser_run_var_scen_chan_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VarTotalSeriesTable',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('start', models.DateTimeField()),
+                ('interval', models.PositiveIntegerField()),
+                ('count', models.PositiveIntegerField()),
+                ('values', models.BinaryField()),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_modified', models.DateTimeField(auto_now=True)),
+                ('channel', models.PositiveSmallIntegerField()),
+                ('run_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.runidtable')),
+                ('scenario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.scenariotable')),
+                ('variable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.variabletable')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run_id', 'variable', 'scenario', 'channel'], name='totalser_run_var_scen_chan_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiin', '0003_series_tables'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VarEcdfTable',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('channel', models.PositiveSmallIntegerField()),
+                ('count', models.PositiveIntegerField()),
+                ('x', models.BinaryField()),
+                ('ks_stat', models.FloatField(null=True)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('last_modified', models.DateTimeField(auto_now=True)),
+                ('run_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.runidtable')),
+                ('scenario', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.scenariotable')),
+                ('variable', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='wiin.variabletable')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['run_id', 'variable', 'scenario', 'channel'], name='varecdf_run_var_scen_chan_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('wiin', '0004_ecdf_table'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='hydrotable',
+            name='hydro_run_var_idx',
+        ),
+        migrations.AddIndex(
+            model_name='hydrotable',
+            index=models.Index(fields=['run_id', 'variable', 'channel'], name='hydro_run_var_chan_idx'),
+        ),
+    ]
@@ -1,88 +1,211 @@
-from django.db import models
-
-# Create your models here.
-
-
-class RunIdTable(models.Model):
-    run_id = models.CharField(max_length=50)
-    created = models.DateTimeField(auto_now_add=True, editable=False,
-                                   null=False, blank=False)
-    last_modified = models.DateTimeField(auto_now=True, editable=False,
-                                         null=False, blank=False)
-
-    class Meta:
-        ordering = ['created']
-
-
-class VariableTable(models.Model):
-    variable = models.CharField(max_length=50)
-
-
-class ScenarioTable(models.Model):
-    run_id = models.ForeignKey(RunIdTable, on_delete=models.CASCADE)
-    scenario = models.CharField(max_length=50)
-
-
-class UnitTable(models.Model):
-    unit = models.CharField(max_length=10)
-
-
-class HydroTable(models.Model):
-    run_id = models.ForeignKey(RunIdTable, on_delete=models.CASCADE)
-    path = models.CharField(max_length=200)
-    variable = models.ForeignKey(VariableTable, on_delete=models.CASCADE)
-    channel = models.CharField(max_length=50)
-    scenario = models.ForeignKey(ScenarioTable, on_delete=models.CASCADE)
-    unit = models.ForeignKey(UnitTable, on_delete=models.CASCADE)
-    datetime = models.DateTimeField()
-    value = models.FloatField()
-    created = models.DateTimeField(auto_now_add=True, editable=False,
-                                   null=False, blank=False)
-    last_modified = models.DateTimeField(auto_now=True, editable=False,
-                                         null=False, blank=False)
-
-
-class VarSummaryTable(models.Model):
-    run_id = models.ForeignKey(RunIdTable, on_delete=models.CASCADE)
-    variable = models.ForeignKey(VariableTable, on_delete=models.CASCADE)
-    scenario = models.ForeignKey(ScenarioTable, on_delete=models.CASCADE)
-    channel = models.PositiveSmallIntegerField()
-    mean = models.FloatField()
-    std = models.FloatField()
-    _min = models.FloatField()
-    quant1 = models.FloatField()
-    median = models.FloatField()
-    quant3 = models.FloatField()
-    _max = models.FloatField()
-    created = models.DateTimeField(auto_now_add=True, editable=False,
-                                   null=False, blank=False)
-    last_modified = models.DateTimeField(auto_now=True, editable=False,
-                                         null=False, blank=False)
-
-
-class VarTotalTable(models.Model):
-    run_id = models.ForeignKey(RunIdTable, on_delete=models.CASCADE)
-    variable = models.ForeignKey(VariableTable, on_delete=models.CASCADE)
-    scenario = models.ForeignKey(ScenarioTable, on_delete=models.CASCADE)
-    channel = models.PositiveSmallIntegerField()
-    datetime = models.DateTimeField()
-    value = models.FloatField()
-    created = models.DateTimeField(auto_now_add=True, editable=False,
-                                   null=False, blank=False)
-    last_modified = models.DateTimeField(auto_now=True, editable=False,
-                                         null=False, blank=False)
-
-
-class VarKSTable(models.Model):
-    run_id = models.ForeignKey(RunIdTable, on_delete=models.CASCADE)
-    variable = models.ForeignKey(VariableTable, on_delete=models.CASCADE)
-    scenario0 = models.ForeignKey(ScenarioTable, on_delete=models.CASCADE,
-                                  related_name='b')
-    scenario1 = models.ForeignKey(ScenarioTable, on_delete=models.CASCADE,
-                                  related_name='s')
-    channel = models.PositiveSmallIntegerField()
-    ks_stat = models.FloatField()
-    created = models.DateTimeField(auto_now_add=True, editable=False,
-                                   null=False, blank=False)
-    last_modified = models.DateTimeField(auto_now=True, editable=False,
-                                         null=False, blank=False)
+from django.db import models
+import functools
+import numpy as np
+import pandas as pd
+
+# Create your models here.
+
+
+class RunIdTable(models.Model):
+    run_id = models.CharField(max_length=50)
+    created = models.DateTimeField(auto_now_add=True, editable=False,
+                                   null=False, blank=False)
+    last_modified = models.DateTimeField(auto_now=True, editable=False,
+                                         null=False, blank=False)
+
+    class Meta:
+        ordering = ['created']
+
+
+class VariableTable(models.Model):
+    variable = models.CharField(max_length=50)
+
+
+class ScenarioTable(models.Model):
+    run_id = models.ForeignKey(RunIdTable, on_delete=models.CASCADE)
+    scenario = models.CharField(max_length=50)
+
+
+class UnitTable(models.Model):
+    unit = models.CharField(max_length=10)
+
+
+class HydroTable(models.Model):
+    run_id = models.ForeignKey(RunIdTable, on_delete=models.CASCADE)
+    path = models.CharField(max_length=200)
+    variable = models.ForeignKey(VariableTable, on_delete=models.CASCADE)
+    channel = models.CharField(max_length=50)
+    scenario = models.ForeignKey(ScenarioTable, on_delete=models.CASCADE)
+    unit = models.ForeignKey(UnitTable, on_delete=models.CASCADE)
+    datetime = models.DateTimeField()
+    value = models.FloatField()
+    created = models.DateTimeField(auto_now_add=True, editable=False,
+                                   null=False, blank=False)
+    last_modified = models.DateTimeField(auto_now=True, editable=False,
+                                         null=False, blank=False)
+
+    class Meta:
+        # get_summary_table filters on run_id, get_channel_node_table on
+        # (run_id, variable, channel); both are served by the same leading
+        # columns
+        indexes = [models.Index(fields=['run_id', 'variable', 'channel'],
+                                name='hydro_run_var_chan_idx')]
+
+
+class VarSummaryTable(models.Model):
+    run_id = models.ForeignKey(RunIdTable, on_delete=models.CASCADE)
+    variable = models.ForeignKey(VariableTable, on_delete=models.CASCADE)
+    scenario = models.ForeignKey(ScenarioTable, on_delete=models.CASCADE)
+    channel = models.PositiveSmallIntegerField()
+    mean = models.FloatField()
+    std = models.FloatField()
+    _min = models.FloatField()
+    quant1 = models.FloatField()
+    median = models.FloatField()
+    quant3 = models.FloatField()
+    _max = models.FloatField()
+    created = models.DateTimeField(auto_now_add=True, editable=False,
+                                   null=False, blank=False)
+    last_modified = models.DateTimeField(auto_now=True, editable=False,
+                                         null=False, blank=False)
+
+
+class VarTotalTable(models.Model):
+    run_id = models.ForeignKey(RunIdTable, on_delete=models.CASCADE)
+    variable = models.ForeignKey(VariableTable, on_delete=models.CASCADE)
+    scenario = models.ForeignKey(ScenarioTable, on_delete=models.CASCADE)
+    channel = models.PositiveSmallIntegerField()
+    datetime = models.DateTimeField()
+    value = models.FloatField()
+    created = models.DateTimeField(auto_now_add=True, editable=False,
+                                   null=False, blank=False)
+    last_modified = models.DateTimeField(auto_now=True, editable=False,
+                                         null=False, blank=False)
+
+    class Meta:
+        # get_mapgraph looks up one channel's series per request
+        indexes = [models.Index(fields=['run_id', 'variable', 'scenario',
+                                        'channel'],
+                                name='vartotal_run_var_scen_chan_idx')]
+
+
+class VarKSTable(models.Model):
+    run_id = models.ForeignKey(RunIdTable, on_delete=models.CASCADE)
+    variable = models.ForeignKey(VariableTable, on_delete=models.CASCADE)
+    scenario0 = models.ForeignKey(ScenarioTable, on_delete=models.CASCADE,
+                                  related_name='b')
+    scenario1 = models.ForeignKey(ScenarioTable, on_delete=models.CASCADE,
+                                  related_name='s')
+    channel = models.PositiveSmallIntegerField()
+    ks_stat = models.FloatField()
+    created = models.DateTimeField(auto_now_add=True, editable=False,
+                                   null=False, blank=False)
+    last_modified = models.DateTimeField(auto_now=True, editable=False,
+                                         null=False, blank=False)
+
+    class Meta:
+        # get_mapKS reads every channel of one baseline/scenario comparison
+        indexes = [models.Index(fields=['run_id', 'variable', 'scenario0',
+                                        'scenario1'],
+                                name='varks_run_var_scen_idx')]
+
+
+class SeriesModel(models.Model):
+    """ One whole regular time series stored as a single row
+
+    The samples are kept as a little-endian float32 blob together with the
+    start time, the interval in seconds and the sample count, so a channel's
+    series is one row rather than one row per 15 minute value. Gaps in the
+    source data are stored as NaN.
+    """
+    start = models.DateTimeField()
+    interval = models.PositiveIntegerField()
+    count = models.PositiveIntegerField()
+    values = models.BinaryField()
+    created = models.DateTimeField(auto_now_add=True, editable=False,
+                                   null=False, blank=False)
+    last_modified = models.DateTimeField(auto_now=True, editable=False,
+                                         null=False, blank=False)
+
+    class Meta:
+        abstract = True
+
+    def to_numpy(self):
+        """ The samples as a read-only float32 array over the blob, no copy """
+        return np.frombuffer(self.values, dtype='<f4', count=self.count)
+
+    def datetimes(self):
+        return pd.date_range(self.start, periods=self.count,
+                             freq=pd.Timedelta(seconds=self.interval))
+
+
+class HydroSeriesTable(SeriesModel):
+    run_id = models.ForeignKey(RunIdTable, on_delete=models.CASCADE)
+    path = models.CharField(max_length=200)
+    variable = models.ForeignKey(VariableTable, on_delete=models.CASCADE)
+    channel = models.CharField(max_length=50)
+    scenario = models.ForeignKey(ScenarioTable, on_delete=models.CASCADE)
+    unit = models.ForeignKey(UnitTable, on_delete=models.CASCADE)
+
+    class Meta:
+        indexes = [models.Index(fields=['run_id', 'variable', 'scenario',
+                                        'channel'],
+                                name='hydroser_run_var_scen_chan_idx')]
+
+
+class VarTotalSeriesTable(SeriesModel):
+    run_id = models.ForeignKey(RunIdTable, on_delete=models.CASCADE)
+    variable = models.ForeignKey(VariableTable, on_delete=models.CASCADE)
+    scenario = models.ForeignKey(ScenarioTable, on_delete=models.CASCADE)
+    channel = models.PositiveSmallIntegerField()
+
+    class Meta:
+        # get_mapgraph reads the baseline and scenario series of one channel
+        indexes = [models.Index(fields=['run_id', 'variable', 'scenario',
+                                        'channel'],
+                                name='totalser_run_var_scen_chan_idx')]
+
+
+@functools.lru_cache(maxsize=32)
+def ecdf_y(count):
+    """ The rounded ECDF y values of a `count` sample series, read-only
+
+    They depend on nothing but the sample count, so they are built once per
+    count instead of being stored with every VarEcdfTable row.
+    """
+    y = np.around(np.r_[0., np.linspace(1. / count, 1, count)], decimals=4)
+    y.setflags(write=False)
+    return y
+
+
+class VarEcdfTable(models.Model):
+    """ The map graph ECDF of one VarTotal series, precomputed by populate_db
+
+    `x` holds the rounded ECDF x values get_mapgraph plots (the sorted
+    samples after a leading -inf) as a little-endian float32 blob, and
+    `ks_stat` the Kolmogorov-Smirnov distance to the run's Baseline series of
+    the same variable and channel, null on the Baseline row itself.
+    """
+    run_id = models.ForeignKey(RunIdTable, on_delete=models.CASCADE)
+    variable = models.ForeignKey(VariableTable, on_delete=models.CASCADE)
+    scenario = models.ForeignKey(ScenarioTable, on_delete=models.CASCADE)
+    channel = models.PositiveSmallIntegerField()
+    count = models.PositiveIntegerField()
+    x = models.BinaryField()
+    ks_stat = models.FloatField(null=True)
+    created = models.DateTimeField(auto_now_add=True, editable=False,
+                                   null=False, blank=False)
+    last_modified = models.DateTimeField(auto_now=True, editable=False,
+                                         null=False, blank=False)
+
+    class Meta:
+        # get_mapgraph reads the baseline and scenario rows of one channel
+        indexes = [models.Index(fields=['run_id', 'variable', 'scenario',
+                                        'channel'],
+                                name='varecdf_run_var_scen_chan_idx')]
+
+    def x_values(self):
+        return np.frombuffer(self.x, dtype='<f4', count=self.count + 1)
+
+    def y_values(self):
+        return ecdf_y(self.count)
@@ -0,0 +1,64 @@
+"""
+Moving the blocking work of the async views off the event loop.
+
+The map and table views are async, so under ASGI one process serves many
+requests at once. Their database reads run in worker threads through
+read_db(), and their pandas/NumPy/Plotly work through compute(), which uses
+a pool of settings.WIIN_COMPUTE_THREADS threads: a burst of table requests
+queues there instead of oversubscribing the CPU, while the event loop keeps
+accepting requests. The app needs Django 4.2 or later with asgiref 3.6 or
+later (see requirements.txt).
+"""
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections
+
+_compute_pool = None
+_compute_pool_lock = threading.Lock()
+
+
+def compute_pool():
+    """ The bounded thread pool compute() runs in, created on first use """
+    global _compute_pool
+    with _compute_pool_lock:
+        if _compute_pool is None:
+            _compute_pool = ThreadPoolExecutor(
+                max_workers=settings.WIIN_COMPUTE_THREADS,
+                thread_name_prefix='wiin-compute')
+    return _compute_pool
+
+
+async def compute(func, *args, **kwargs):
+    """ Awaits func(*args, **kwargs) run in the compute pool """
+    loop = asyncio.get_running_loop()
+    # run_in_executor does not carry the context variables over by itself
+    context = contextvars.copy_context()
+    return await loop.run_in_executor(
+        compute_pool(), functools.partial(context.run, func, *args, **kwargs))
+
+
+def _closing_connections(func):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            # the worker thread's connections, as at the end of a request
+            close_old_connections()
+    return wrapper
+
+
+async def read_db(func, *args, **kwargs):
+    """ Awaits the ORM reads of func(*args, **kwargs)
+
+    They run outside the event loop in a worker thread of their own
+    (thread_sensitive=False), so concurrent requests query in parallel
+    rather than one after another on the shared sync thread.
+    """
+    return await sync_to_async(_closing_connections(func),
+                               thread_sensitive=False)(*args, **kwargs)
@@ -0,0 +1,255 @@
+"""
+Per-run SQLite partitions for the fact tables.
+
+When settings.WIIN_PARTITION_DIR is set, populate_db stores each run's
+HydroTable, VarSummary, VarTotal, VarKS and series rows in its own
+<run_id>.<version>.sqlite3 file in that folder, together with copies of the run,
+scenario, variable and unit rows they point at so the foreign keys hold
+inside the file. The main database keeps only those dimension tables.
+
+Views look a run's database up with run_db() and query it with .using();
+the newest version of the file is registered as a Django database the first
+time it is needed. A reload is published as a new version, so a file a
+server process may have open is never replaced or written to, and
+superseded versions are deleted once no connection in this process uses
+them. Runs loaded before partitioning was switched on stay in the main
+database.
+"""
+import os
+import re
+import threading
+import time
+from django.conf import settings
+from django.db import connections
+
+PARTITION_PREFIX = 'partition_'
+
+# run_ids come from the browser, so only plain names may become file names
+RUN_ID_PATTERN = re.compile(r'^[A-Za-z0-9_\-]+$')
+
+# <run_id>.<version>.sqlite3, or <run_id>.sqlite3 for a file written before
+# partitions were versioned (version 0)
+PARTITION_FILE_PATTERN = re.compile(
+    r'^(?P<run_id>[A-Za-z0-9_\-]+)(\.(?P<version>\d+))?\.sqlite3$')
+
+_register_lock = threading.Lock()
+
+# (folder, mtime) and the partition files found in it, see _partition_files
+_listing = [None, []]
+
+
+def partitions_enabled():
+    return bool(getattr(settings, 'WIIN_PARTITION_DIR', None))
+
+
+def _check_run_id(run_id):
+    if not RUN_ID_PATTERN.match(run_id or ''):
+        raise ValueError('run_id {!r} cannot name a partition file'
+                         .format(run_id))
+
+
+def partition_path(run_id, version):
+    _check_run_id(run_id)
+    name = ('{}.{}.sqlite3'.format(run_id, version) if version
+            else '{}.sqlite3'.format(run_id))
+    return os.path.join(settings.WIIN_PARTITION_DIR, name)
+
+
+def _partition_files():
+    """ The (run_id, version) of every partition file, from a listing of the
+    folder that is only repeated once the folder has changed """
+    folder = settings.WIIN_PARTITION_DIR
+    try:
+        mtime = os.stat(folder).st_mtime_ns
+    except FileNotFoundError:
+        return []
+    key, files = _listing
+    # a folder changed in the last seconds is listed again, since a coarse
+    # file system clock can give two changes the same mtime
+    if key != (folder, mtime) or time.time_ns() - mtime < 2 * 10**9:
+        files = [(match.group('run_id'), int(match.group('version') or 0))
+                 for match in map(PARTITION_FILE_PATTERN.match,
+                                  os.listdir(folder))
+                 if match]
+        _listing[:] = [(folder, mtime), files]
+    return files
+
+
+def partition_versions(run_id):
+    """ The versions of the partition files of `run_id`, oldest first """
+    _check_run_id(run_id)
+    return sorted(version for name, version in _partition_files()
+                  if name == run_id)
+
+
+def _alias(run_id, version):
+    if not version:
+        return PARTITION_PREFIX + run_id
+    return '{}{}__v{}'.format(PARTITION_PREFIX, run_id, version)
+
+
+def is_partition(alias):
+    return alias.startswith(PARTITION_PREFIX)
+
+
+def _register(alias, pathname):
+    if alias not in connections.databases:
+        with _register_lock:
+            if alias not in connections.databases:
+                os.makedirs(os.path.dirname(pathname), exist_ok=True)
+                # same backend settings as the main database, other file
+                connections.databases[alias] = dict(
+                    connections.databases['default'], NAME=pathname)
+    return alias
+
+
+def _remove_files(alias, pathname):
+    if alias in connections.databases:
+        connections[alias].close()
+    freed = 0
+    for p in [pathname, pathname + '-wal', pathname + '-shm']:
+        if os.path.exists(p):
+            freed += os.path.getsize(p)
+            os.remove(p)
+    return freed
+
+
+def _retire_version(run_id, version):
+    """ Deletes a partition file run_db() no longer returns
+
+    Returns the bytes freed, or 0 when the file is left in place because
+    another process may still be reading it: while a file has a -wal it is
+    open in WAL mode somewhere, and Windows refuses to delete an open file.
+    On POSIX a connection that still has the deleted file open keeps
+    reading it, as the file is never written again.
+    """
+    alias = _alias(run_id, version)
+    pathname = partition_path(run_id, version)
+    if alias in connections.databases:
+        connections[alias].close()
+    if os.path.exists(pathname + '-wal'):
+        return 0
+    try:
+        freed = os.path.getsize(pathname)
+        os.remove(pathname)
+    except OSError:
+        return 0
+    return freed
+
+
+def run_db(run_id):
+    """ Returns the database alias holding the fact rows of `run_id`
+
+    Parameters
+    ----------
+    run_id : str
+        The RunIdTable.run_id name of the run
+
+    Returns
+    -------
+    str
+        'default' when partitioning is off or the run has no partition
+        file, otherwise the alias of the run's newest partition file
+    """
+    if not partitions_enabled():
+        return 'default'
+    versions = partition_versions(run_id)
+    if not versions:
+        return 'default'
+    return _register(_alias(run_id, versions[-1]),
+                     partition_path(run_id, versions[-1]))
+
+
+def _loading_path(run_id):
+    return partition_path(run_id, 0) + '.loading'
+
+
+def loading_db(run_id):
+    """ Returns the alias of an empty file to load a new copy of `run_id` into
+
+    The views keep reading the current partition until publish_partition()
+    adds the loaded file as the run's newest version, and a failed load is
+    thrown away with discard_loading().
+    """
+    alias = PARTITION_PREFIX + run_id + '__loading'
+    pathname = _loading_path(run_id)
+    _remove_files(alias, pathname)
+    return _register(alias, pathname)
+
+
+def publish_partition(run_id):
+    """ Makes the loaded file of `run_id` its newest partition version
+
+    The loaded file is checkpointed and closed, then renamed to a version
+    no process has opened yet, so readers of the previous version are not
+    disturbed; the superseded versions are deleted where that is safe.
+
+    Returns
+    -------
+    str
+        The pathname of the published partition file
+    """
+    loading = connections[PARTITION_PREFIX + run_id + '__loading']
+    if loading.vendor == 'sqlite':
+        with loading.cursor() as cursor:
+            cursor.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+    loading.close()
+    previous = partition_versions(run_id)
+    # milliseconds, so a version is not reused after the run is dropped
+    version = max(previous[-1:] + [int(time.time() * 1000) - 1]) + 1
+    pathname = partition_path(run_id, version)
+    os.replace(_loading_path(run_id), pathname)
+    drop_superseded(run_id)
+    return pathname
+
+
+def discard_loading(run_id):
+    _remove_files(PARTITION_PREFIX + run_id + '__loading',
+                  _loading_path(run_id))
+
+
+def partition_run_ids():
+    """ Lists the run_ids that have a partition file """
+    if not partitions_enabled():
+        return []
+    return sorted({name for name, version in _partition_files()})
+
+
+def drop_superseded(run_id):
+    """ Deletes the partition files of `run_id` older than its newest one
+
+    Returns
+    -------
+    int
+        The number of bytes the removed files took on disk
+    """
+    return sum(_retire_version(run_id, version)
+               for version in partition_versions(run_id)[:-1])
+
+
+def drop_partition(run_id):
+    """ Closes and deletes the partition files of `run_id`
+
+    A file another process still has open is left in place, see
+    _retire_version(); compact_db removes it on a later run.
+
+    Returns
+    -------
+    int
+        The number of bytes the removed files took on disk
+    """
+    return sum(_retire_version(run_id, version)
+               for version in partition_versions(run_id))
+
+
+class PartitionRouter(object):
+    """ Keeps everything but the wiin tables out of the partition files
+
+    Queries are sent to a partition explicitly with .using(run_db(...)), so
+    only migrations are routed here.
+    """
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if is_partition(db):
+            return app_label == 'wiin'
+        return None
@@ -0,0 +1,215 @@
+"""
+Where the time of each request goes.
+
+RequestProfileMiddleware records, per request, the number and total time of
+its SQL queries, the time spent in the @timed functions of utils (reading,
+reshaping and Plotly encoding) and in response serialization, and the size
+of the response (counted as it is sent for a streamed response). The figures
+are sent back in a Server-Timing header, which
+the browser's developer tools show next to the request, and the last
+settings.WIIN_PROFILE_BUFFER requests are kept in memory for the DEBUG-only
+/debug/requests/ page.
+
+The record lives in a context variable, so it follows the request into the
+read_db() and compute() threads of the async views; the queries are counted
+by an execute wrapper that WiinConfig.ready() installs on every database
+connection. The middleware uses the asgiref coroutine helpers of asgiref 3.6
+or later, which Django 4.2 and later require (see requirements.txt).
+"""
+import collections
+import contextlib
+import contextvars
+import functools
+import threading
+import time
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+
+_current = contextvars.ContextVar('wiin_request_profile', default=None)
+_buffer_lock = threading.Lock()
+_buffer = None
+
+# requests to these paths are not recorded
+UNPROFILED_PREFIXES = ('/debug/', '/static/')
+
+
+class RequestProfile(object):
+    """ The measurements of one request """
+
+    def __init__(self, request):
+        self.method = request.method
+        self.path = request.path
+        self.started = time.time()
+        self.queries = 0
+        self.query_seconds = 0.
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def add_query(self, seconds):
+        with self._lock:
+            self.queries += 1
+            self.query_seconds += seconds
+
+    def add_span(self, name, seconds):
+        with self._lock:
+            count, total = self.spans.get(name, (0, 0.))
+            self.spans[name] = (count + 1, total + seconds)
+
+    def as_dict(self, status, size, seconds):
+        return {'method': self.method, 'path': self.path,
+                'started': self.started, 'status': status,
+                'ms': round(seconds * 1000, 2), 'bytes': size,
+                'queries': self.queries,
+                'query_ms': round(self.query_seconds * 1000, 2),
+                'spans': {name: {'calls': count,
+                                 'ms': round(total * 1000, 2)}
+                          for name, (count, total) in self.spans.items()}}
+
+    def server_timing(self, seconds):
+        metrics = ['db;dur={:.1f};desc="{} queries"'.format(
+            self.query_seconds * 1000, self.queries)]
+        metrics += ['{};dur={:.1f}'.format(name, total * 1000)
+                    for name, (count, total) in self.spans.items()]
+        metrics.append('total;dur={:.1f}'.format(seconds * 1000))
+        return ', '.join(metrics)
+
+
+@contextlib.contextmanager
+def span(name):
+    """ Adds the time spent in the block to the request's `name` span """
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile.add_span(name, time.perf_counter() - start)
+
+
+def timed(func):
+    """ Records the calls of `func` as a span named after it """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _current.get() is None:
+            return func(*args, **kwargs)
+        with span(func.__name__):
+            return func(*args, **kwargs)
+    return wrapper
+
+
+def query_timer(execute, sql, params, many, context):
+    """ Database execute wrapper counting the queries of the request """
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.add_query(time.perf_counter() - start)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """ connection_created receiver adding query_timer to each connection """
+    if query_timer not in connection.execute_wrappers:
+        connection.execute_wrappers.append(query_timer)
+
+
+def _ring_buffer():
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = collections.deque(maxlen=settings.WIIN_PROFILE_BUFFER)
+    return _buffer
+
+
+def _record(entry):
+    buffer = _ring_buffer()
+    with _buffer_lock:
+        buffer.append(entry)
+
+
+def _counted(response, record):
+    """ The streaming_content of `response`, calling record(size) with the
+    number of bytes sent once the stream ends or is closed """
+    content = response.streaming_content
+    if response.is_async:
+        async def counted():
+            size = 0
+            try:
+                async for chunk in content:
+                    size += len(chunk)
+                    yield chunk
+            finally:
+                record(size)
+    else:
+        def counted():
+            size = 0
+            try:
+                for chunk in content:
+                    size += len(chunk)
+                    yield chunk
+            finally:
+                record(size)
+    return counted()
+
+
+def recent_requests():
+    """ The recorded requests of this process, the newest first """
+    buffer = _ring_buffer()
+    with _buffer_lock:
+        return list(reversed(buffer))
+
+
+class RequestProfileMiddleware(object):
+    """ Records each request's timings in a Server-Timing header and the
+    ring buffer; place it first in MIDDLEWARE so the response size is that
+    of the compressed body """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if request.path.startswith(UNPROFILED_PREFIXES):
+            return self.get_response(request)
+        profile = RequestProfile(request)
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(profile, response, time.perf_counter() - start)
+
+    async def __acall__(self, request):
+        if request.path.startswith(UNPROFILED_PREFIXES):
+            return await self.get_response(request)
+        profile = RequestProfile(request)
+        token = _current.set(profile)
+        start = time.perf_counter()
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(profile, response, time.perf_counter() - start)
+
+    def _finish(self, profile, response, seconds):
+        response['Server-Timing'] = profile.server_timing(seconds)
+        status = response.status_code
+        if response.streaming:
+            # a streamed response is recorded once it has been sent
+            response.streaming_content = _counted(
+                response,
+                lambda size: _record(profile.as_dict(status, size, seconds)))
+        else:
+            _record(profile.as_dict(status, len(response.content), seconds))
+        return response
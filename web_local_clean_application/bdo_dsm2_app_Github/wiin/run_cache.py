@@ -0,0 +1,92 @@
+"""
+Cached per-run results of the map and table views.
+
+The views keep what they compute for a run in Django's cache: the summary
+table and channel node table columns, the compact map graph payload of each
+channel and the map KS overlay. The keys include the run's
+RunIdTable.last_modified, which populate_db touches on every (re)load, so a
+reloaded run is never served its old results; those are left for the cache
+to cull. warm_cache fills in every entry of a run right after it loads.
+"""
+import hashlib
+import json
+from django.core.cache import cache, caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from wiin.models import RunIdTable
+from wiin.profiling import span
+
+RUN_CACHE_PREFIX = 'wiin:run'
+
+# entries only go stale through a reload, which changes their key
+RUN_CACHE_TIMEOUT = None
+
+SUMMARY_RANGES = ['default', 'five', 'fourteen']
+NODE_VARIABLES = ['FLOW', 'VEL']
+
+
+def is_shared():
+    """ Whether entries stored by one process reach the server's processes;
+    a local-memory (or dummy) cache keeps them to the process that stored
+    them """
+    return not isinstance(caches['default'], (LocMemCache, DummyCache))
+
+
+def run_version(run_id):
+    """ The load time of `run_id` as a key part, None for an unknown run """
+    last_modified = (RunIdTable.objects.filter(run_id=run_id)
+                     .values_list('last_modified', flat=True).first())
+    if last_modified is None:
+        return None
+    return last_modified.timestamp()
+
+
+def cache_key(run_id, version, kind, *args):
+    """ The cache key of one result of a run
+
+    Parameters
+    ----------
+    run_id : str
+        The run_id name
+    version : float
+        run_version() of the run
+    kind : str
+        'summary', 'node', 'mapgraph' or 'mapks'
+    args
+        What else the result depends on, e.g. the summary range
+
+    Returns
+    -------
+    str
+        A key that is valid for every cache backend
+    """
+    # scenario names may hold characters memcached does not allow in keys
+    parts = json.dumps([run_id, version] + [str(a) for a in args])
+    return '{}:{}:{}'.format(RUN_CACHE_PREFIX, kind,
+                             hashlib.sha1(parts.encode()).hexdigest())
+
+
+def lookup(run_id, kind, *args):
+    """ Returns (key, cached value); the value is None on a miss and the key
+    is None when the run is not loaded, so there is nothing to cache """
+    version = run_version(run_id)
+    if version is None:
+        return None, None
+    key = cache_key(run_id, version, kind, *args)
+    with span('cache'):
+        return key, cache.get(key)
+
+
+def store(key, value):
+    if key is not None:
+        with span('cache'):
+            cache.set(key, value, RUN_CACHE_TIMEOUT)
+
+
+def cached(run_id, kind, args, produce):
+    """ The cached result, or produce() stored in the cache """
+    key, value = lookup(run_id, kind, *args)
+    if value is None:
+        value = produce()
+        store(key, value)
+    return value
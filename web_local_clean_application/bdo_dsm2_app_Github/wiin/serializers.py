@@ -1,53 +1,123 @@
-from rest_framework import serializers
-from wiin.models import (HydroTable, VarSummaryTable,
-                         VarTotalTable, RunIdTable,
-                         VariableTable, ScenarioTable,
-                         UnitTable, VarKSTable)
-
-
-class HydroTableSerializer(serializers.HyperlinkedModelSerializer):
-    class Meta:
-        model = HydroTable
-        fields = "__all__"
-
-
-class VarSummarySerializer(serializers.HyperlinkedModelSerializer):
-    class Meta:
-        model = VarSummaryTable
-        fields = "__all__"
-
-
-class VarTotalSerializer(serializers.HyperlinkedModelSerializer):
-    class Meta:
-        model = VarTotalTable
-        fields = "__all__"
-
-
-class RunIdSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = RunIdTable
-        fields = "__all__"
-
-
-class VariableSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = VariableTable
-        fields = "__all__"
-
-
-class ScenarioSerializer(serializers.HyperlinkedModelSerializer):
-    class Meta:
-        model = ScenarioTable
-        fields = "__all__"
-
-
-class UnitSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = UnitTable
-        fields = "__all__"
-
-
-class VarKSSerializer(serializers.HyperlinkedModelSerializer):
-    class Meta:
-        model = VarKSTable
-        fields = "__all__"
+from rest_framework import serializers
+from wiin.models import (HydroTable, VarSummaryTable,
+                         VarTotalTable, RunIdTable,
+                         VariableTable, ScenarioTable,
+                         UnitTable, VarKSTable)
+
+
+class SparseFieldsMixin(object):
+    """ Drops the fields a ?fields=a,b,c query parameter does not name """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        request = self.context.get('request')
+        if request is None or request.method != 'GET':
+            return
+        fields = request.query_params.get('fields')
+        if fields:
+            for name in set(self.fields) - set(fields.split(',')):
+                self.fields.pop(name)
+
+
+def _name_field(slug_field):
+    # a foreign key shown by its name, read from a select_related join
+    return serializers.SlugRelatedField(slug_field=slug_field, read_only=True)
+
+
+class HydroTableSerializer(SparseFieldsMixin,
+                           serializers.HyperlinkedModelSerializer):
+    class Meta:
+        model = HydroTable
+        fields = "__all__"
+
+
+class VarSummarySerializer(SparseFieldsMixin,
+                           serializers.HyperlinkedModelSerializer):
+    class Meta:
+        model = VarSummaryTable
+        fields = "__all__"
+
+
+class VarTotalSerializer(SparseFieldsMixin,
+                         serializers.HyperlinkedModelSerializer):
+    class Meta:
+        model = VarTotalTable
+        fields = "__all__"
+
+
+class RunIdSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = RunIdTable
+        fields = "__all__"
+
+
+class VariableSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = VariableTable
+        fields = "__all__"
+
+
+class ScenarioSerializer(serializers.HyperlinkedModelSerializer):
+    class Meta:
+        model = ScenarioTable
+        fields = "__all__"
+
+
+class UnitSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UnitTable
+        fields = "__all__"
+
+
+class VarKSSerializer(SparseFieldsMixin,
+                      serializers.HyperlinkedModelSerializer):
+    class Meta:
+        model = VarKSTable
+        fields = "__all__"
+
+
+# The list serializers show the foreign keys by name instead of reversing a
+# hyperlink per key per row, and the viewsets select_related them
+
+
+class HydroListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    run_id = _name_field('run_id')
+    variable = _name_field('variable')
+    scenario = _name_field('scenario')
+    unit = _name_field('unit')
+
+    class Meta:
+        model = HydroTable
+        fields = "__all__"
+
+
+class VarSummaryListSerializer(SparseFieldsMixin,
+                               serializers.ModelSerializer):
+    run_id = _name_field('run_id')
+    variable = _name_field('variable')
+    scenario = _name_field('scenario')
+
+    class Meta:
+        model = VarSummaryTable
+        fields = "__all__"
+
+
+class VarTotalListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    run_id = _name_field('run_id')
+    variable = _name_field('variable')
+    scenario = _name_field('scenario')
+
+    class Meta:
+        model = VarTotalTable
+        fields = "__all__"
+
+
+class VarKSListSerializer(SparseFieldsMixin, serializers.ModelSerializer):
+    run_id = _name_field('run_id')
+    variable = _name_field('variable')
+    scenario0 = _name_field('scenario')
+    scenario1 = _name_field('scenario')
+
+    class Meta:
+        model = VarKSTable
+        fields = "__all__"
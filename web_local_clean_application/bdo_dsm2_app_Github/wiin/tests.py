@@ -1,3 +1,1211 @@
-from django.test import TestCase
-
-# Create your tests here.
+import argparse
+import base64
+import contextlib
+import csv
+import datetime
+import gzip
+import io
+import json
+import math
+import os
+import re
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock, skipIf
+import numpy as np
+import pandas as pd
+from asgiref.sync import sync_to_async
+from plotly.utils import PlotlyJSONEncoder
+from scipy.stats import ks_2samp
+from statsmodels.distributions.empirical_distribution import ECDF
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connections
+from django.db.backends.base.base import BaseDatabaseWrapper
+from django.test import (SimpleTestCase, TransactionTestCase,
+                         override_settings)
+from django.urls import reverse
+from wiin import (analytics, export, geometry, metadata, partitions,
+                  profiling, utils, views)
+from wiin.file_cache import FileCache
+from wiin.management.commands import load_test, seed_loadtest, warm_cache
+from wiin.management.commands.populate_db import SeriesAssembler
+from wiin.models import (HydroTable, RunIdTable, ScenarioTable, VarTotalTable,
+                         VarTotalSeriesTable, VarKSTable, VarEcdfTable,
+                         ecdf_y)
+
+RUN_ID = 'test_20190205_20190207'
+SCENARIO = 'OMR-5000'
+CHANNELS = [1, 2, 3]
+
+
+def write_run_tables(folder, seed=0, run_id=RUN_ID, scenario=SCENARIO):
+    """ Writes the four post-processor tables of a small synthetic run as
+    *.csv files and returns them as DataFrames """
+    first_day, last_day = [pd.Timestamp(d) for d in run_id.split('_')[-2:]]
+    datetimes = pd.date_range(first_day, last_day, freq='15min')
+    tables = seed_loadtest.Command()._run_tables(
+        np.random.default_rng(seed), run_id, scenario, datetimes, CHANNELS)
+    for table_name, df in tables.items():
+        df.to_csv(os.path.join(folder, table_name + '.csv'), index=False)
+    return tables
+
+
+@override_settings(CACHES={'default': {
+                       'BACKEND':
+                       'django.core.cache.backends.locmem.LocMemCache'}},
+                   WIIN_PARTITION_DIR=None, WIIN_PARQUET_DIR=None)
+class LoadedRunTestCase(TransactionTestCase):
+    """ Base class of the tests that load a run with populate_db; populate_db
+    opens its own transactions, so these run outside a test transaction """
+
+    def setUp(self):
+        self.tables_folder = tempfile.mkdtemp(prefix='wiin_test_')
+        self.addCleanup(shutil.rmtree, self.tables_folder)
+        self.tables = write_run_tables(self.tables_folder)
+
+    def populate(self, **options):
+        """ Runs populate_db and returns what it printed """
+        options.setdefault('skip_warm_cache', True)
+        # populate_db reports its progress with print
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            call_command('populate_db', tables_folder=self.tables_folder,
+                         **options)
+        return stdout.getvalue()
+
+
+class PopulateDbReplaceTests(LoadedRunTestCase):
+
+    def vartotal_values(self):
+        return sorted(VarTotalTable.objects.values_list('value', flat=True))
+
+    def test_reload_refused_without_replace(self):
+        self.populate()
+        with self.assertRaises(CommandError):
+            self.populate()
+        self.assertEqual(VarTotalTable.objects.count(),
+                         len(self.tables['VarTotal']))
+
+    def _test_replace(self, chunksize):
+        self.populate(chunksize=chunksize)
+        self.tables = write_run_tables(self.tables_folder, seed=1)
+        self.populate(chunksize=chunksize, replace=True)
+        for model, table_name in [(HydroTable, 'HydroTable'),
+                                  (VarTotalTable, 'VarTotal'),
+                                  (VarKSTable, 'VarKS')]:
+            self.assertEqual(model.objects.count(),
+                             len(self.tables[table_name]))
+        np.testing.assert_allclose(
+            self.vartotal_values(),
+            np.sort(self.tables['VarTotal']['value'].to_numpy()))
+        self.assertEqual(VarTotalSeriesTable.objects.count(),
+                         2 * 2 * len(CHANNELS))
+
+    def test_replace_chunked(self):
+        self._test_replace(chunksize=1000)
+
+    def test_replace_orm(self):
+        self._test_replace(chunksize=0)
+
+    def _test_failed_replace_keeps_run(self, chunksize):
+        self.populate(chunksize=chunksize)
+        before = self.vartotal_values()
+        series_before = VarTotalSeriesTable.objects.count()
+        # a sample off the 15 minute grid fails the series build, after the
+        # old rows are deleted and the new rows are written
+        vartotal = write_run_tables(self.tables_folder, seed=1)['VarTotal']
+        vartotal.loc[len(vartotal) - 1, 'datetime'] += pd.Timedelta('7min')
+        vartotal.to_csv(os.path.join(self.tables_folder, 'VarTotal.csv'),
+                        index=False)
+        with self.assertRaises(CommandError):
+            self.populate(chunksize=chunksize, replace=True)
+        self.assertEqual(self.vartotal_values(), before)
+        self.assertEqual(VarTotalSeriesTable.objects.count(), series_before)
+
+    def test_failed_replace_keeps_run_chunked(self):
+        self._test_failed_replace_keeps_run(chunksize=1000)
+
+    def test_failed_replace_keeps_run_orm(self):
+        self._test_failed_replace_keeps_run(chunksize=0)
+
+
+def file_cache(test):
+    """ CACHES setting of a wiin FileCache in a folder removed after `test`,
+    shared like the cache of a deployed server """
+    cache_folder = tempfile.mkdtemp(prefix='wiin_cache_')
+    test.addCleanup(shutil.rmtree, cache_folder)
+    return {'default': {'BACKEND': 'wiin.file_cache.FileCache',
+                        'LOCATION': cache_folder, 'TIMEOUT': None}}
+
+
+class PopulateDbWarmCacheTests(LoadedRunTestCase):
+
+    def test_local_cache_is_not_warmed(self):
+        with mock.patch.object(warm_cache.Command, 'handle') as handle:
+            output = self.populate(skip_warm_cache=False)
+        handle.assert_not_called()
+        self.assertIn('Warning: not warming the cache', output)
+        self.assertEqual(VarTotalTable.objects.count(),
+                         len(self.tables['VarTotal']))
+
+    def test_failed_warm_cache_keeps_load(self):
+        with self.settings(CACHES=file_cache(self)), \
+                mock.patch.object(warm_cache.Command, 'handle',
+                                  side_effect=CommandError('pool broke')):
+            output = self.populate(skip_warm_cache=False)
+        self.assertIn('warm_cache failed: pool broke', output)
+        self.assertEqual(VarTotalTable.objects.count(),
+                         len(self.tables['VarTotal']))
+
+
+class WarmCacheTests(LoadedRunTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.populate()
+        cache_settings = self.settings(CACHES=file_cache(self))
+        cache_settings.enable()
+        self.addCleanup(cache_settings.disable)
+        # threads rather than processes, so the workers see the in-memory
+        # test database
+        with mock.patch.object(warm_cache, 'ProcessPoolExecutor',
+                               ThreadPoolExecutor), \
+                contextlib.redirect_stdout(io.StringIO()) as stdout:
+            call_command('warm_cache', run_id=[RUN_ID], workers=2)
+        self.assertIn('(0 failed)', stdout.getvalue())
+
+    def test_views_are_served_from_the_cache(self):
+        mapgraph = dict(myRun=RUN_ID, myScenario=SCENARIO, myVariable='FLOW',
+                        myChannel='2', payload='compact')
+        for name, data, compute in [
+                ('home', mapgraph, 'get_ecdf_curves'),
+                ('summary_table', {'myRun': RUN_ID}, 'read_summary_means'),
+                ('mfcn_table', {'myRun': RUN_ID},
+                 'read_channel_daily_means')]:
+            with self.subTest(name), \
+                    mock.patch.object(views, compute) as computed:
+                response = self.client.post(reverse(name), data)
+                self.assertEqual(response.status_code, 200)
+                computed.assert_not_called()
+                # counted by RequestProfileMiddleware in every thread; the
+                # one query is the run's load time in the cache key
+                self.assertIn('desc="1 queries"', response['Server-Timing'])
+
+    def test_cached_value_matches_the_view(self):
+        data = {'myRun': RUN_ID, 'payload': 'compact'}
+        cached = json.loads(self.client.post(reverse('summary_table'),
+                                             data).content)
+        cache.clear()
+        computed = json.loads(self.client.post(reverse('summary_table'),
+                                               data).content)
+        self.assertEqual(cached, computed)
+
+    def test_local_cache_is_refused(self):
+        with self.settings(CACHES={'default': {
+                'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}):
+            with self.assertRaises(CommandError):
+                call_command('warm_cache', run_id=[RUN_ID])
+
+
+class FileCacheTests(SimpleTestCase):
+
+    def test_culls_at_max_entries(self):
+        settings = file_cache(self)['default']
+        backend = FileCache(settings['LOCATION'], {
+            'TIMEOUT': None, 'OPTIONS': {'MAX_ENTRIES': 10}})
+        for i in range(25):
+            backend.set('key{}'.format(i), i)
+            self.assertLessEqual(len(backend._list_cache_files()), 10)
+        self.assertEqual(backend.get('key24'), 24)
+
+    def test_lists_the_folder_rarely(self):
+        settings = file_cache(self)['default']
+        backend = FileCache(settings['LOCATION'], {
+            'TIMEOUT': None, 'OPTIONS': {'MAX_ENTRIES': 1000}})
+        with mock.patch.object(backend, '_list_cache_files',
+                               wraps=backend._list_cache_files) as listing:
+            for i in range(200):
+                backend.set('key{}'.format(i), i)
+        # once, then every MAX_ENTRIES // 10 sets
+        self.assertEqual(listing.call_count, 2)
+
+
+class MetadataTests(LoadedRunTestCase):
+
+    def home_context(self):
+        """ The run, scenario and variable lists HomePageView renders """
+        response = self.client.get(reverse('home'))
+        self.assertEqual(response.status_code, 200)
+        return {name: json.loads(response.context[name])
+                for name in ['run_id', 'scenario_id', 'variable_id']}
+
+    def test_lists_loaded_runs(self):
+        self.populate()
+        self.assertEqual(self.home_context(), {
+            'run_id': [RUN_ID],
+            'scenario_id': [{'scenario': SCENARIO, 'run_id': RUN_ID}],
+            'variable_id': ['FLOW', 'VEL']})
+        other_run = 'test_20190301_20190302'
+        write_run_tables(self.tables_folder, run_id=other_run,
+                         scenario='OMR-3500')
+        self.populate()
+        context = self.home_context()
+        self.assertEqual(context['run_id'], [RUN_ID, other_run])
+        self.assertEqual(context['scenario_id'],
+                         [{'scenario': SCENARIO, 'run_id': RUN_ID},
+                          {'scenario': 'OMR-3500', 'run_id': other_run}])
+
+    def _test_replace(self, invalidate):
+        self.populate()
+        self.home_context()
+        write_run_tables(self.tables_folder, scenario='OMR-2500')
+        # without invalidate() the cache is that of another process, which
+        # notices the reload from the run's last_modified
+        with mock.patch.object(metadata, 'invalidate',
+                               wraps=metadata.invalidate if invalidate
+                               else lambda: None):
+            self.populate(replace=True)
+        self.assertEqual(self.home_context()['scenario_id'],
+                         [{'scenario': 'OMR-2500', 'run_id': RUN_ID}])
+
+    def test_replace_invalidates(self):
+        self._test_replace(invalidate=True)
+
+    def test_replace_seen_by_other_processes(self):
+        self._test_replace(invalidate=False)
+
+    def test_deleted_run_is_dropped(self):
+        self.populate()
+        self.home_context()
+        with contextlib.redirect_stdout(io.StringIO()):
+            call_command('compact_db', keep=0, vacuum='none')
+        self.assertEqual(self.home_context(), {
+            'run_id': [], 'scenario_id': [], 'variable_id': ['FLOW', 'VEL']})
+
+
+class CompactDbTests(LoadedRunTestCase):
+    """ compact_db's retention policy over three runs, loaded in a different
+    order than their created times """
+    created = {'test_20190101_20190102': datetime.datetime(2019, 1, 1),
+               'test_20200101_20200102': datetime.datetime(2020, 1, 1),
+               'test_20190601_20190602': datetime.datetime(2019, 6, 1)}
+
+    def setUp(self):
+        super().setUp()
+        for run_id, created in self.created.items():
+            write_run_tables(self.tables_folder, run_id=run_id)
+            self.populate()
+            RunIdTable.objects.filter(run_id=run_id).update(
+                created=created.replace(tzinfo=datetime.timezone.utc))
+
+    def compact_db(self, **options):
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            call_command('compact_db', vacuum='none', **options)
+        return stdout.getvalue()
+
+    def assert_runs(self, run_ids):
+        """ Checks that only `run_ids` are left, with their rows """
+        self.assertEqual(sorted(RunIdTable.objects.values_list('run_id',
+                                                               flat=True)),
+                         sorted(run_ids))
+        for model in [VarTotalTable, HydroTable, VarKSTable,
+                      VarTotalSeriesTable, ScenarioTable]:
+            self.assertEqual(
+                sorted(set(model.objects.values_list('run_id__run_id',
+                                                     flat=True))),
+                sorted(run_ids), model.__name__)
+
+    def test_keep(self):
+        self.compact_db(keep=1)
+        self.assert_runs(['test_20200101_20200102'])
+
+    def test_newer_than(self):
+        # the date itself is kept
+        self.compact_db(newer_than='2019-06-01')
+        self.assert_runs(['test_20200101_20200102', 'test_20190601_20190602'])
+
+    def test_either_policy_keeps(self):
+        self.compact_db(keep=1, newer_than='2019-03-01')
+        self.assert_runs(['test_20200101_20200102', 'test_20190601_20190602'])
+        self.compact_db(keep=0, newer_than='2021-01-01')
+        self.assert_runs([])
+
+    def test_dry_run_deletes_nothing(self):
+        output = self.compact_db(keep=1, dry_run=True)
+        self.assertIn('Runs to delete: test_20190601_20190602, '
+                      'test_20190101_20190102', output)
+        self.assert_runs(list(self.created))
+
+    def test_full_vacuum(self):
+        with contextlib.redirect_stdout(io.StringIO()) as stdout:
+            call_command('compact_db', keep=2)
+        self.assertIn('VACUUM in', stdout.getvalue())
+        self.assert_runs(['test_20200101_20200102', 'test_20190601_20190602'])
+
+    def test_bad_policy(self):
+        for options in [{}, {'keep': -1}, {'newer_than': '2019-13-01'}]:
+            with self.assertRaises(CommandError):
+                self.compact_db(**options)
+        self.assert_runs(list(self.created))
+
+
+class ExplainQueriesTests(LoadedRunTestCase):
+
+    # the utils queryset builder behind each query explain_queries plans
+    querysets = {'get_mapgraph': 'ecdf_queryset',
+                 'get_ecdf_batch': 'ecdf_batch_queryset',
+                 'get_mapKS': 'ks_queryset',
+                 'get_summary_table': 'summary_means_queryset',
+                 'get_channel_node_table': 'daily_means_queryset'}
+
+    def setUp(self):
+        super().setUp()
+        self.populate()
+
+    def test_plans_every_view_query(self):
+        builders = {}
+        with contextlib.ExitStack() as stack:
+            for name in self.querysets.values():
+                builders[name] = stack.enter_context(mock.patch.object(
+                    utils, name, wraps=getattr(utils, name)))
+            stdout = stack.enter_context(
+                contextlib.redirect_stdout(io.StringIO()))
+            call_command('explain_queries')
+        sections = stdout.getvalue().split('\n\n')
+        self.assertIn('run: {}'.format(RUN_ID), sections[0])
+        plans = {}
+        for section in sections[1:]:
+            title, _, plan = section.partition('\n')
+            # '<view query> (index)' or '... (TABLE SCAN)', then the plan
+            planned = re.match(r'(\w+) \((index|TABLE SCAN)\)$', title)
+            if planned:
+                plans[planned.group(1)] = plan
+        self.assertEqual(sorted(plans), sorted(self.querysets))
+        for view_name, plan in plans.items():
+            self.assertRegex(plan, r'(SEARCH|SCAN) ', view_name)
+        for name, builder in builders.items():
+            self.assertTrue(builder.called, name)
+
+    def test_views_run_the_planned_querysets(self):
+        # the same builders serve the views, so the plans are theirs
+        view_queries = {
+            'get_mapgraph': lambda: utils.get_mapgraph(
+                RUN_ID, SCENARIO, 'FLOW', '1'),
+            'get_ecdf_batch': lambda: utils.get_ecdf_batch(
+                RUN_ID, SCENARIO, 'FLOW', CHANNELS),
+            'get_mapKS': lambda: utils.get_mapKS(RUN_ID, SCENARIO, 'FLOW'),
+            'get_summary_table': lambda: utils.get_summary_table(RUN_ID),
+            'get_channel_node_table': lambda: utils.get_channel_node_table(
+                RUN_ID, 'FLOW')}
+        for view_name, name in self.querysets.items():
+            with self.subTest(view_name), mock.patch.object(
+                    utils, name, wraps=getattr(utils, name)) as builder:
+                view_queries[view_name]()
+                builder.assert_called()
+
+
+class PartitionTests(LoadedRunTestCase):
+
+    @classmethod
+    def ensure_connection_patch_method(cls):
+        # populate_db registers the partition aliases while the test runs,
+        # and unregister_partitions removes them again
+        return BaseDatabaseWrapper.ensure_connection
+
+    def setUp(self):
+        super().setUp()
+        partition_dir = tempfile.mkdtemp(prefix='wiin_partitions_')
+        self.addCleanup(shutil.rmtree, partition_dir)
+        partition_settings = override_settings(
+            WIIN_PARTITION_DIR=partition_dir)
+        partition_settings.enable()
+        self.addCleanup(partition_settings.disable)
+        self.addCleanup(self.unregister_partitions)
+
+    def unregister_partitions(self):
+        # later test classes must not find the partition aliases registered
+        for alias in [a for a in connections.databases
+                      if partitions.is_partition(a)]:
+            connections[alias].close()
+            del connections[alias]
+            del connections.databases[alias]
+
+    def test_reload_publishes_new_version(self):
+        self.populate()
+        first = partitions.run_db(RUN_ID)
+        self.tables = write_run_tables(self.tables_folder, seed=1)
+        self.populate(replace=True)
+        second = partitions.run_db(RUN_ID)
+        self.assertNotEqual(first, second)
+        self.assertEqual(len(partitions.partition_versions(RUN_ID)), 1)
+        self.assertEqual(VarTotalTable.objects.using(second).count(),
+                         len(self.tables['VarTotal']))
+
+    def test_open_version_is_kept_until_compact_db(self):
+        self.populate()
+        old_version = partitions.partition_versions(RUN_ID)[-1]
+        # another process reading the file in WAL mode keeps a -wal next to it
+        wal = partitions.partition_path(RUN_ID, old_version) + '-wal'
+        open(wal, 'w').close()
+        self.populate(replace=True)
+        versions = partitions.partition_versions(RUN_ID)
+        self.assertEqual(versions[0], old_version)
+        self.assertEqual(len(versions), 2)
+        os.remove(wal)
+        with contextlib.redirect_stdout(io.StringIO()):
+            call_command('compact_db', keep=1, vacuum='none')
+        self.assertEqual(partitions.partition_versions(RUN_ID), versions[1:])
+
+
+def pandas_summary_means(hydro, start_date, end_date):
+    """ The summary means as get_summary_table computed them with pandas """
+    datetime_range = pd.date_range(start=start_date, end=end_date,
+                                   freq='15min')
+    selection = hydro.loc[hydro['datetime'].isin(datetime_range)]
+    return (selection.groupby(['variable', 'scenario', 'channel'])['value']
+            .mean())
+
+
+def pandas_daily_means(hydro, variable, start_date, end_date):
+    """ The daily means as get_channel_node_table computed them with pandas """
+    datetime_range = pd.date_range(start=start_date, end=end_date,
+                                   freq='15min')
+    selection = hydro.loc[(hydro['variable'] == variable) &
+                          hydro['channel'].isin(utils.EIGHT_NODES) &
+                          hydro['datetime'].isin(datetime_range)]
+    return (selection.groupby(['channel', 'scenario',
+                               pd.Grouper(key='datetime', freq='D')])
+            ['value'].mean())
+
+
+class HydroMeansParityTests(LoadedRunTestCase):
+
+    def setUp(self):
+        super().setUp()
+        hydro = self.tables['HydroTable']
+        # one series every 5 minutes, so 2 in 3 of its samples are off the
+        # 15 minute grid, and a NaN gap in another
+        fine = hydro['path'] == hydro['path'].iloc[0]
+        shifted = [hydro[fine].assign(datetime=hydro[fine]['datetime'] +
+                                      pd.Timedelta(minutes),
+                                      value=hydro[fine]['value'] + 500)
+                   for minutes in ['5min', '10min']]
+        hydro = (pd.concat([hydro] + shifted, ignore_index=True)
+                 .sort_values(['path', 'datetime'], kind='stable'))
+        hydro.loc[hydro.index[len(hydro) // 2], 'value'] = np.nan
+        hydro.to_csv(os.path.join(self.tables_folder, 'HydroTable.csv'),
+                     index=False)
+        self.hydro = hydro
+        self.start_date, self.end_date = utils.summary_dates(RUN_ID)
+        self.populate()
+
+    def assert_means_equal(self, means, reference):
+        means = means.squeeze(axis=1) if means.ndim == 2 else means
+        self.assertEqual(list(means.index), list(reference.index))
+        np.testing.assert_allclose(means.to_numpy(), reference.to_numpy())
+
+    def test_database_summary_means(self):
+        self.assert_means_equal(
+            utils._hydrotable_summary_means(RUN_ID, self.start_date,
+                                            self.end_date),
+            pandas_summary_means(self.hydro, self.start_date, self.end_date))
+
+    def test_database_daily_means(self):
+        self.assert_means_equal(
+            utils._hydrotable_daily_means(RUN_ID, 'FLOW', utils.EIGHT_NODES,
+                                          self.start_date, self.end_date),
+            pandas_daily_means(self.hydro, 'FLOW', self.start_date,
+                               self.end_date))
+
+    @skipIf(analytics.duckdb is None, 'duckdb is not installed')
+    def test_duckdb_means(self):
+        parquet_dir = tempfile.mkdtemp(prefix='wiin_parquet_')
+        self.addCleanup(shutil.rmtree, parquet_dir)
+        os.mkdir(os.path.join(parquet_dir, RUN_ID))
+        self.hydro.to_parquet(os.path.join(parquet_dir, RUN_ID,
+                                           'HydroTable.parquet'), index=False)
+        with override_settings(WIIN_PARQUET_DIR=parquet_dir):
+            self.assert_means_equal(
+                analytics.summary_means(RUN_ID, self.start_date,
+                                        self.end_date),
+                pandas_summary_means(self.hydro, self.start_date,
+                                     self.end_date))
+            self.assert_means_equal(
+                analytics.channel_daily_means(RUN_ID, 'FLOW',
+                                              utils.EIGHT_NODES,
+                                              self.start_date, self.end_date),
+                pandas_daily_means(self.hydro, 'FLOW', self.start_date,
+                                   self.end_date))
+
+
+def pandas_mapgraph(vartotal, scenario, variable, channel):
+    """ The (x, y) ECDFs and KS distance get_mapgraph computed from the
+    VarTotal rows before they were precomputed """
+    rows = vartotal[(vartotal['variable'] == variable) &
+                    (vartotal['channel'] == channel)]
+    arrays = [rows.loc[rows['scenario'] == s, 'value'].to_numpy(
+        dtype=np.float32) for s in ['Baseline', scenario]]
+    ecdfs = [ECDF(data_arr) for data_arr in arrays]
+    return ([(np.around(e.x, decimals=1), np.around(e.y, decimals=4))
+             for e in ecdfs], round(ks_2samp(*arrays).statistic, 4))
+
+
+class MapGraphParityTests(LoadedRunTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.populate()
+
+    def assert_curves_equal(self, curves, reference_curves):
+        for (x, y), (reference_x, reference_y) in zip(curves,
+                                                      reference_curves):
+            np.testing.assert_allclose(x, reference_x, rtol=1e-6)
+            np.testing.assert_allclose(y, reference_y)
+
+    def assert_matches_pandas(self):
+        for variable in ['FLOW', 'VEL']:
+            batch = utils.get_ecdf_batch(RUN_ID, SCENARIO, variable,
+                                         CHANNELS)
+            self.assertEqual(batch['missing'], [])
+            for channel, batch_channel in zip(CHANNELS, batch['channels']):
+                reference_curves, reference_ks = pandas_mapgraph(
+                    self.tables['VarTotal'], SCENARIO, variable, channel)
+                baseline, scenario, ks_stat = utils.get_ecdf_curves(
+                    RUN_ID, SCENARIO, variable, channel)
+                self.assert_curves_equal([baseline, scenario],
+                                         reference_curves)
+                self.assertEqual(ks_stat, reference_ks)
+                self.assert_curves_equal(
+                    [(np.frombuffer(base64.b64decode(trace['x']),
+                                    dtype='<f4'), ecdf_y(trace['count']))
+                     for trace in batch_channel['traces']],
+                    reference_curves)
+                self.assertEqual(batch_channel['ks_stat'], reference_ks)
+
+    def test_precomputed_ecdfs(self):
+        self.assertTrue(VarEcdfTable.objects.exists())
+        self.assert_matches_pandas()
+
+    def test_ecdfs_from_series(self):
+        # runs loaded before VarEcdfTable existed
+        VarEcdfTable.objects.all().delete()
+        self.assert_matches_pandas()
+
+    def test_map_ks(self):
+        for variable in ['FLOW', 'VEL']:
+            varks = self.tables['VarKS']
+            varks = varks[(varks['variable'] == variable) &
+                          (varks['scenario1'] == SCENARIO)]
+            self.assertEqual(
+                json.loads(utils.get_mapKS(RUN_ID, SCENARIO, variable)),
+                {str(channel): round(ks_stat, 4) for channel, ks_stat
+                 in zip(varks['channel'], varks['ks_stat'])})
+
+
+class MapKSViewTests(LoadedRunTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.populate()
+        self.params = {'myRun': RUN_ID, 'myScenario': SCENARIO,
+                       'myVariable': 'FLOW'}
+
+    def get(self, **headers):
+        return self.client.get(reverse('mapks'), self.params, **headers)
+
+    def test_revalidated_with_etag(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('no-cache', response['Cache-Control'])
+        self.assertEqual(json.loads(response.content),
+                         json.loads(utils.get_mapKS(RUN_ID, SCENARIO,
+                                                    'FLOW')))
+        not_modified = self.get(HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+        self.assertEqual(not_modified.content, b'')
+        self.assertEqual(self.get(HTTP_IF_MODIFIED_SINCE=(
+            response['Last-Modified'])).status_code, 304)
+
+    def test_etag_names_the_query(self):
+        etag = self.get()['ETag']
+        self.params['myVariable'] = 'VEL'
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_reload_changes_etag(self):
+        etag = self.get()['ETag']
+        self.populate(replace=True)
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_unknown_run_is_not_cached(self):
+        self.params['myRun'] = 'unknown_20190205_20190207'
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(response.has_header('ETag'))
+        self.assertEqual(json.loads(response.content), {})
+
+
+class MapGraphBatchViewTests(LoadedRunTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.populate()
+
+    def post(self, **selection):
+        return self.client.post(reverse('mapgraphs'), dict(
+            myRun=RUN_ID, myScenario=SCENARIO, myVariable='FLOW',
+            **selection))
+
+    def test_channels(self):
+        response = self.post(channels='3,1,1')
+        self.assertEqual(response.status_code, 200)
+        payload = json.loads(response.content)
+        self.assertEqual([c['channel'] for c in payload['channels']], [1, 3])
+        self.assertEqual(payload['missing'], [])
+
+    def test_batch_limit(self):
+        response = self.post(channel_range='1-{}'.format(
+            utils.MAX_BATCH_CHANNELS))
+        self.assertEqual(response.status_code, 200)
+        payload = json.loads(response.content)
+        self.assertEqual(len(payload['channels']), len(CHANNELS))
+        self.assertEqual(len(payload['missing']),
+                         utils.MAX_BATCH_CHANNELS - len(CHANNELS))
+        response = self.post(channel_range='1-{}'.format(
+            utils.MAX_BATCH_CHANNELS + 1))
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(b'at most', response.content)
+
+    def test_bad_selection(self):
+        self.assertEqual(self.post().status_code, 400)
+        self.assertEqual(self.post(channels='1,x').status_code, 400)
+        self.assertEqual(self.post(channel_range='5').status_code, 400)
+        self.assertEqual(self.post(channel_range='9-3').status_code, 400)
+        for polygon in ['[[1]]', '[[1, 2], [3]]', '{"lon": 1}', '[[', '7']:
+            self.assertEqual(self.post(polygon=polygon).status_code, 400)
+
+    def test_oversized_range_is_not_built(self):
+        # refused from its bounds, without allocating the channel list
+        with mock.patch('wiin.views.range', create=True,
+                        wraps=range) as channel_range:
+            response = self.post(channel_range='1-2000000000')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn(b'at most', response.content)
+        channel_range.assert_not_called()
+
+
+class FactPaginationTests(LoadedRunTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.populate()
+
+    def pages(self, url, params):
+        """ The results of every page, following the next links """
+        pages = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            payload = response.json()
+            pages.append(payload['results'])
+            if payload['next'] is None:
+                return pages
+            response = self.client.get(payload['next'])
+
+    def test_cursor_walks_every_row_once(self):
+        pages = self.pages('/api/vartotal/', {'run': RUN_ID,
+                                              'page_size': 100})
+        ids = [row['id'] for page in pages for row in page]
+        self.assertTrue(all(len(page) <= 100 for page in pages))
+        self.assertEqual(ids, sorted(VarTotalTable.objects
+                                     .values_list('id', flat=True)))
+
+    def test_rows_loaded_while_paging_are_not_repeated(self):
+        response = self.client.get('/api/varks/', {'page_size': 2})
+        first_page = [row['id'] for row in response.json()['results']]
+        # another run loaded between two page requests
+        other_run = 'other_20190205_20190207'
+        os.mkdir(os.path.join(self.tables_folder, other_run))
+        write_run_tables(os.path.join(self.tables_folder, other_run),
+                         run_id=other_run)
+        with contextlib.redirect_stdout(io.StringIO()):
+            call_command('populate_db', skip_warm_cache=True,
+                         tables_folder=os.path.join(self.tables_folder,
+                                                    other_run))
+        pages = [first_page] + [[row['id'] for row in page] for page in
+                                self.pages(response.json()['next'], {})]
+        ids = [pk for page in pages for pk in page]
+        self.assertEqual(ids, sorted(VarKSTable.objects
+                                     .values_list('id', flat=True)))
+
+    def test_filters_and_fields(self):
+        rows = [row for page in self.pages('/api/vartotal/', {
+                    'run': RUN_ID, 'variable': 'VEL', 'scenario': SCENARIO,
+                    'channel': 2, 'start': '2019-02-06T00:00:00Z',
+                    'fields': 'channel,datetime,value', 'page_size': 50})
+                for row in page]
+        vartotal = self.tables['VarTotal']
+        expected = vartotal[(vartotal['variable'] == 'VEL') &
+                            (vartotal['scenario'] == SCENARIO) &
+                            (vartotal['channel'] == 2) &
+                            (vartotal['datetime'] >= '2019-02-06')]
+        self.assertEqual(len(rows), len(expected))
+        self.assertEqual(set(rows[0]), {'channel', 'datetime', 'value'})
+        np.testing.assert_allclose([row['value'] for row in rows],
+                                   expected['value'])
+
+    def test_page_size_is_capped(self):
+        with mock.patch.object(views.FactCursorPagination, 'max_page_size',
+                               50):
+            response = self.client.get('/api/hydro/', {'page_size': 10**6})
+        self.assertEqual(len(response.json()['results']), 50)
+
+    def test_bad_filter_is_refused(self):
+        response = self.client.get('/api/vartotal/', {'channel': 'x'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('channel', response.json())
+
+
+class AsyncViewTests(LoadedRunTestCase):
+    """ The async map and table views under the test client (WSGI) and the
+    async test client (ASGI), against the synchronous utils functions """
+
+    def setUp(self):
+        super().setUp()
+        self.populate()
+
+    def view_requests(self):
+        """ (url name, POST data, expected JSON) of each async view """
+        mapgraph = dict(myRun=RUN_ID, myScenario=SCENARIO, myVariable='FLOW',
+                        myChannel='1')
+        curves = utils.get_ecdf_curves(RUN_ID, SCENARIO, 'FLOW', '1')
+        compact_mapgraph = json.dumps(
+            utils.mapgraph_data(SCENARIO, 'FLOW', curves),
+            cls=PlotlyJSONEncoder)
+        requests = [
+            ('home', mapgraph,
+             [utils.mapgraph_figure(SCENARIO, 'FLOW', curves)]),
+            ('home', dict(mapgraph, payload='compact'),
+             json.loads(compact_mapgraph))]
+        for name, summary_range in [('summary_table', 'default'),
+                                    ('summary5_table', 'five'),
+                                    ('summary14_table', 'fourteen')]:
+            requests.append((name, {'myRun': RUN_ID},
+                             utils.get_summary_table(RUN_ID, summary_range)))
+        for name, variable in [('mfcn_table', 'FLOW'),
+                               ('mvcn_table', 'VEL')]:
+            requests.append((name, {'myRun': RUN_ID}, list(
+                utils.get_channel_node_table(RUN_ID, variable))))
+        return requests
+
+    def assert_view_json(self, response, expected):
+        self.assertEqual(response.status_code, 200)
+        payload = json.loads(response.content)
+        # the Plotly figures are JSON strings inside the response
+        if isinstance(expected, str):
+            payload, expected = json.loads(payload), json.loads(expected)
+        elif isinstance(expected, list):
+            payload = [json.loads(figure) for figure in payload]
+            expected = [json.loads(figure) for figure in expected]
+        self.assertEqual(payload, expected)
+
+    def test_views_under_wsgi(self):
+        for name, data, expected in self.view_requests():
+            with self.subTest(name, payload=data.get('payload')):
+                response = self.client.post(reverse(name), data)
+                self.assert_view_json(response, expected)
+
+    async def test_views_under_asgi(self):
+        for name, data, expected in await sync_to_async(self.view_requests)():
+            with self.subTest(name, payload=data.get('payload')):
+                response = await self.async_client.post(reverse(name), data)
+                self.assert_view_json(response, expected)
+
+
+def plotly_values(values):
+    """ A Plotly figure JSON array as a NumPy array; Plotly 6 and later
+    write numeric arrays as base64 typed arrays """
+    if isinstance(values, dict):
+        return np.frombuffer(base64.b64decode(values['bdata']),
+                             dtype=values['dtype'])
+    return np.asarray(values)
+
+
+class CompactPayloadTests(LoadedRunTestCase):
+    """ The payload=compact responses app.js lays out, against the full
+    Plotly figures of the same requests """
+
+    def setUp(self):
+        super().setUp()
+        self.populate()
+
+    def post(self, name, **data):
+        full = self.client.post(reverse(name), data)
+        compact = self.client.post(reverse(name),
+                                   dict(data, payload='compact'))
+        return json.loads(full.content), json.loads(compact.content)
+
+    def test_mapgraph(self):
+        full, compact = self.post('home', myRun=RUN_ID, myScenario=SCENARIO,
+                                  myVariable='FLOW', myChannel='2')
+        figure = json.loads(full[0])
+        self.assertEqual(compact['variable'], 'FLOW')
+        self.assertEqual(figure['layout']['annotations'][0]['text'],
+                         'Kolmogorov-Smirnov Distance: {}'.format(
+                             compact['ks_stat']))
+        self.assertEqual([t['name'] for t in compact['traces']],
+                         ['Baseline', SCENARIO])
+        for trace, figure_trace in zip(compact['traces'], figure['data']):
+            # decoded like app.js' decodeFloat32 and ecdfGraph
+            x = np.frombuffer(base64.b64decode(trace['x']), dtype='<f4')
+            self.assertEqual(len(x), trace['count'] + 1)
+            y = np.round(np.arange(trace['count'] + 1) / trace['count'], 4)
+            np.testing.assert_allclose(
+                x, plotly_values(figure_trace['x']).astype('<f4'))
+            np.testing.assert_allclose(y, plotly_values(figure_trace['y']),
+                                       atol=1e-4)
+
+    def assert_table(self, compact, figure):
+        table = json.loads(figure)['data'][0]
+        self.assertEqual(compact['header'], table['header']['values'])
+        self.assertEqual(len(compact['cells']), len(compact['header']))
+        for column, figure_column in zip(compact['cells'],
+                                         table['cells']['values']):
+            self.assertEqual(len(column), len(compact['cells'][0]))
+            np.testing.assert_array_equal(
+                np.asarray(column, dtype=object),
+                plotly_values(figure_column).astype(object))
+
+    def test_summary_table(self):
+        full, compact = self.post('summary_table', myRun=RUN_ID)
+        self.assert_table(compact, full)
+        # the HydroTable nodes down the rows, then Baseline, scenario and
+        # Difference per variable
+        self.assertEqual(compact['cells'][0], utils.EIGHT_NODES)
+        self.assertEqual(len(compact['header']), 1 + 2 * 3)
+
+    def test_channel_node_tables(self):
+        full, compact = self.post('mfcn_table', myRun=RUN_ID)
+        self.assertEqual(len(compact), 2)
+        for nodes, table, figure in zip([utils.FIRST_NODES,
+                                         utils.SECOND_NODES], compact, full):
+            self.assert_table(table, figure)
+            # one row per day, Baseline, scenario and Difference per node
+            self.assertEqual(len(table['cells'][0]), 3)
+            self.assertEqual(len(table['header']), 1 + 3 * len(nodes))
+
+
+@mock.patch.object(export, 'EXPORT_CHUNK_ROWS', 100)
+class ExportViewTests(LoadedRunTestCase):
+
+    def setUp(self):
+        super().setUp()
+        self.populate()
+        vartotal = self.tables['VarTotal']
+        self.expected = vartotal[vartotal['variable'] == 'FLOW']
+        self.params = {'run': RUN_ID, 'variable': 'FLOW'}
+
+    def assert_ndjson_rows(self, chunks):
+        # one chunk per EXPORT_CHUNK_ROWS rows, produced as they are read
+        self.assertEqual(len(chunks), math.ceil(len(self.expected) / 100))
+        rows = [json.loads(line) for line in
+                b''.join(chunks).decode().splitlines()]
+        self.assertEqual(len(rows), len(self.expected))
+        np.testing.assert_allclose([row['value'] for row in rows],
+                                   self.expected['value'])
+
+    def assert_recorded_size(self, chunks):
+        # RequestProfileMiddleware counts the bytes as they are streamed
+        latest = profiling.recent_requests()[0]
+        self.assertEqual(latest['path'], reverse('export'))
+        self.assertEqual(latest['bytes'], len(b''.join(chunks)))
+
+    def test_streams_under_wsgi(self):
+        response = self.client.get(reverse('export'), self.params)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertFalse(response.is_async)
+        chunks = list(response.streaming_content)
+        self.assert_ndjson_rows(chunks)
+        self.assert_recorded_size(chunks)
+
+    async def test_streams_under_asgi(self):
+        response = await self.async_client.get(reverse('export'),
+                                               self.params)
+        self.assertEqual(response.status_code, 200)
+        # Django's ASGI handler buffers a sync iterator before sending it
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        self.assert_ndjson_rows(chunks)
+        self.assert_recorded_size(chunks)
+
+    def test_csv(self):
+        response = self.client.get(reverse('export'),
+                                   dict(self.params, format='csv'))
+        rows = list(csv.reader(io.StringIO(
+            b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0], export.EXPORT_COLUMNS)
+        self.assertEqual(len(rows) - 1, len(self.expected))
+
+    def test_bad_request(self):
+        for params in [{'run': 'unknown'}, dict(self.params, format='xml'),
+                       dict(self.params, channels='x')]:
+            response = self.client.get(reverse('export'), params)
+            self.assertEqual(response.status_code, 400)
+
+
+def polyline_distances(points, line):
+    """ The distance of each point to the nearest segment of `line` """
+    start, end = line[:-1], line[1:]
+    segment = end - start
+    lengths = (segment ** 2).sum(axis=1)
+    offsets = points[:, None] - start
+    along = np.clip((offsets * segment).sum(axis=2) /
+                    np.where(lengths == 0, 1., lengths), 0., 1.)
+    nearest = start + along[..., None] * segment
+    return np.sqrt(((points[:, None] - nearest) ** 2).sum(axis=2)).min(axis=1)
+
+
+class GeometryTests(SimpleTestCase):
+    """ build_geometry, ChannelGeometryView and channels_in_polygon; the
+    TopoJSON is built into a temporary folder, not the static one """
+    zoom_levels = [9, 13]
+
+    def setUp(self):
+        self.geometry_dir = tempfile.mkdtemp(prefix='wiin_geometry_')
+        self.addCleanup(shutil.rmtree, self.geometry_dir)
+        for patcher in [
+                mock.patch.object(geometry, 'GEOMETRY_DIR', self.geometry_dir),
+                mock.patch.object(views, 'GEOMETRY_DIR', self.geometry_dir),
+                mock.patch.object(geometry, 'TOPOJSON_MANIFEST', os.path.join(
+                    self.geometry_dir, 'channels_topojson.json'))]:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        with contextlib.redirect_stdout(io.StringIO()):
+            call_command('build_geometry', zoom_levels=self.zoom_levels)
+        self.manifest = geometry.topojson_manifest()
+
+    def test_topojson_round_trips(self):
+        coordinates = geometry.channel_coordinates()
+        self.assertEqual(sorted(self.manifest), ['13', '9'])
+        for zoom in self.zoom_levels:
+            pathname = os.path.join(self.geometry_dir,
+                                    self.manifest[str(zoom)])
+            with open(pathname, 'rb') as topojson:
+                content = topojson.read()
+            with open(pathname + '.gz', 'rb') as gz:
+                self.assertEqual(gzip.decompress(gz.read()), content)
+            topology = json.loads(content)
+            transform = topology['transform']
+            geometries = topology['objects']['channels']['geometries']
+            self.assertEqual([g['properties']['channel_nu']
+                              for g in geometries], sorted(coordinates))
+            # distances in pixels, with latitude stretched as on the map
+            points = np.concatenate(list(coordinates.values()))
+            pixel = (np.array([1., 1. / np.cos(np.radians(
+                points[:, 1].mean()))]) / geometry.pixel_degrees(zoom))
+            for g in geometries:
+                source = coordinates[g['properties']['channel_nu']] * pixel
+                arc = topology['arcs'][g['arcs'][0]]
+                line = (np.cumsum(arc, axis=0) * transform['scale'] +
+                        transform['translate']) * pixel
+                # a kept vertex is a source vertex off by the quantization
+                kept = np.sqrt(((line[:, None] - source) ** 2)
+                               .sum(axis=2)).min(axis=1)
+                self.assertLessEqual(kept.max(), 0.5)
+                # a dropped vertex is within the half pixel tolerance of
+                # the simplified line, plus the quantization
+                if len(line) > 1:
+                    self.assertLessEqual(
+                        polyline_distances(source, line).max(), 1.)
+
+    def get(self, filename, **headers):
+        return self.client.get(reverse('channel_geometry', args=[filename]),
+                               **headers)
+
+    def test_view_sends_gzip(self):
+        filename = self.manifest['9']
+        response = self.get(filename, HTTP_ACCEPT_ENCODING='gzip, br')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        for directive in ['public', 'immutable',
+                          'max-age={}'.format(views.GEOMETRY_MAX_AGE)]:
+            self.assertIn(directive, response['Cache-Control'])
+        with open(os.path.join(self.geometry_dir, filename), 'rb') as f:
+            self.assertEqual(
+                gzip.decompress(b''.join(response.streaming_content)),
+                f.read())
+        response = self.get(filename)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(json.loads(b''.join(response.streaming_content))
+                         ['type'], 'Topology')
+
+    def test_view_missing_file(self):
+        self.assertEqual(self.get('channels_z9.unknown.topojson')
+                         .status_code, 404)
+        filename = self.manifest['13']
+        os.remove(os.path.join(self.geometry_dir, filename))
+        os.remove(os.path.join(self.geometry_dir, filename + '.gz'))
+        self.assertEqual(self.get(filename, HTTP_ACCEPT_ENCODING='gzip')
+                         .status_code, 404)
+
+    def test_channels_in_polygon(self):
+        coordinates = geometry.channel_coordinates()
+        low = coordinates[1][0] - 0.002
+        high = coordinates[1][0] + 0.002
+        expected = sorted(c for c, vertices in coordinates.items()
+                          if ((vertices >= low) & (vertices <= high))
+                          .all(axis=1).any())
+        self.assertIn(1, expected)
+        box = [low.tolist(), [high[0], low[1]], high.tolist(),
+               [low[0], high[1]]]
+        self.assertEqual(geometry.channels_in_polygon(box), expected)
+        # a closed ring selects the same channels
+        self.assertEqual(geometry.channels_in_polygon(box + box[:1]),
+                         expected)
+        self.assertEqual(geometry.channels_in_polygon(
+            [[0., 0.], [1., 0.], [0., 1.]]), [])
+
+
+class SeedLoadTestTests(LoadedRunTestCase):
+
+    def test_seeds_runs_load_test_can_request(self):
+        with contextlib.redirect_stdout(io.StringIO()):
+            call_command('seed_loadtest', runs=2, channels=3, days=1,
+                         tables_folder=self.tables_folder,
+                         skip_warm_cache=True)
+        run_ids = ['loadtest1_20190205_20190206',
+                   'loadtest2_20190205_20190206']
+        self.assertEqual(list(RunIdTable.objects.values_list('run_id',
+                                                             flat=True)),
+                         run_ids)
+        self.assertEqual(sorted(load_test.Command()._targets(None)), [
+            (run_id, scenario, variable, [1, 2, 3])
+            for run_id, scenario in zip(run_ids, ['OMR-5000', 'OMR-5500'])
+            for variable in ['FLOW', 'VEL']])
+
+
+class LoadTestTests(SimpleTestCase):
+    """ load_test's mix parsing, report and baseline comparison """
+
+    def setUp(self):
+        self.command = load_test.Command()
+
+    def test_parse_mix(self):
+        self.assertEqual(load_test._parse_mix('home=1,mapgraph=2.5'),
+                         {'home': 1., 'mapgraph': 2.5})
+        for value in ['nothing=1', 'home', 'home=x', 'home=1,']:
+            with self.assertRaises(argparse.ArgumentTypeError):
+                load_test._parse_mix(value)
+
+    def test_summary(self):
+        results = ([('mapks', 0.010 * i, True) for i in range(1, 101)] +
+                   [('home', 0.5, True), ('home', 0.1, False)])
+        report = self.command._summary(results, 4.)
+        self.assertEqual(sorted(report), ['all', 'home', 'mapks'])
+        self.assertEqual(report['all']['requests'], 102)
+        self.assertEqual(report['all']['errors'], 1)
+        self.assertEqual(report['mapks']['requests_per_second'], 25.)
+        self.assertEqual(report['mapks']['p50_ms'], 505.)
+        self.assertEqual(report['mapks']['p95_ms'], 950.5)
+        # the failed request is not a latency
+        self.assertEqual(report['home']['p99_ms'], 500.)
+        report = self.command._summary([('home', 0.1, False)], 1.)
+        self.assertIsNone(report['home']['p95_ms'])
+
+    def row(self, p95_ms, requests_per_second, requests=100, errors=0):
+        return {'requests': requests, 'errors': errors,
+                'requests_per_second': requests_per_second,
+                'p50_ms': p95_ms, 'p95_ms': p95_ms, 'p99_ms': p95_ms}
+
+    def compare(self, row, base, tolerance=20.):
+        with contextlib.redirect_stdout(io.StringIO()):
+            return self.command._compare({'mapks': row},
+                                         {'results': {'mapks': base}},
+                                         tolerance)
+
+    def test_compare_within_tolerance(self):
+        base = self.row(100., 50.)
+        self.assertEqual(self.compare(self.row(119., 41.), base), [])
+        self.assertEqual(self.compare(self.row(60., 80.), base), [])
+        # a request type the baseline did not send is not compared
+        self.assertEqual(self.command._compare(
+            {'home': self.row(1000., 1.)}, {'results': {}}, 20.), [])
+
+    def test_compare_regressions(self):
+        base = self.row(100., 50.)
+        self.assertEqual(len(self.compare(self.row(121., 50.), base)), 1)
+        self.assertEqual(len(self.compare(self.row(100., 39.), base)), 1)
+        self.assertEqual(len(self.compare(self.row(200., 20.), base)), 2)
+        self.assertEqual(self.compare(self.row(121., 50.), base,
+                                      tolerance=25.), [])
+        self.assertEqual(len(self.compare(self.row(121., 50.), base,
+                                          tolerance=0.)), 1)
+
+    def test_compare_failures(self):
+        base = self.row(100., 50.)
+        # fast, but failing
+        failing = self.row(10., 60., errors=5)
+        self.assertIn('5 of 100 requests failed', self.compare(failing,
+                                                              base)[0])
+        # nothing succeeded, so there is no p95 to compare
+        self.assertEqual(len(self.compare(self.row(None, 60., errors=100),
+                                          base)), 2)
+        # failing as often as in the baseline is not a regression
+        self.assertEqual(self.compare(failing, self.row(100., 50.,
+                                                        errors=3)), [])
+        # an empty baseline row is skipped rather than divided by
+        self.assertEqual(self.compare(base, self.row(None, 0.)), [])
+
+
+class SeriesAssemblerTests(SimpleTestCase):
+
+    def vartotal_frame(self):
+        frame = pd.DataFrame({'channel': np.repeat(CHANNELS, 96),
+                              'datetime': np.tile(pd.date_range(
+                                  '2019-02-05', periods=96, freq='15min',
+                                  tz='UTC'), len(CHANNELS)),
+                              'value': np.arange(96.0 * len(CHANNELS))})
+        frame.insert(0, 'run_id_id', 1)
+        frame.insert(1, 'variable_id', 1)
+        frame.insert(2, 'scenario_id', 1)
+        return frame
+
+    def assembler(self):
+        return SeriesAssembler(VarTotalSeriesTable, ['run_id_id',
+                                                     'variable_id',
+                                                     'scenario_id',
+                                                     'channel'])
+
+    def test_chunks_release_finished_series(self):
+        frame = self.vartotal_frame()
+        assembler = self.assembler()
+        series = []
+        for start in range(0, len(frame), 40):
+            assembler.add(frame.iloc[start:start + 40])
+            series += assembler.finished()
+            # only the series the chunk extends keep their samples
+            self.assertLessEqual(len(assembler.pieces), 2)
+        series += assembler.build()
+        self.assertEqual([s.channel for s in series], CHANNELS)
+        for s in series:
+            np.testing.assert_array_equal(
+                s.to_numpy(),
+                frame.loc[frame['channel'] == s.channel, 'value'])
+
+    def test_ungrouped_table_is_refused(self):
+        frame = self.vartotal_frame()
+        # channel 1 comes back after channel 2 has started and ended it
+        frame = pd.concat([frame.iloc[:48], frame.iloc[96:192],
+                           frame.iloc[48:96]])
+        assembler = self.assembler()
+        with self.assertRaises(CommandError):
+            for start in range(0, len(frame), 40):
+                assembler.add(frame.iloc[start:start + 40])
+                assembler.finished()
@@ -1,265 +1,544 @@
-import json
-import pandas as pd
-import numpy as np
-import plotly
-import plotly.graph_objs as go
-from statsmodels.distributions.empirical_distribution import ECDF
-from scipy.stats import ks_2samp
-from wiin.models import (HydroTable,  # VarSummaryTable,
-                         VarTotalTable, RunIdTable,
-                         VariableTable, ScenarioTable,
-                         UnitTable, VarKSTable)
-
-
-def get_mapKS(runid_jsdata, scenarioid_jsdata, variableid_jsdata,
-              channelid_jsdata):
-    runid_query_p = RunIdTable.objects.filter(run_id=runid_jsdata)
-    variable_query_p = VariableTable.objects.filter(variable=variableid_jsdata)
-    scenario_query_p = ScenarioTable.objects.all()
-    print(runid_query_p, variable_query_p, scenario_query_p)
-    runid_query = (RunIdTable.objects.filter(run_id=runid_jsdata)
-                   .values('id')[0])
-    variable_query = (VariableTable.objects.filter(variable=variableid_jsdata)
-                      .values('id')[0])
-    scenario_query = (ScenarioTable.objects.filter(scenario=scenarioid_jsdata,
-                                                   run_id=runid_query
-                                                   .get('id')).values('id')[0])
-    baseline_query = (ScenarioTable.objects.filter(scenario='Baseline',
-                                                   run_id=runid_query
-                                                   .get('id')).values('id')[0])
-    print(runid_query, variable_query, scenario_query, baseline_query)
-    retrieve_ks = (VarKSTable.objects.filter(run_id=runid_query.get('id'),
-                                             variable=variable_query.get('id'),
-                                             scenario0=baseline_query.get('id'),
-                                             scenario1=scenario_query
-                                             .get('id')).values('channel',
-                                                                'ks_stat'))
-    out = pd.DataFrame.from_records(retrieve_ks)
-    out = out.set_index('channel')
-    out = out.round(4)
-    out_dict = out.to_dict()
-    return json.dumps(out_dict.get('ks_stat'))
-
-
-def get_mapgraph(runid_jsdata, scenarioid_jsdata, variableid_jsdata,
-                 channelid_jsdata):
-    runid_query = (RunIdTable.objects.filter(run_id=runid_jsdata)
-                   .values('id')[0])
-    variable_query = (VariableTable.objects.filter(variable=variableid_jsdata)
-                      .values('id')[0])
-    scenario_query = (ScenarioTable.objects.filter(scenario=scenarioid_jsdata,
-                                                   run_id=runid_query
-                                                   .get('id')).values('id')[0])
-    baseline_query = (ScenarioTable.objects.filter(scenario='Baseline',
-                                                   run_id=runid_query
-                                                   .get('id')).values('id')[0])
-    scenario_total_query = (VarTotalTable.objects
-                            .filter(run_id=runid_query.get('id'),
-                                    variable=variable_query.get('id'),
-                                    scenario=scenario_query.get('id'),
-                                    channel=channelid_jsdata)
-                            .values('datetime', 'value'))
-    baseline_total_query = (VarTotalTable.objects
-                            .filter(run_id=runid_query.get('id'),
-                                    variable=variable_query.get('id'),
-                                    scenario=baseline_query.get('id'),
-                                    channel=channelid_jsdata)
-                            .values('datetime', 'value'))
-    df_scenario = pd.DataFrame.from_records(scenario_total_query)
-    df_baseline = pd.DataFrame.from_records(baseline_total_query)
-    if variableid_jsdata == 'FLOW':
-        var_name = 'Flow'
-        unit_name = 'CFS'
-    elif variableid_jsdata == 'VEL':
-        var_name = 'Velocity'
-        unit_name = 'FT/S'
-    baseline_data_arr = df_baseline.value.to_numpy(dtype=np.float32)
-    scenario_data_arr = df_scenario.value.to_numpy(dtype=np.float32)
-    baseline_ecdf_obj = ECDF(baseline_data_arr)
-    scenario_ecdf_obj = ECDF(scenario_data_arr)
-    KS_obj = ks_2samp(baseline_data_arr, scenario_data_arr)
-    KS_stat = round(KS_obj.statistic, 4)
-    baseline_trace = go.Scatter(x=np.around(baseline_ecdf_obj.x, decimals=1),
-                                y=np.around(baseline_ecdf_obj.y, decimals=4),
-                                mode='lines', name='Baseline')
-    scenario_trace = go.Scatter(x=np.around(scenario_ecdf_obj.x, decimals=1),
-                                y=np.around(scenario_ecdf_obj.y, decimals=4),
-                                mode='lines',
-                                name='{}'.format(scenarioid_jsdata))
-    KS_annotation = [go.layout.Annotation(x=0, y=1.10,
-                                          xref='paper', yref='paper',
-                                          showarrow=False,
-                                          text='Kolmogorov-Smirnov Distance: {}'.format(KS_stat))]
-    xt = "{} in {}".format(var_name, unit_name)
-    yt = "Fraction of Data"
-    layout = go.Layout(autosize=True, width=600, height=375,
-                       annotations=KS_annotation, legend_orientation="v",
-                       xaxis=dict(title=dict(text=xt)),
-                       yaxis=dict(title=dict(text=yt)))
-    ecdf_fig = go.Figure(data=[baseline_trace, scenario_trace], layout=layout)
-    graphJSON = json.dumps(ecdf_fig, cls=plotly.utils.PlotlyJSONEncoder)
-    return graphJSON
-
-
-def get_summary_table(runid, summary_range='default'):
-    runid_query = (RunIdTable.objects
-                   .filter(run_id=runid).values('id')[0].get('id'))
-
-    hydrotable_query = (HydroTable.objects.filter(run_id=runid_query)
-                        .values('variable', 'scenario',
-                                'channel', 'unit',
-                                'datetime', 'value'))
-    hydrotable_df = pd.DataFrame.from_records(hydrotable_query)
-    variable_searchers = list(hydrotable_df['variable'].unique())
-    scenario_searchers = list(hydrotable_df['scenario'].unique())
-    unit_searchers = list(hydrotable_df['unit'].unique())
-    for v in variable_searchers:
-        variable_query = (VariableTable.objects
-                          .filter(id=v).values('variable')[0]
-                          .get('variable'))
-        hydrotable_df.variable.where(hydrotable_df.variable != v,
-                                     variable_query,
-                                     inplace=True)
-    for s in scenario_searchers:
-        scenario_query = (ScenarioTable.objects
-                          .filter(id=s, run_id=runid_query)
-                          .values('scenario')[0].get('scenario'))
-        hydrotable_df.scenario.where(hydrotable_df.scenario != s,
-                                     scenario_query, inplace=True)
-    for u in unit_searchers:
-        unit_query = (UnitTable.objects
-                      .filter(id=u).values('unit')[0]
-                      .get('unit'))
-        hydrotable_df.unit.where(hydrotable_df.unit != u,
-                                 unit_query, inplace=True)
-    start_date = pd.to_datetime(runid.split("_")[-2],
-                                yearfirst=True, format='%Y%m%d')
-    if summary_range == 'default':
-        end_date = pd.to_datetime(runid.split("_")[-1],
-                                  yearfirst=True, format='%Y%m%d')
-    elif summary_range == 'five':
-        end_date = start_date + pd.Timedelta('5 days')
-    elif summary_range == 'fourteen':
-        end_date = start_date + pd.Timedelta('14 days')
-    datetime_range = pd.date_range(start=start_date, end=end_date,
-                                   freq='15T')
-    selection = (hydrotable_df.loc[hydrotable_df['datetime']
-                 .isin(datetime_range)])
-    selection = selection[['variable', 'scenario', 'channel', 'datetime',
-                           'value']]
-    summary = selection.groupby(['variable', 'scenario', 'channel']).agg(
-                                {'value': 'mean'})
-    summary = summary.unstack(['variable', 'scenario'])
-    summary.columns = summary.columns.droplevel()
-    scenario_name_lst = (summary.columns.unique(level='scenario')
-                         .values.tolist())
-    omr_name_lst = [x for x in scenario_name_lst if 'OMR' in x]
-    assert len(omr_name_lst) == 1
-    omr_name = omr_name_lst[0]
-    add_diff = summary.loc[:, pd.IndexSlice[:, omr_name]].sub(
-                           summary.loc[:, pd.IndexSlice[:, 'Baseline']].values,
-                           1).rename(columns={omr_name: 'Difference'})
-    summary = summary.join(add_diff).sort_index(axis=1, level='variable',
-                                                sort_remaining=False)
-    summary = summary.rename(columns={'FLOW': 'Average Daily Flow (cfs)',
-                                      'VEL': 'Average Daily Velocity (ft/s)'})
-    summary = summary.round(2)
-    header_vals = [('Type', 'Scenario', 'Channel')]
-    cell_vals = [summary.index.values.tolist()]
-    for col_val in list(summary.columns):
-        new_col = col_val + ("",)
-        header_vals.append(new_col)
-        cell_vals.append(summary[col_val].values.tolist())
-    trace = go.Table(
-            header=dict(values=header_vals,
-                        fill=dict(color='#C2D4FF')),
-            cells=dict(values=cell_vals, fill=dict(color='#F5F8FF'))
-            )
-    data = [trace]
-    layout = go.Layout(autosize=False, width=1500, height=1000)
-    fig = go.Figure(data=data, layout=layout)
-    tableJSON = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
-    return tableJSON
-
-
-def get_channel_node_table(runid, variable='default'):
-    runid_query = (RunIdTable.objects
-                   .filter(run_id=runid).values('id')[0].get('id'))
-    variable_query = (VariableTable.objects
-                      .filter(variable=variable).values('id')[0].get('id'))
-    hydrotable_query = (HydroTable.objects
-                        .filter(run_id=runid_query, variable=variable_query)
-                        .values('scenario', 'datetime', 'channel', 'value'))
-    hydrotable_df = pd.DataFrame.from_records(hydrotable_query)
-    scenario_searchers = list(hydrotable_df['scenario'].unique())
-    for s in scenario_searchers:
-        scenario_query = (ScenarioTable.objects
-                          .filter(id=s, run_id=runid_query)
-                          .values('scenario')[0].get('scenario'))
-        hydrotable_df.scenario.where(hydrotable_df.scenario != s,
-                                     scenario_query, inplace=True)
-    print(hydrotable_df.head())
-    # lists of the node numbers
-    eight_nodes = ['CHAN012', 'CHAN049', 'CHAN050', 'CHAN094', 'CHAN124',
-                   'CHAN148', 'CHAN422', 'CHAN423']
-    first_nodes = ['CHAN012', 'CHAN049', 'CHAN050', 'CHAN094']
-    second_nodes = ['CHAN124', 'CHAN148', 'CHAN422', 'CHAN423']
-    start_date = pd.to_datetime(runid.split("_")[-2], yearfirst=True,
-                                format='%Y%m%d')
-    end_date = pd.to_datetime(runid.split("_")[-1], yearfirst=True,
-                              format='%Y%m%d')
-    datetime_range = pd.date_range(start=start_date, end=end_date,
-                                   freq='15T')
-    # selection made on hydrotable_df
-    selection = (hydrotable_df.loc[(hydrotable_df['channel']
-                 .isin(eight_nodes)) &
-                 (hydrotable_df['datetime'].isin(datetime_range))])
-    # selection of dataframe columns on selection variable
-    selection = selection[['channel', 'scenario', 'datetime', 'value']]
-    grouper = selection.groupby(['channel', 'scenario',
-                                 pd.Grouper(key='datetime', freq='D')])
-    result = grouper['value'].mean()
-    daily = result.unstack(['channel', 'scenario'])
-    scenario_name_lst = daily.columns.unique(level='scenario').values.tolist()
-    omr_name_lst = [x for x in scenario_name_lst if 'OMR' in x]
-    assert len(omr_name_lst) == 1
-    omr_name = omr_name_lst[0]
-    # make new baseline minus omr column
-    add_diff = daily.loc[:, pd.IndexSlice[:, omr_name]].sub(
-                         daily.loc[:, pd.IndexSlice[:, 'Baseline']].values,
-                         1).rename(columns={omr_name: 'Difference'})
-    daily = daily.join(add_diff).sort_index(axis=1, level='channel',
-                                            sort_remaining=False)
-    # break down dataframe into first and second node dataframe for two tables
-    first_df = daily.loc[:, daily.columns.get_level_values('channel').isin(
-                         first_nodes)]
-    second_df = daily.loc[:, daily.columns.get_level_values('channel').isin(
-                          second_nodes)]
-    first_df = first_df.round(2)
-    second_df = second_df.round(2)
-    first_df.index = pd.to_datetime(first_df.index)
-    first_df.index = first_df.index.date
-    second_df.index = pd.to_datetime(second_df.index)
-    second_df.index = second_df.index.date
-
-    def make_trace(df):
-        header_vals = [('Channel', 'Scenario')]
-        cell_vals = [df.index.values.tolist()]
-        for col_val in list(df.columns):
-            header_vals.append(col_val)
-            cell_vals.append(df[col_val].values.tolist())
-        trace = go.Table(
-                    header=dict(values=header_vals,
-                                fill=dict(color='#C2D4FF')),
-                    cells=dict(values=cell_vals, fill=dict(color='#F5F8FF'))
-                    )
-        return trace
-
-    trace1 = make_trace(first_df)
-    trace2 = make_trace(second_df)
-    layout = dict(autosize=False, width=1500, height=900)
-    fig1 = go.Figure(data=[trace1], layout=layout)
-    fig2 = go.Figure(data=[trace2], layout=layout)
-    tableJSON1 = json.dumps(fig1, cls=plotly.utils.PlotlyJSONEncoder)
-    tableJSON2 = json.dumps(fig2, cls=plotly.utils.PlotlyJSONEncoder)
-    return tableJSON1, tableJSON2
+import base64
+import datetime
+import json
+import pandas as pd
+import numpy as np
+import plotly
+import plotly.graph_objs as go
+from statsmodels.distributions.empirical_distribution import ECDF
+from scipy.stats import ks_2samp
+from django.conf import settings
+from django.db import connections
+from django.db.models import Avg, BooleanField, Func
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+from wiin.models import (HydroTable,  # VarSummaryTable,
+                         VarTotalTable, RunIdTable,
+                         VariableTable, ScenarioTable,
+                         VarKSTable, VarTotalSeriesTable,
+                         VarEcdfTable)
+from wiin.partitions import run_db
+from wiin import analytics
+from wiin.profiling import timed
+
+
+# The fact table querysets behind the views, shared with the explain_queries
+# command so the plans it prints are those of the queries the views run
+
+def ks_queryset(runid, scenario, variable):
+    """ The (channel, KS distance) rows of `scenario` against the Baseline """
+    return (VarKSTable.objects.using(run_db(runid))
+            .filter(run_id__run_id=runid,
+                    variable__variable=variable,
+                    scenario0__scenario='Baseline',
+                    scenario1__scenario=scenario)
+            .values_list('channel', 'ks_stat'))
+
+
+def ecdf_queryset(runid, scenarios, variable, channels):
+    """ The precomputed VarEcdfTable rows of `scenarios` and `channels` """
+    return (VarEcdfTable.objects.using(run_db(runid))
+            .filter(run_id__run_id=runid,
+                    variable__variable=variable,
+                    scenario__scenario__in=scenarios,
+                    channel__in=channels)
+            .select_related('scenario'))
+
+
+def ecdf_batch_queryset(runid, scenarios, variable, channels):
+    """ ecdf_queryset as the (channel, scenario, count, x, KS distance)
+    tuples get_ecdf_batch reads """
+    return (ecdf_queryset(runid, scenarios, variable, channels)
+            .values_list('channel', 'scenario__scenario', 'count', 'x',
+                         'ks_stat'))
+
+
+class _SQLiteQuarterHour(Func):
+    """ Whether a datetime stored by Django's SQLite backend, as text
+    'YYYY-MM-DD HH:MM:SS' with '.ffffff' only when non-zero, falls on a
+    quarter hour """
+    template = ("substr(%(expressions)s, 15) IN "
+                "('00:00', '15:00', '30:00', '45:00')")
+    output_field = BooleanField()
+
+
+def _sample_grid(queryset):
+    """ Keeps the HydroTable rows the pandas reference averages, as
+    analytics.RANGE_FILTER does: datetimes on the 15 minute grid of the run's
+    first midnight and values other than NaN """
+    if connections[queryset.db].vendor == 'sqlite':
+        # __minute and __second are Python functions called per row on
+        # SQLite, several times slower than matching the text; SQLite has no
+        # NaN, populate_db leaves those samples out
+        return queryset.filter(_SQLiteQuarterHour('datetime'))
+    return (queryset.filter(datetime__minute__in=[0, 15, 30, 45],
+                            datetime__second=0)
+            .exclude(value=float('nan')))
+
+
+def summary_means_queryset(runid, start_date, end_date):
+    """ The HydroTable mean per (variable, scenario, channel) """
+    return (_sample_grid(HydroTable.objects.using(run_db(runid))
+                         .filter(run_id__run_id=runid,
+                                 datetime__range=(_db_datetime(start_date),
+                                                  _db_datetime(end_date))))
+            .values('variable__variable', 'scenario__scenario', 'channel')
+            .annotate(value=Avg('value'))
+            .order_by())
+
+
+def daily_means_queryset(runid, variable, channels, start_date, end_date):
+    """ The HydroTable daily mean per (channel, scenario) """
+    return (_sample_grid(HydroTable.objects.using(run_db(runid))
+                         .filter(run_id__run_id=runid,
+                                 variable__variable=variable,
+                                 channel__in=channels,
+                                 datetime__range=(_db_datetime(start_date),
+                                                  _db_datetime(end_date))))
+            .values('channel', 'scenario__scenario',
+                    day=TruncDate('datetime'))
+            .annotate(value=Avg('value'))
+            .order_by())
+
+
+def _db_datetime(timestamp):
+    """ A naive run date as the datetime the database compares against """
+    timestamp = timestamp.to_pydatetime()
+    if settings.USE_TZ:
+        return timezone.make_aware(timestamp, datetime.timezone.utc)
+    return timestamp
+
+
+@timed
+def get_mapKS(runid_jsdata, scenarioid_jsdata, variableid_jsdata,
+              channelid_jsdata=None):
+    ks_query = ks_queryset(runid_jsdata, scenarioid_jsdata, variableid_jsdata)
+    channels = []
+    ks_stats = []
+    for channel, ks_stat in ks_query:
+        channels.append(channel)
+        ks_stats.append(ks_stat)
+    ks_stats = np.around(np.array(ks_stats, dtype=float), 4).tolist()
+    return json.dumps(dict(zip(channels, ks_stats)))
+
+
+def get_vartotal_arrays(runid_jsdata, scenarioid_jsdata, variableid_jsdata,
+                        channelid_jsdata):
+    run_database = run_db(runid_jsdata)
+    series_query = (VarTotalSeriesTable.objects.using(run_database)
+                    .filter(run_id__run_id=runid_jsdata,
+                            variable__variable=variableid_jsdata,
+                            scenario__scenario__in=['Baseline',
+                                                    scenarioid_jsdata],
+                            channel=channelid_jsdata)
+                    .select_related('scenario'))
+    series = {}
+    for s in series_query:
+        # gaps in the series are stored as NaN
+        data_arr = s.to_numpy()
+        series[s.scenario.scenario] = data_arr[~np.isnan(data_arr)]
+    if 'Baseline' in series and scenarioid_jsdata in series:
+        return series['Baseline'], series[scenarioid_jsdata]
+    # runs loaded before the series table existed only have VarTotal rows
+    runid_query = (RunIdTable.objects.filter(run_id=runid_jsdata)
+                   .values('id')[0])
+    variable_query = (VariableTable.objects.filter(variable=variableid_jsdata)
+                      .values('id')[0])
+    scenario_query = (ScenarioTable.objects.filter(scenario=scenarioid_jsdata,
+                                                   run_id=runid_query
+                                                   .get('id')).values('id')[0])
+    baseline_query = (ScenarioTable.objects.filter(scenario='Baseline',
+                                                   run_id=runid_query
+                                                   .get('id')).values('id')[0])
+    scenario_total_query = (VarTotalTable.objects.using(run_database)
+                            .filter(run_id=runid_query.get('id'),
+                                    variable=variable_query.get('id'),
+                                    scenario=scenario_query.get('id'),
+                                    channel=channelid_jsdata)
+                            .values('datetime', 'value'))
+    baseline_total_query = (VarTotalTable.objects.using(run_database)
+                            .filter(run_id=runid_query.get('id'),
+                                    variable=variable_query.get('id'),
+                                    scenario=baseline_query.get('id'),
+                                    channel=channelid_jsdata)
+                            .values('datetime', 'value'))
+    df_scenario = pd.DataFrame.from_records(scenario_total_query)
+    df_baseline = pd.DataFrame.from_records(baseline_total_query)
+    baseline_data_arr = df_baseline.value.to_numpy(dtype=np.float32)
+    scenario_data_arr = df_scenario.value.to_numpy(dtype=np.float32)
+    return baseline_data_arr, scenario_data_arr
+
+
+def ecdf_x(data_arr):
+    """ The rounded ECDF x values get_mapgraph plots for a series """
+    return np.around(ECDF(data_arr).x, decimals=1)
+
+
+def ks_distance(baseline_data_arr, scenario_data_arr):
+    return round(ks_2samp(baseline_data_arr, scenario_data_arr).statistic, 4)
+
+
+@timed
+def get_ecdf_curves(runid_jsdata, scenarioid_jsdata, variableid_jsdata,
+                    channelid_jsdata):
+    """ Returns the baseline and scenario ECDF (x, y) and their KS distance
+
+    Served from the VarEcdfTable rows populate_db precomputes, with one
+    indexed query, and computed from the VarTotal series for runs loaded
+    before that table existed.
+    """
+    ecdf_query = ecdf_queryset(runid_jsdata, ['Baseline', scenarioid_jsdata],
+                               variableid_jsdata, [channelid_jsdata])
+    ecdfs = {e.scenario.scenario: e for e in ecdf_query}
+    if 'Baseline' in ecdfs and scenarioid_jsdata in ecdfs:
+        baseline = ecdfs['Baseline']
+        scenario = ecdfs[scenarioid_jsdata]
+        return ((baseline.x_values(), baseline.y_values()),
+                (scenario.x_values(), scenario.y_values()), scenario.ks_stat)
+    baseline_data_arr, scenario_data_arr = get_vartotal_arrays(
+        runid_jsdata, scenarioid_jsdata, variableid_jsdata, channelid_jsdata)
+    baseline_ecdf_obj = ECDF(baseline_data_arr)
+    scenario_ecdf_obj = ECDF(scenario_data_arr)
+    return ((np.around(baseline_ecdf_obj.x, decimals=1),
+             np.around(baseline_ecdf_obj.y, decimals=4)),
+            (np.around(scenario_ecdf_obj.x, decimals=1),
+             np.around(scenario_ecdf_obj.y, decimals=4)),
+            ks_distance(baseline_data_arr, scenario_data_arr))
+
+
+# the most channels one get_ecdf_batch call returns
+MAX_BATCH_CHANNELS = 100
+
+
+def _float32_b64(values):
+    return base64.b64encode(np.asarray(values, dtype='<f4').tobytes()).decode()
+
+
+def _ecdf_trace(name, count, x_b64):
+    return {'name': name, 'count': count, 'x': x_b64}
+
+
+@timed
+def mapgraph_data(scenarioid_jsdata, variableid_jsdata, curves):
+    """ The map graph's data only, for app.js to lay out itself
+
+    Each ECDF is sent as its sample count and its x values as base64
+    little-endian float32; the y values are i / count (rounded to 4
+    decimals) and are rebuilt by the client.
+    """
+    baseline_xy, scenario_xy, KS_stat = curves
+    return {'variable': variableid_jsdata,
+            'ks_stat': KS_stat,
+            'traces': [_ecdf_trace(name, len(xy[0]) - 1, _float32_b64(xy[0]))
+                       for name, xy in [('Baseline', baseline_xy),
+                                        (scenarioid_jsdata, scenario_xy)]]}
+
+
+def get_mapgraph_data(runid_jsdata, scenarioid_jsdata, variableid_jsdata,
+                      channelid_jsdata):
+    return mapgraph_data(scenarioid_jsdata, variableid_jsdata,
+                         get_ecdf_curves(runid_jsdata, scenarioid_jsdata,
+                                         variableid_jsdata, channelid_jsdata))
+
+
+def _series_ecdfs(using, runid, scenarios, variableid, channels):
+    """ ECDFs and KS distances computed from the VarTotal series of runs
+    loaded before VarEcdfTable existed, for all `channels` at once """
+    series_query = (VarTotalSeriesTable.objects.using(using)
+                    .filter(run_id__run_id=runid,
+                            variable__variable=variableid,
+                            scenario__scenario__in=scenarios,
+                            channel__in=channels)
+                    .values_list('channel', 'scenario__scenario', 'count',
+                                 'values'))
+    keys = []
+    arrays = []
+    for channel, scenario, count, values in series_query:
+        keys.append((channel, scenario))
+        arrays.append(np.frombuffer(values, dtype='<f4', count=count))
+    if not arrays:
+        return {}
+    # one NaN padded array, sorted row by row in a single call (NaN gaps and
+    # padding sort last), gives every ECDF x as ecdf_x builds it
+    sorted_rows = np.full((len(arrays), max(len(a) for a in arrays)), np.nan,
+                          dtype='<f4')
+    for row, data_arr in zip(sorted_rows, arrays):
+        row[:len(data_arr)] = data_arr
+    sorted_rows.sort(axis=1)
+    counts = (~np.isnan(sorted_rows)).sum(axis=1)
+    x_rows = np.around(np.hstack([np.full((len(arrays), 1), -np.inf,
+                                          dtype='<f4'), sorted_rows]),
+                       decimals=1)
+    ecdfs = {}
+    samples = {}
+    for key, sorted_row, x, count in zip(keys, sorted_rows, x_rows, counts):
+        if not count:
+            continue
+        samples[key] = sorted_row[:count]
+        ecdfs[key] = [int(count), x[:count + 1].tobytes(), None]
+    baseline, scenario = scenarios
+    for channel in channels:
+        if (channel, baseline) in samples and (channel, scenario) in samples:
+            ecdfs[(channel, scenario)][2] = ks_distance(
+                samples[(channel, baseline)], samples[(channel, scenario)])
+    return ecdfs
+
+
+@timed
+def get_ecdf_batch(runid_jsdata, scenarioid_jsdata, variableid_jsdata,
+                   channels):
+    """ The map graph data of several channels in one response
+
+    The ECDFs are read with one channel__in query on VarEcdfTable; channels
+    of runs loaded before that table existed are computed together from
+    their series.
+
+    Returns
+    -------
+    dict
+        'channels': a get_mapgraph_data dict (plus 'channel') per channel
+        with data, 'missing': the requested channels without data
+    """
+    using = run_db(runid_jsdata)
+    scenarios = ['Baseline', scenarioid_jsdata]
+    ecdf_query = ecdf_batch_queryset(runid_jsdata, scenarios,
+                                     variableid_jsdata, channels)
+    ecdfs = {(channel, scenario): [count, bytes(x), ks_stat]
+             for channel, scenario, count, x, ks_stat in ecdf_query}
+    pending = [c for c in channels
+               if any((c, s) not in ecdfs for s in scenarios)]
+    if pending:
+        ecdfs.update(_series_ecdfs(using, runid_jsdata, scenarios,
+                                   variableid_jsdata, pending))
+    batch = []
+    missing = []
+    for channel in channels:
+        if any((channel, s) not in ecdfs for s in scenarios):
+            missing.append(channel)
+            continue
+        batch.append({
+            'channel': channel, 'variable': variableid_jsdata,
+            'ks_stat': ecdfs[(channel, scenarioid_jsdata)][2],
+            'traces': [_ecdf_trace(s, ecdfs[(channel, s)][0],
+                                   base64.b64encode(ecdfs[(channel, s)][1])
+                                   .decode())
+                       for s in scenarios]})
+    return {'channels': batch, 'missing': missing}
+
+
+@timed
+def mapgraph_figure(scenarioid_jsdata, variableid_jsdata, curves):
+    """ The map graph Plotly figure JSON of get_ecdf_curves' `curves` """
+    baseline_xy, scenario_xy, KS_stat = curves
+    if variableid_jsdata == 'FLOW':
+        var_name = 'Flow'
+        unit_name = 'CFS'
+    elif variableid_jsdata == 'VEL':
+        var_name = 'Velocity'
+        unit_name = 'FT/S'
+    baseline_trace = go.Scatter(x=baseline_xy[0], y=baseline_xy[1],
+                                mode='lines', name='Baseline')
+    scenario_trace = go.Scatter(x=scenario_xy[0], y=scenario_xy[1],
+                                mode='lines',
+                                name='{}'.format(scenarioid_jsdata))
+    KS_annotation = [go.layout.Annotation(x=0, y=1.10,
+                                          xref='paper', yref='paper',
+                                          showarrow=False,
+                                          text='Kolmogorov-Smirnov Distance: {}'.format(KS_stat))]
+    xt = "{} in {}".format(var_name, unit_name)
+    yt = "Fraction of Data"
+    layout = go.Layout(autosize=True, width=600, height=375,
+                       annotations=KS_annotation, legend_orientation="v",
+                       xaxis=dict(title=dict(text=xt)),
+                       yaxis=dict(title=dict(text=yt)))
+    ecdf_fig = go.Figure(data=[baseline_trace, scenario_trace], layout=layout)
+    graphJSON = json.dumps(ecdf_fig, cls=plotly.utils.PlotlyJSONEncoder)
+    return graphJSON
+
+
+def get_mapgraph(runid_jsdata, scenarioid_jsdata, variableid_jsdata,
+                 channelid_jsdata):
+    return mapgraph_figure(scenarioid_jsdata, variableid_jsdata,
+                           get_ecdf_curves(runid_jsdata, scenarioid_jsdata,
+                                           variableid_jsdata,
+                                           channelid_jsdata))
+
+
+def _hydrotable_summary_means(runid, start_date, end_date):
+    summary_query = summary_means_queryset(runid, start_date, end_date)
+    summary = (pd.DataFrame.from_records(summary_query)
+               .rename(columns={'variable__variable': 'variable',
+                                'scenario__scenario': 'scenario'}))
+    return summary.set_index(['variable', 'scenario', 'channel']).sort_index()
+
+
+def summary_dates(runid, summary_range='default'):
+    """ The (start, end) timestamps a summary table averages over """
+    start_date = pd.to_datetime(runid.split("_")[-2],
+                                yearfirst=True, format='%Y%m%d')
+    if summary_range == 'default':
+        end_date = pd.to_datetime(runid.split("_")[-1],
+                                  yearfirst=True, format='%Y%m%d')
+    elif summary_range == 'five':
+        end_date = start_date + pd.Timedelta('5 days')
+    elif summary_range == 'fourteen':
+        end_date = start_date + pd.Timedelta('14 days')
+    return start_date, end_date
+
+
+@timed
+def read_summary_means(runid, start_date, end_date):
+    """ The mean per (variable, scenario, channel), from DuckDB if the run
+    has a Parquet table and from the database otherwise """
+    summary = analytics.summary_means(runid, start_date, end_date)
+    if summary is None:
+        summary = _hydrotable_summary_means(runid, start_date, end_date)
+    return summary
+
+
+@timed
+def summary_columns(summary):
+    """ The summary table of read_summary_means' frame as (header values,
+    cell values) columns """
+    summary = summary.unstack(['variable', 'scenario'])
+    summary.columns = summary.columns.droplevel()
+    scenario_name_lst = (summary.columns.unique(level='scenario')
+                         .values.tolist())
+    omr_name_lst = [x for x in scenario_name_lst if 'OMR' in x]
+    assert len(omr_name_lst) == 1
+    omr_name = omr_name_lst[0]
+    add_diff = summary.loc[:, pd.IndexSlice[:, omr_name]].sub(
+                           summary.loc[:, pd.IndexSlice[:, 'Baseline']].values,
+                           1).rename(columns={omr_name: 'Difference'})
+    summary = summary.join(add_diff).sort_index(axis=1, level='variable',
+                                                sort_remaining=False)
+    summary = summary.rename(columns={'FLOW': 'Average Daily Flow (cfs)',
+                                      'VEL': 'Average Daily Velocity (ft/s)'})
+    summary = summary.round(2)
+    header_vals = [('Type', 'Scenario', 'Channel')]
+    cell_vals = [summary.index.values.tolist()]
+    for col_val in list(summary.columns):
+        new_col = col_val + ("",)
+        header_vals.append(new_col)
+        cell_vals.append(summary[col_val].values.tolist())
+    return header_vals, cell_vals
+
+
+def get_summary_columns(runid, summary_range='default'):
+    """ The summary table as (header values, cell values) columns """
+    return summary_columns(read_summary_means(
+        runid, *summary_dates(runid, summary_range)))
+
+
+def _table_trace(header_vals, cell_vals):
+    return go.Table(
+            header=dict(values=header_vals,
+                        fill=dict(color='#C2D4FF')),
+            cells=dict(values=cell_vals, fill=dict(color='#F5F8FF'))
+            )
+
+
+@timed
+def summary_figure(columns):
+    """ The summary table Plotly figure JSON of summary_columns' columns """
+    data = [_table_trace(*columns)]
+    layout = go.Layout(autosize=False, width=1500, height=1000)
+    fig = go.Figure(data=data, layout=layout)
+    tableJSON = json.dumps(fig, cls=plotly.utils.PlotlyJSONEncoder)
+    return tableJSON
+
+
+def get_summary_table(runid, summary_range='default'):
+    return summary_figure(get_summary_columns(runid, summary_range))
+
+
+def _hydrotable_daily_means(runid, variable, channels, start_date, end_date):
+    daily_query = daily_means_queryset(runid, variable, channels, start_date,
+                                       end_date)
+    daily = (pd.DataFrame.from_records(daily_query)
+             .rename(columns={'scenario__scenario': 'scenario'}))
+    daily['datetime'] = pd.to_datetime(daily.pop('day'))
+    return (daily.set_index(['channel', 'scenario', 'datetime'])['value']
+            .sort_index())
+
+
+# lists of the node numbers
+EIGHT_NODES = ['CHAN012', 'CHAN049', 'CHAN050', 'CHAN094', 'CHAN124',
+               'CHAN148', 'CHAN422', 'CHAN423']
+FIRST_NODES = ['CHAN012', 'CHAN049', 'CHAN050', 'CHAN094']
+SECOND_NODES = ['CHAN124', 'CHAN148', 'CHAN422', 'CHAN423']
+
+
+@timed
+def read_channel_daily_means(runid, variable='default'):
+    """ The daily mean per (channel, scenario) of the eight nodes, from
+    DuckDB if the run has a Parquet table and from the database otherwise """
+    start_date = pd.to_datetime(runid.split("_")[-2], yearfirst=True,
+                                format='%Y%m%d')
+    end_date = pd.to_datetime(runid.split("_")[-1], yearfirst=True,
+                              format='%Y%m%d')
+    result = analytics.channel_daily_means(runid, variable, EIGHT_NODES,
+                                           start_date, end_date)
+    if result is None:
+        result = _hydrotable_daily_means(runid, variable, EIGHT_NODES,
+                                         start_date, end_date)
+    return result
+
+
+@timed
+def channel_node_columns(result):
+    """ The two channel node tables of read_channel_daily_means' Series,
+    each as (header values, cell values) """
+    daily = result.unstack(['channel', 'scenario'])
+    scenario_name_lst = daily.columns.unique(level='scenario').values.tolist()
+    omr_name_lst = [x for x in scenario_name_lst if 'OMR' in x]
+    assert len(omr_name_lst) == 1
+    omr_name = omr_name_lst[0]
+    # make new baseline minus omr column
+    add_diff = daily.loc[:, pd.IndexSlice[:, omr_name]].sub(
+                         daily.loc[:, pd.IndexSlice[:, 'Baseline']].values,
+                         1).rename(columns={omr_name: 'Difference'})
+    daily = daily.join(add_diff).sort_index(axis=1, level='channel',
+                                            sort_remaining=False)
+    # break down dataframe into first and second node dataframe for two tables
+    first_df = daily.loc[:, daily.columns.get_level_values('channel').isin(
+                         FIRST_NODES)]
+    second_df = daily.loc[:, daily.columns.get_level_values('channel').isin(
+                          SECOND_NODES)]
+    first_df = first_df.round(2)
+    second_df = second_df.round(2)
+    first_df.index = pd.to_datetime(first_df.index)
+    first_df.index = first_df.index.date
+    second_df.index = pd.to_datetime(second_df.index)
+    second_df.index = second_df.index.date
+
+    def make_columns(df):
+        header_vals = [('Channel', 'Scenario')]
+        cell_vals = [df.index.values.tolist()]
+        for col_val in list(df.columns):
+            header_vals.append(col_val)
+            cell_vals.append(df[col_val].values.tolist())
+        return header_vals, cell_vals
+
+    return make_columns(first_df), make_columns(second_df)
+
+
+def get_channel_node_columns(runid, variable='default'):
+    """ The two channel node tables, each as (header values, cell values) """
+    return channel_node_columns(read_channel_daily_means(runid, variable))
+
+
+@timed
+def channel_node_figures(columns):
+    """ The two channel node Plotly figure JSONs of channel_node_columns' """
+    columns1, columns2 = columns
+    layout = dict(autosize=False, width=1500, height=900)
+    fig1 = go.Figure(data=[_table_trace(*columns1)], layout=layout)
+    fig2 = go.Figure(data=[_table_trace(*columns2)], layout=layout)
+    tableJSON1 = json.dumps(fig1, cls=plotly.utils.PlotlyJSONEncoder)
+    tableJSON2 = json.dumps(fig2, cls=plotly.utils.PlotlyJSONEncoder)
+    return tableJSON1, tableJSON2
+
+
+def get_channel_node_table(runid, variable='default'):
+    return channel_node_figures(get_channel_node_columns(runid, variable))
@@ -1,193 +1,519 @@
-from django.shortcuts import render
-from django.http import JsonResponse
-from django.views.decorators.csrf import csrf_exempt
-from django.utils.decorators import method_decorator
-from django.views.generic import View, FormView
-
-from rest_framework.viewsets import ModelViewSet
-
-from wiin.models import (HydroTable, VarSummaryTable, VarTotalTable,
-                         RunIdTable, VariableTable, ScenarioTable,
-                         UnitTable, VarKSTable)
-from wiin.serializers import (HydroTableSerializer, VarSummarySerializer,
-                              VarTotalSerializer, RunIdSerializer,
-                              VariableSerializer, ScenarioSerializer,
-                              UnitSerializer, VarKSSerializer)
-
-from wiin.utils import (get_mapgraph, get_mapKS, get_summary_table,
-                        get_channel_node_table)
-
-import json
-import requests
-
-# Create your views here.
-@method_decorator(csrf_exempt, name='dispatch')
-class HomePageView(View):
-
-    def get(self, request):
-        context_dict = {}
-        runid_call = requests.get("http://127.0.0.1:8000/api/runid/")
-        scenario_call = requests.get("http://127.0.0.1:8000/api/scenario")
-        variable_call = requests.get("http://127.0.0.1:8000/api/variable")
-        runid_json = runid_call.json()
-        scenario_json = scenario_call.json()
-        variable_json = variable_call.json()
-        context_dict['run_id'] = json.dumps([x['run_id'] for x in runid_json])
-        scen_runid = None
-        for x in scenario_json:
-            if not x['scenario'] == 'Baseline':
-                scen_runid = requests.get(x['run_id']).json().get("run_id")
-        context_dict['scenario_id'] = json.dumps([{'scenario': x['scenario'],
-                                                   'run_id': scen_runid}])
-        variable_id_lst = []
-        for x in variable_json:
-            y = x['variable']
-            if y not in variable_id_lst:
-                variable_id_lst.append(y)
-        context_dict['variable_id'] = json.dumps(variable_id_lst)
-        print(context_dict)
-        return render(request, 'mapvis.html',
-                      context=context_dict,
-                      status=200)
-
-    def post(self, request):
-        runid_jsdata = request.POST.get('myRun', '')
-        scenarioid_jsdata = request.POST.get('myScenario', '')
-        variableid_jsdata = request.POST.get('myVariable', '')
-        channelid_jsdata = request.POST.get('myChannel', '')
-        figobj = get_mapgraph(runid_jsdata, scenarioid_jsdata,
-                              variableid_jsdata, channelid_jsdata)
-        ks = get_mapKS(runid_jsdata, scenarioid_jsdata,
-                       variableid_jsdata, channelid_jsdata)
-        return JsonResponse([figobj, ks], safe=False)
-
-
-@method_decorator(csrf_exempt, name='dispatch')
-class FullSummaryView(View):
-
-    def get(self, request):
-        context_dict = {}
-        run_id_call = requests.get("http://127.0.0.1:8000/api/runid/")
-        run_id_json = run_id_call.json()
-        context_dict['run_id'] = json.dumps([x['run_id'] for x in run_id_json])
-        return render(request, 'fullsum.html',
-                      context=context_dict,
-                      status=200)
-
-    def post(self, request):
-        runid_jsdata = request.POST.get('myRun', '')
-        tableJSON = get_summary_table(runid_jsdata, summary_range='default')
-        return JsonResponse(tableJSON, safe=False)
-
-
-@method_decorator(csrf_exempt, name='dispatch')
-class Summary5View(View):
-
-    def get(self, request):
-        context_dict = {}
-        run_id_call = requests.get("http://127.0.0.1:8000/api/runid/")
-        run_id_json = run_id_call.json()
-        context_dict['run_id'] = json.dumps([x['run_id'] for x in run_id_json])
-        return render(request, 'fivesum.html',
-                      context=context_dict,
-                      status=200)
-
-    def post(self, request):
-        runid_jsdata = request.POST.get('myRun', '')
-        tableJSON = get_summary_table(runid_jsdata, summary_range='five')
-        return JsonResponse(tableJSON, safe=False)
-
-
-@method_decorator(csrf_exempt, name='dispatch')
-class Summary14View(View):
-
-    def get(self, request):
-        context_dict = {}
-        run_id_call = requests.get("http://127.0.0.1:8000/api/runid/")
-        run_id_json = run_id_call.json()
-        context_dict['run_id'] = json.dumps([x['run_id'] for x in run_id_json])
-        return render(request, 'fourteensum.html',
-                      context=context_dict,
-                      status=200)
-
-    def post(self, request):
-        runid_jsdata = request.POST.get('myRun', '')
-        tableJSON = get_summary_table(runid_jsdata, summary_range='fourteen')
-        return JsonResponse(tableJSON, safe=False)
-
-
-@method_decorator(csrf_exempt, name='dispatch')
-class MfcnView(View):
-
-    def get(self, request):
-        context_dict = {}
-        run_id_call = requests.get("http://127.0.0.1:8000/api/runid/")
-        run_id_json = run_id_call.json()
-        context_dict['run_id'] = json.dumps([x['run_id'] for x in run_id_json])
-        return render(request, 'daily_flow.html',
-                      context=context_dict,
-                      status=200)
-
-    def post(self, request):
-        runid_jsdata = request.POST.get('myRun', '')
-        tableJSON1, tableJSON2 = get_channel_node_table(runid_jsdata,
-                                                        variable='FLOW')
-        return JsonResponse([tableJSON1, tableJSON2], safe=False)
-
-
-@method_decorator(csrf_exempt, name='dispatch')
-class MvcnView(FormView):
-    def get(self, request):
-        context_dict = {}
-        run_id_call = requests.get("http://127.0.0.1:8000/api/runid/")
-        run_id_json = run_id_call.json()
-        context_dict['run_id'] = json.dumps([x['run_id'] for x in run_id_json])
-        return render(request, 'daily_vel.html',
-                      context=context_dict,
-                      status=200)
-
-    def post(self, request):
-        runid_jsdata = request.POST.get('myRun', '')
-        tableJSON1, tableJSON2 = get_channel_node_table(runid_jsdata,
-                                                        variable='VEL')
-        return JsonResponse([tableJSON1, tableJSON2], safe=False)
-
-
-class RunIdViewSet(ModelViewSet):
-    queryset = RunIdTable.objects.all()
-    serializer_class = RunIdSerializer
-
-
-class VariableViewSet(ModelViewSet):
-    queryset = VariableTable.objects.all()
-    serializer_class = VariableSerializer
-
-
-class ScenarioViewSet(ModelViewSet):
-    queryset = ScenarioTable.objects.all()
-    serializer_class = ScenarioSerializer
-
-
-class UnitViewSet(ModelViewSet):
-    queryset = UnitTable.objects.all()
-    serializer_class = UnitSerializer
-
-
-class HydroViewSet(ModelViewSet):
-    queryset = HydroTable.objects.all()
-    serializer_class = HydroTableSerializer
-
-
-class VarTotalViewSet(ModelViewSet):
-    queryset = VarTotalTable.objects.all()
-    serializer_class = VarTotalSerializer
-
-
-class VarSummaryViewSet(ModelViewSet):
-    queryset = VarSummaryTable.objects.all()
-    serializer_class = VarSummarySerializer
-
-
-class VarKSViewSet(ModelViewSet):
-    queryset = VarKSTable.objects.all()
-    serializer_class = VarKSSerializer
+from django.shortcuts import render
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import (FileResponse, Http404, HttpResponse,
+                         HttpResponseBadRequest, JsonResponse,
+                         StreamingHttpResponse)
+from django.urls import reverse
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from django.views.decorators.cache import cache_control
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import condition
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+from django.utils.decorators import method_decorator
+from django.views.generic import View
+
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import CursorPagination
+from rest_framework.viewsets import ModelViewSet
+
+from wiin.models import (HydroTable, VarSummaryTable, VarTotalTable,
+                         RunIdTable, VariableTable, ScenarioTable,
+                         UnitTable, VarKSTable)
+from wiin.serializers import (HydroTableSerializer, VarSummarySerializer,
+                              VarTotalSerializer, RunIdSerializer,
+                              VariableSerializer, ScenarioSerializer,
+                              UnitSerializer, VarKSSerializer,
+                              HydroListSerializer, VarSummaryListSerializer,
+                              VarTotalListSerializer, VarKSListSerializer)
+
+from wiin.utils import (MAX_BATCH_CHANNELS, get_ecdf_batch, get_ecdf_curves,
+                        mapgraph_data, mapgraph_figure, get_mapKS,
+                        summary_dates, read_summary_means, summary_columns,
+                        summary_figure, read_channel_daily_means,
+                        channel_node_columns, channel_node_figures)
+from wiin.metadata import get_metadata
+from wiin.offload import compute, read_db
+from wiin import run_cache
+from wiin.profiling import recent_requests, span
+from wiin.partitions import run_db
+from wiin import export
+from wiin.geometry import (GEOMETRY_DIR, channels_in_polygon,
+                           topojson_manifest)
+
+from plotly.utils import PlotlyJSONEncoder
+
+import datetime
+import json
+import os
+
+# the geometry file names carry a hash of their content, so they never change
+GEOMETRY_MAX_AGE = 365 * 24 * 60 * 60
+
+
+def _run_id_context():
+    return {'run_id': json.dumps(get_metadata()['run_ids'])}
+
+
+def _compact(request):
+    # app.js asks for the data alone and lays the figures out itself
+    return request.POST.get('payload', '') == 'compact'
+
+
+def _compact_response(payload):
+    # PlotlyJSONEncoder writes NaN as null and dates as ISO strings
+    with span('serialize'):
+        content = json.dumps(payload, cls=PlotlyJSONEncoder)
+    return HttpResponse(content, content_type='application/json')
+
+
+def _table_payload(columns):
+    header_vals, cell_vals = columns
+    return {'header': header_vals, 'cells': cell_vals}
+
+
+async def _cached(run_id, kind, args, produce):
+    """ The run_cache entry, else the awaited produce(), then cached """
+    key, value = await read_db(run_cache.lookup, run_id, kind, *args)
+    if value is None:
+        value = await produce()
+        await read_db(run_cache.store, key, value)
+    return value
+
+
+def _run_last_modified(request):
+    # populate_db touches last_modified every time it (re)loads a run, so
+    # the KS statistics of a run cannot change without it changing too
+    if not hasattr(request, '_run_last_modified'):
+        request._run_last_modified = (
+            RunIdTable.objects.filter(run_id=request.GET.get('myRun', ''))
+            .values_list('last_modified', flat=True).first())
+    return request._run_last_modified
+
+
+def _mapks_etag(request):
+    last_modified = _run_last_modified(request)
+    if last_modified is None:
+        return None
+    return '{}-{}-{}-{}'.format(request.GET.get('myRun', ''),
+                                request.GET.get('myScenario', ''),
+                                request.GET.get('myVariable', ''),
+                                last_modified.timestamp())
+
+
+def _home_context():
+    context_dict = {}
+    metadata = get_metadata()
+    context_dict['run_id'] = json.dumps(metadata['run_ids'])
+    context_dict['scenario_id'] = json.dumps(metadata['scenarios'])
+    context_dict['variable_id'] = json.dumps(metadata['variables'])
+    context_dict['geometry'] = json.dumps(
+        {zoom: reverse('channel_geometry', args=[filename])
+         for zoom, filename in topojson_manifest().items()})
+    return context_dict
+
+
+# Create your views here.
+# The map and table views are async: their queries run through read_db() and
+# their pandas/NumPy work through compute(), off the event loop under ASGI.
+# Their results are kept per run in the cache (see run_cache, warm_cache).
+@method_decorator(csrf_exempt, name='dispatch')
+class HomePageView(View):
+
+    async def get(self, request):
+        context_dict = await read_db(_home_context)
+        return render(request, 'mapvis.html',
+                      context=context_dict,
+                      status=200)
+
+    async def post(self, request):
+        runid_jsdata = request.POST.get('myRun', '')
+        scenarioid_jsdata = request.POST.get('myScenario', '')
+        variableid_jsdata = request.POST.get('myVariable', '')
+        channelid_jsdata = request.POST.get('myChannel', '')
+
+        async def mapgraph_payload():
+            curves = await read_db(get_ecdf_curves, runid_jsdata,
+                                   scenarioid_jsdata, variableid_jsdata,
+                                   channelid_jsdata)
+            return await compute(mapgraph_data, scenarioid_jsdata,
+                                 variableid_jsdata, curves)
+
+        if _compact(request):
+            return _compact_response(await _cached(
+                runid_jsdata, 'mapgraph',
+                [scenarioid_jsdata, variableid_jsdata, channelid_jsdata],
+                mapgraph_payload))
+        curves = await read_db(get_ecdf_curves, runid_jsdata,
+                               scenarioid_jsdata, variableid_jsdata,
+                               channelid_jsdata)
+        figobj = await compute(mapgraph_figure, scenarioid_jsdata,
+                               variableid_jsdata, curves)
+        # the KS overlay is fetched separately from MapKSView
+        return JsonResponse([figobj], safe=False)
+
+
+class MapKSView(View):
+    """ KS statistic of every channel for the map overlay
+
+    Served over GET with an ETag and Last-Modified taken from the run's load
+    time, so switching back to a run/scenario/variable already seen is
+    answered with a 304 from the browser (or proxy) cache.
+    """
+
+    @method_decorator(cache_control(no_cache=True))
+    @method_decorator(condition(etag_func=_mapks_etag,
+                                last_modified_func=_run_last_modified))
+    def get(self, request):
+        run = request.GET.get('myRun', '')
+        scenario = request.GET.get('myScenario', '')
+        variable = request.GET.get('myVariable', '')
+        ks = run_cache.cached(run, 'mapks', [scenario, variable],
+                              lambda: get_mapKS(run, scenario, variable))
+        return HttpResponse(ks, content_type='application/json')
+
+
+class ChannelGeometryView(View):
+    """ A build_geometry TopoJSON file, sent gzipped when the browser
+    accepts it and cached by the browser for a year """
+
+    def get(self, request, filename):
+        if filename not in topojson_manifest().values():
+            raise Http404('No such channel geometry')
+        pathname = os.path.join(GEOMETRY_DIR, filename)
+        gzipped = ('gzip' in request.META.get('HTTP_ACCEPT_ENCODING', '') and
+                   os.path.exists(pathname + '.gz'))
+        try:
+            content = open(pathname + '.gz' if gzipped else pathname, 'rb')
+        except FileNotFoundError:
+            # listed in the manifest, but deleted since it was built
+            raise Http404('No such channel geometry')
+        response = FileResponse(content, filename=filename,
+                                content_type='application/json')
+        if gzipped:
+            response['Content-Encoding'] = 'gzip'
+        patch_vary_headers(response, ['Accept-Encoding'])
+        patch_cache_control(response, public=True, max_age=GEOMETRY_MAX_AGE,
+                            immutable=True)
+        return response
+
+
+def _export_datetime(value):
+    """ An ISO date or datetime query parameter, or None if not given """
+    if not value:
+        return None
+    parsed = parse_datetime(value)
+    if parsed is None:
+        day = parse_date(value)
+        if day is None:
+            raise ValueError('{!r} is not an ISO date or datetime'
+                             .format(value))
+        parsed = datetime.datetime.combine(day, datetime.time())
+    if settings.USE_TZ and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed, datetime.timezone.utc)
+    return parsed
+
+
+class ExportView(View):
+    """ Streams one run's time series as NDJSON, CSV or Arrow IPC
+
+    ?run= is required; ?table=vartotal (default) or hydro, ?format=ndjson
+    (default), csv or arrow, and the optional filters ?variable=,
+    ?scenario=, ?channels= (comma separated) and ?start=/?end= (inclusive
+    ISO dates or datetimes).
+    """
+
+    def get(self, request):
+        params = request.GET
+        run = params.get('run', '')
+        table = params.get('table', 'vartotal')
+        export_format = params.get('format', 'ndjson')
+        if table not in export.EXPORT_TABLES:
+            return HttpResponseBadRequest('table must be one of {}'.format(
+                ', '.join(export.EXPORT_TABLES)))
+        if export_format not in export.EXPORT_CONTENT_TYPES:
+            return HttpResponseBadRequest('format must be one of {}'.format(
+                ', '.join(export.EXPORT_CONTENT_TYPES)))
+        if export_format == 'arrow' and export.pa is None:
+            return HttpResponseBadRequest('Arrow export needs pyarrow '
+                                          'installed on the server')
+        if not RunIdTable.objects.filter(run_id=run).exists():
+            return HttpResponseBadRequest('Unknown run {!r}'.format(run))
+        try:
+            channels = [c for c in params.get('channels', '').split(',') if c]
+            if table == 'vartotal':
+                channels = [int(c) for c in channels]
+            start = _export_datetime(params.get('start'))
+            end = _export_datetime(params.get('end'))
+        except ValueError as e:
+            return HttpResponseBadRequest(str(e))
+        rows = export.export_rows(table, run, params.get('variable'),
+                                  params.get('scenario'), channels, start, end)
+        if export_format == 'ndjson':
+            stream = export.ndjson_stream(rows)
+        elif export_format == 'csv':
+            stream = export.csv_stream(rows)
+        else:
+            stream = export.arrow_stream(rows, table)
+        if isinstance(request, ASGIRequest):
+            stream = export.async_stream(stream)
+        response = StreamingHttpResponse(
+            stream, content_type=export.EXPORT_CONTENT_TYPES[export_format])
+        response['Content-Disposition'] = (
+            'attachment; filename="{}_{}.{}"'.format(run, table,
+                                                     export_format))
+        return response
+
+
+def _batch_channels(request):
+    """ The channels a MapGraphBatchView request selects
+
+    Either 'channels' (comma separated numbers), 'channel_range' ('first-last'
+    inclusive) or 'polygon' (a JSON list of [lon, lat] pairs; every channel
+    with a vertex inside it).
+    """
+    if request.POST.get('channels'):
+        return sorted({int(c) for c in request.POST['channels'].split(',')})
+    if request.POST.get('channel_range'):
+        first, last = [int(c) for c in
+                       request.POST['channel_range'].split('-')]
+        # checked before the range is built, whatever its bounds
+        if first > last:
+            raise ValueError('channel_range must be first-last with '
+                             'first <= last')
+        if last - first + 1 > MAX_BATCH_CHANNELS:
+            raise ValueError('{} channels selected, at most {} can be '
+                             'requested at once'.format(last - first + 1,
+                                                        MAX_BATCH_CHANNELS))
+        return list(range(first, last + 1))
+    if request.POST.get('polygon'):
+        return channels_in_polygon(json.loads(request.POST['polygon']))
+    raise ValueError('Give channels, channel_range or polygon')
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class MapGraphBatchView(View):
+    """ The map graph data of many channels in one response """
+
+    async def post(self, request):
+        try:
+            channels = await compute(_batch_channels, request)
+        except (ValueError, TypeError, IndexError) as e:
+            return HttpResponseBadRequest(str(e))
+        if len(channels) > MAX_BATCH_CHANNELS:
+            return HttpResponseBadRequest(
+                '{} channels selected, at most {} can be requested at once'
+                .format(len(channels), MAX_BATCH_CHANNELS))
+        return _compact_response(await read_db(
+            get_ecdf_batch, request.POST.get('myRun', ''),
+            request.POST.get('myScenario', ''),
+            request.POST.get('myVariable', ''), channels))
+
+
+class SummaryTableView(View):
+    """ A summary table page, averaged over summary_range of the run """
+    template_name = None
+    summary_range = 'default'
+
+    async def get(self, request):
+        return render(request, self.template_name,
+                      context=await read_db(_run_id_context),
+                      status=200)
+
+    async def post(self, request):
+        runid_jsdata = request.POST.get('myRun', '')
+
+        async def table_columns():
+            summary = await read_db(read_summary_means, runid_jsdata,
+                                    *summary_dates(runid_jsdata,
+                                                   self.summary_range))
+            return await compute(summary_columns, summary)
+
+        columns = await _cached(runid_jsdata, 'summary', [self.summary_range],
+                                table_columns)
+        if _compact(request):
+            return _compact_response(_table_payload(columns))
+        tableJSON = await compute(summary_figure, columns)
+        return JsonResponse(tableJSON, safe=False)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class FullSummaryView(SummaryTableView):
+    template_name = 'fullsum.html'
+    summary_range = 'default'
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class Summary5View(SummaryTableView):
+    template_name = 'fivesum.html'
+    summary_range = 'five'
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class Summary14View(SummaryTableView):
+    template_name = 'fourteensum.html'
+    summary_range = 'fourteen'
+
+
+class ChannelNodeTableView(View):
+    """ The two channel node tables of daily mean `variable` """
+    template_name = None
+    variable = 'default'
+
+    async def get(self, request):
+        return render(request, self.template_name,
+                      context=await read_db(_run_id_context),
+                      status=200)
+
+    async def post(self, request):
+        runid_jsdata = request.POST.get('myRun', '')
+
+        async def table_columns():
+            result = await read_db(read_channel_daily_means, runid_jsdata,
+                                   self.variable)
+            return await compute(channel_node_columns, result)
+
+        columns = await _cached(runid_jsdata, 'node', [self.variable],
+                                table_columns)
+        if _compact(request):
+            return _compact_response([_table_payload(table_columns)
+                                      for table_columns in columns])
+        tableJSON1, tableJSON2 = await compute(channel_node_figures, columns)
+        return JsonResponse([tableJSON1, tableJSON2], safe=False)
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class MfcnView(ChannelNodeTableView):
+    template_name = 'daily_flow.html'
+    variable = 'FLOW'
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+class MvcnView(ChannelNodeTableView):
+    template_name = 'daily_vel.html'
+    variable = 'VEL'
+
+
+class RequestProfileView(View):
+    """ The timings RequestProfileMiddleware kept of this process's latest
+    requests, newest first; only served with DEBUG on """
+
+    def get(self, request):
+        if not settings.DEBUG:
+            raise Http404('Request profiles are only kept with DEBUG on')
+        return JsonResponse({'requests': recent_requests()})
+
+
+class RunIdViewSet(ModelViewSet):
+    queryset = RunIdTable.objects.all()
+    serializer_class = RunIdSerializer
+
+
+class VariableViewSet(ModelViewSet):
+    queryset = VariableTable.objects.all()
+    serializer_class = VariableSerializer
+
+
+class ScenarioViewSet(ModelViewSet):
+    queryset = ScenarioTable.objects.all()
+    serializer_class = ScenarioSerializer
+
+
+class UnitViewSet(ModelViewSet):
+    queryset = UnitTable.objects.all()
+    serializer_class = UnitSerializer
+
+
+class FactCursorPagination(CursorPagination):
+    # the primary key only grows, so the cursor is stable while runs load
+    ordering = 'id'
+    page_size = 1000
+    page_size_query_param = 'page_size'
+    max_page_size = 10000
+
+
+class FactViewSetMixin(object):
+    """ Cursor paginated and filtered access to a fact table
+
+    The list can be filtered with ?run=, ?variable=, ?scenario= (names),
+    ?channel= and, for the time series tables, ?start= and ?end= (ISO
+    datetimes, inclusive). With ?run= the rows are read from that run's
+    partition. Lists use list_serializer_class, which names the foreign keys
+    from a single select_related join; ?fields= picks the fields returned.
+    """
+    pagination_class = FactCursorPagination
+    filter_lookups = {'run': 'run_id__run_id',
+                      'variable': 'variable__variable',
+                      'scenario': 'scenario__scenario',
+                      'channel': 'channel'}
+    range_field = None
+    list_related = ['run_id', 'variable', 'scenario']
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return self.list_serializer_class
+        return self.serializer_class
+
+    def _filter_value(self, param, lookup):
+        value = self.request.query_params[param]
+        field = self.queryset.model._meta.get_field(lookup.split('__')[0])
+        if field.is_relation:
+            field = field.related_model._meta.get_field(lookup.split('__')[1])
+        try:
+            return field.to_python(value)
+        except DjangoValidationError as e:
+            raise ValidationError({param: e.messages})
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        params = self.request.query_params
+        filters = {}
+        for param, lookup in self.filter_lookups.items():
+            if params.get(param):
+                filters[lookup] = self._filter_value(param, lookup)
+        if self.range_field is not None:
+            for param, lookup in [('start', '__gte'), ('end', '__lte')]:
+                if params.get(param):
+                    filters[self.range_field + lookup] = self._filter_value(
+                        param, self.range_field)
+        if params.get('run'):
+            try:
+                queryset = queryset.using(run_db(params['run']))
+            except ValueError as e:
+                raise ValidationError({'run': [str(e)]})
+        if self.action == 'list':
+            queryset = queryset.select_related(*self.list_related)
+        return queryset.filter(**filters)
+
+
+class HydroViewSet(FactViewSetMixin, ModelViewSet):
+    queryset = HydroTable.objects.all()
+    serializer_class = HydroTableSerializer
+    list_serializer_class = HydroListSerializer
+    range_field = 'datetime'
+    list_related = ['run_id', 'variable', 'scenario', 'unit']
+
+
+class VarTotalViewSet(FactViewSetMixin, ModelViewSet):
+    queryset = VarTotalTable.objects.all()
+    serializer_class = VarTotalSerializer
+    list_serializer_class = VarTotalListSerializer
+    range_field = 'datetime'
+
+
+class VarSummaryViewSet(FactViewSetMixin, ModelViewSet):
+    queryset = VarSummaryTable.objects.all()
+    serializer_class = VarSummarySerializer
+    list_serializer_class = VarSummaryListSerializer
+
+
+class VarKSViewSet(FactViewSetMixin, ModelViewSet):
+    queryset = VarKSTable.objects.all()
+    serializer_class = VarKSSerializer
+    list_serializer_class = VarKSListSerializer
+    # the scenario compared against Baseline
+    filter_lookups = dict(FactViewSetMixin.filter_lookups,
+                          scenario='scenario1__scenario')
+    list_related = ['run_id', 'variable', 'scenario0', 'scenario1']